@@ -1,6 +1,15 @@
 import sys
 import os
+import io
 import random
+import traceback
+import threading
+import time
+import warnings
+import multiprocessing
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
 import pandas as pd
 import numpy as np
 from scipy.optimize import curve_fit
@@ -46,7 +55,9 @@ from PyQt5.QtWidgets import (
     QProgressDialog,
     QStackedWidget,
     QGraphicsOpacityEffect,
-    QTextBrowser
+    QTextBrowser,
+    QTableWidget,
+    QTableWidgetItem
 )
 from PyQt5.QtCore import (
     Qt,
@@ -58,7 +69,10 @@ from PyQt5.QtCore import (
     QSettings,
     QByteArray,
     QAbstractTableModel,
-    QRectF
+    QRectF,
+    QObject,
+    QRunnable,
+    QThreadPool
 )
 from PyQt5.QtGui import (
     QIcon,
@@ -67,7 +81,9 @@ from PyQt5.QtGui import (
     QPainter,
     QFont,
     QFontMetrics,
-    QPen
+    QPen,
+    QImage,
+    QPixmap
 )
 
 # Attempt to import the profiling library
@@ -77,10 +93,26 @@ except ImportError:
     ProfileReport = None
 
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
 from matplotlib.figure import Figure
+from matplotlib.colors import LinearSegmentedColormap, LogNorm
+from matplotlib.lines import Line2D
+from matplotlib import colormaps as mpl_colormaps
+import matplotlib.dates as mdates
+import matplotlib.image as mpimg
 import matplotlib.pyplot as plt
 
 from scipy.special import wofz
+from scipy import stats as sp_stats
+from scipy import fft as sp_fft
+
+# Optional: numexpr evaluates large custom fit expressions multi-threaded
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
 
 # Try to import PyMC/ArviZ for Bayesian linear regression
 try:
@@ -569,6 +601,12 @@ class LogoWidget(QWidget):
 class PandasModel(QAbstractTableModel):
     data_changed = pyqtSignal()
     cell_edited = pyqtSignal(int, int, object)
+    # Emitted just before data_changed with the column names an operation
+    # touched, or None when every column may have changed.
+    columns_touched = pyqtSignal(object)
+    # Emitted (with the new version) before columns_touched when rows were
+    # reordered without changing any column's values, e.g. by sort.
+    rows_reordered = pyqtSignal(int)
 
     def __init__(self, df=pd.DataFrame(), workflow_callback=None, parent=None):
         super().__init__(parent)
@@ -576,13 +614,22 @@ class PandasModel(QAbstractTableModel):
         self._original_df = df.copy()
         self.workflow_callback = workflow_callback
         self.conditional_rules = []
+        self.version = 0
+        self._shared = set()    # columns whose arrays a view() may still reference
+
+    def _notify(self, columns=None, reordered=False):
+        self.version += 1
+        if reordered:
+            self.rows_reordered.emit(self.version)
+        self.columns_touched.emit(None if columns is None else list(columns))
+        self.data_changed.emit()
 
     def update_dataframe(self, new_df):
         self.beginResetModel()
         self._df = new_df.copy()
         self._original_df = new_df.copy()
         self.endResetModel()
-        self.data_changed.emit()
+        self._notify()
 
     def rowCount(self, parent=QModelIndex()):
         return len(self._df)
@@ -648,7 +695,9 @@ class PandasModel(QAbstractTableModel):
         )
         self._original_df = self._df.copy()
         self.layoutChanged.emit()
-        self.data_changed.emit()
+        # Reordering rows leaves every column's statistics unchanged, but
+        # row-aligned caches (ranks, index-based series) must be rebuilt
+        self._notify([], reordered=True)
 
     def flags(self, index):
         if not index.isValid():
@@ -670,10 +719,21 @@ class PandasModel(QAbstractTableModel):
             except Exception:
                 new_val = value
 
-            self._df.iat[row, col] = new_val
+            if col_name in self._shared and hasattr(self._df, "isetitem"):
+                # Copy-on-write: give the model its own copy of the column so
+                # snapshots handed out by view() keep the old values
+                values = self._df.iloc[:, col].copy()
+                values.iat[row] = new_val
+                self._df.isetitem(col, values)
+                self._shared.discard(col_name)
+            else:
+                if col_name in self._shared:
+                    self._df = self._df.copy()      # pandas < 1.5: no isetitem
+                    self._shared.clear()
+                self._df.iat[row, col] = new_val
             self._original_df.iat[row, col] = new_val
 
-            self.data_changed.emit()
+            self._notify([col_name])
             self.cell_edited.emit(row, col, new_val)
             self.dataChanged.emit(index, index, [Qt.DisplayRole])
             return True
@@ -686,17 +746,18 @@ class PandasModel(QAbstractTableModel):
             self.endRemoveRows()
         self._df.reset_index(drop=True, inplace=True)
         self._original_df = self._df.copy()
-        self.data_changed.emit()
+        self._notify()
 
     def dropAllNARows(self):
         self.beginResetModel()
         self._df = self._df.dropna().reset_index(drop=True)
         self._original_df = self._df.copy()
         self.endResetModel()
-        self.data_changed.emit()
+        self._notify()
 
     def fillNARows(self, method, constant=None):
         self.beginResetModel()
+        na_cols = self._df.columns[self._df.isna().any()].tolist()
         if method == "Mean":
             self._df = self._df.fillna(self._df.mean(numeric_only=True))
         elif method == "Median":
@@ -710,14 +771,14 @@ class PandasModel(QAbstractTableModel):
 
         self._original_df = self._df.copy()
         self.endResetModel()
-        self.data_changed.emit()
+        self._notify(na_cols)
 
     def renameColumn(self, old_name, new_name):
         self.beginResetModel()
         self._df.rename(columns={old_name: new_name}, inplace=True)
         self._original_df = self._df.copy()
         self.endResetModel()
-        self.data_changed.emit()
+        self._notify([old_name, new_name])
 
     def deleteColumn(self, col_index):
         self.beginResetModel()
@@ -725,7 +786,7 @@ class PandasModel(QAbstractTableModel):
         self._df.drop(columns=[col_name], inplace=True)
         self._original_df = self._df.copy()
         self.endResetModel()
-        self.data_changed.emit()
+        self._notify([col_name])
 
     def filter(self, text):
         self.beginResetModel()
@@ -738,7 +799,7 @@ class PandasModel(QAbstractTableModel):
             )
             self._df = self._original_df[mask].reset_index(drop=True)
         self.endResetModel()
-        self.data_changed.emit()
+        self._notify()
 
     def addConditionalRule(self, column, operator, value, color):
         self.conditional_rules.append((column, operator, value, color))
@@ -747,10 +808,1085 @@ class PandasModel(QAbstractTableModel):
     def getDataFrame(self):
         return self._df.copy()
 
+    def view(self):
+        """
+        Zero-copy snapshot of the table for tool windows, to be treated as
+        read-only and paired with ``version``. It shares the model's column
+        arrays; the model copies a column before writing into it in place, so
+        later edits never show up in a snapshot handed out earlier.
+        """
+        self._shared = set(self._df.columns)
+        return self._df.copy(deep=False)
+
+    def getColumns(self, columns):
+        return self._df[list(columns)].copy()
+
+    def columnNames(self):
+        return list(self._df.columns)
+
     def getOriginalDataFrame(self):
         return self._original_df.copy()
 
 
+# —————————————————————————————————
+#  BACKGROUND WORKERS
+# —————————————————————————————————
+
+class WorkerSignals(QObject):
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+    progress = pyqtSignal(object)
+
+
+class Worker(QRunnable):
+    """
+    Run ``fn(*args, **kwargs)`` on the global QThreadPool.
+    The result (or a formatted traceback) comes back through ``self.signals``
+    on the GUI thread.
+    """
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception:
+            self.signals.error.emit(traceback.format_exc())
+            return
+        self.signals.finished.emit(result)
+
+    def start(self):
+        QThreadPool.globalInstance().start(self)
+        return self
+
+
+# —————————————————————————————————
+#  PER-COLUMN STATISTICS CACHE
+# —————————————————————————————————
+
+class ColumnStatsCache:
+    """
+    Cached per-column statistics for the summary dock.
+    PandasModel.columns_touched marks columns dirty; only those are recomputed.
+    """
+    def __init__(self):
+        self.stats = {}
+        self._computed_at = {}
+        self._dirty = None  # None → every column is dirty
+
+    def mark_dirty(self, columns):
+        if columns is None:
+            self._dirty = None
+        elif self._dirty is not None:
+            self._dirty.update(columns)
+
+    def reset(self):
+        self.stats.clear()
+        self._computed_at.clear()
+        self._dirty = None
+
+    def take_dirty(self, columns):
+        """Return the columns that need recomputing and clear the dirty set."""
+        columns = list(columns)
+        for stale in set(self.stats) - set(columns):
+            self.stats.pop(stale, None)
+            self._computed_at.pop(stale, None)
+        if self._dirty is None:
+            todo = columns
+        else:
+            todo = [c for c in columns if c in self._dirty or c not in self.stats]
+        self._dirty = set()
+        return todo
+
+    def apply(self, results, version):
+        for col, st in results.items():
+            # A slower, older job must not overwrite fresher numbers
+            if self._computed_at.get(col, -1) <= version:
+                self.stats[col] = st
+                self._computed_at[col] = version
+
+    @staticmethod
+    def compute(frame):
+        """Statistics for every column of ``frame`` (runs in a worker)."""
+        out = {}
+        for col in frame.columns:
+            s = frame[col]
+            st = {"dtype": str(s.dtype), "nulls": int(s.isna().sum())}
+            if pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+                vals = s.to_numpy(dtype=float, na_value=np.nan)
+                finite = vals[~np.isnan(vals)]
+                if finite.size:
+                    st.update(min=float(finite.min()), max=float(finite.max()),
+                              mean=float(finite.mean()))
+            out[col] = st
+        return out
+
+
+# —————————————————————————————————
+#  STREAMING (OUT-OF-CORE) STATISTICS
+# —————————————————————————————————
+
+class RunningMoments:
+    """Exact count/nulls/min/max/mean/variance, merged with Chan's parallel Welford update."""
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        finite = values[~np.isnan(values)]
+        self.nulls += values.size - finite.size
+        if finite.size == 0:
+            return
+        batch = RunningMoments()
+        batch.count = finite.size
+        batch.mean = float(finite.mean())
+        batch.m2 = float(((finite - batch.mean) ** 2).sum())
+        batch.min = float(finite.min())
+        batch.max = float(finite.max())
+        self.merge(batch)
+
+    def merge(self, other):
+        self.nulls += other.nulls
+        if other.count == 0:
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+
+class QuantileSketch:
+    """
+    Mergeable KLL-style quantile sketch.
+    Level i holds items of weight 2**i; an over-full level is sorted and every
+    other item (random offset) is promoted. Exact until more than ``k`` values
+    have been seen; rank error is roughly 1.7/k afterwards.
+    """
+    def __init__(self, k=400, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(8, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.n += values.size
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for i, items in enumerate(other.levels):
+            self.levels[i] = np.concatenate([self.levels[i], items])
+        self.n += other.n
+        self._compress()
+
+    def _compress(self):
+        lvl = 0
+        while lvl < len(self.levels):
+            buf = self.levels[lvl]
+            if buf.size > self._capacity(lvl):
+                if lvl + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                buf = np.sort(buf)
+                leftover = buf[:buf.size % 2]
+                promoted = buf[leftover.size:][self._rng.integers(2)::2]
+                self.levels[lvl] = leftover
+                self.levels[lvl + 1] = np.concatenate([self.levels[lvl + 1], promoted])
+            lvl += 1
+
+    def quantiles(self, qs):
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(b.size, 2.0 ** i) for i, b in enumerate(self.levels)])
+        order = np.argsort(items, kind="mergesort")
+        items, cum = items[order], np.cumsum(weights[order])
+        idx = np.searchsorted(cum, qs * cum[-1], side="left")
+        return items[np.clip(idx, 0, items.size - 1)]
+
+
+class HyperLogLog:
+    """Approximate distinct counter (standard error ≈ 1.04 / sqrt(2**p))."""
+    def __init__(self, p=14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    def update(self, series):
+        series = pd.Series(series).dropna()
+        if series.empty:
+            return
+        if pd.api.types.is_numeric_dtype(series.dtype):
+            # int and float chunks of the same column must hash alike
+            series = series.astype(float)
+        h = pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+        tail_bits = 64 - self.p
+        idx = (h >> np.uint64(tail_bits)).astype(np.int64)
+        w = h & np.uint64((1 << tail_bits) - 1)
+        bit_len = np.zeros(w.shape, dtype=np.int64)
+        nz = w > 0
+        bit_len[nz] = np.floor(np.log2(w[nz].astype(float))).astype(np.int64) + 1
+        # float rounding can overshoot by one bit for values just below 2**k
+        over = nz & (np.left_shift(np.uint64(1), (bit_len - 1).clip(0).astype(np.uint64)) > w)
+        bit_len[over] -= 1
+        rank = (tail_bits - bit_len + 1).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rank)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = float(self.m)
+        alpha = 0.7213 / (1.0 + 1.079 / m)
+        est = alpha * m * m / np.sum(np.exp2(-self.registers.astype(float)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if est <= 2.5 * m and zeros:
+            est = m * np.log(m / zeros)
+        return int(round(est))
+
+
+class StreamingStats:
+    """Per-column streaming statistics over any number of DataFrame chunks."""
+    def __init__(self):
+        self.rows = 0
+        self.columns = {}
+
+    def _column(self, name, numeric):
+        col = self.columns.get(name)
+        if col is None:
+            col = self.columns[name] = {
+                "moments": RunningMoments() if numeric else None,
+                "sketch": QuantileSketch() if numeric else None,
+                "distinct": HyperLogLog(),
+                "nulls": 0,
+            }
+        return col
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        for name in chunk.columns:
+            s = chunk[name]
+            numeric = pd.api.types.is_numeric_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype)
+            col = self._column(name, numeric)
+            col["nulls"] += int(s.isna().sum())
+            if not numeric:
+                col["moments"] = col["sketch"] = None
+            elif col["moments"] is not None:
+                vals = s.to_numpy(dtype=float, na_value=np.nan)
+                col["moments"].update(vals)
+                col["sketch"].update(vals)
+            col["distinct"].update(s)
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        for name, theirs in other.columns.items():
+            mine = self.columns.get(name)
+            if mine is None:
+                self.columns[name] = theirs
+                continue
+            mine["nulls"] += theirs["nulls"]
+            mine["distinct"].merge(theirs["distinct"])
+            if mine["moments"] is None or theirs["moments"] is None:
+                # numeric in one chunk, text in another: treat as non-numeric
+                mine["moments"] = mine["sketch"] = None
+            else:
+                mine["moments"].merge(theirs["moments"])
+                mine["sketch"].merge(theirs["sketch"])
+        return self
+
+    def summary(self):
+        rows = []
+        for name, col in self.columns.items():
+            row = {"column": name, "nulls": col["nulls"], "distinct≈": col["distinct"].estimate()}
+            mom = col["moments"]
+            if mom is not None and mom.count:
+                q25, q50, q75 = col["sketch"].quantiles([0.25, 0.5, 0.75])
+                row.update(mean=mom.mean, std=float(np.sqrt(mom.variance)), min=mom.min,
+                           p25=q25, p50=q50, p75=q75, max=mom.max)
+            rows.append(row)
+        return pd.DataFrame(rows).set_index("column") if rows else pd.DataFrame()
+
+
+def stream_statistics(chunks, max_workers=None):
+    """
+    One pass over ``chunks`` (a list of DataFrames or a ``pd.read_csv(...,
+    chunksize=...)`` reader). Chunks are summarized in parallel and the
+    partial results merged; at most ``2 * max_workers`` chunks are in flight.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    total = StreamingStats()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(StreamingStats().update, chunk))
+            if len(pending) >= 2 * max_workers:
+                total.merge(pending.pop(0).result())
+        for fut in pending:
+            total.merge(fut.result())
+    return total
+
+
+# —————————————————————————————————
+#  CORRELATION SERVICE
+# —————————————————————————————————
+def _pearson_block(X, M, rows, cols, chunk=1 << 14):
+    """
+    Pairwise-complete Pearson r (and pair counts) between columns ``rows`` and
+    ``cols`` of X. X holds centred values with missing entries zeroed and M is
+    the matching boolean validity mask (None when nothing is missing); sums
+    are accumulated over row chunks.
+    """
+    n = sx = sy = sxx = syy = sxy = 0.0
+    for r0 in range(0, X.shape[0], chunk):
+        Xc = X[r0:r0 + chunk]
+        A, B = Xc[:, rows], Xc[:, cols]
+        sxy = sxy + A.T @ B
+        if M is None:
+            sx = sx + A.sum(axis=0)[:, None]
+            sy = sy + B.sum(axis=0)[None, :]
+            sxx = sxx + (A * A).sum(axis=0)[:, None]
+            syy = syy + (B * B).sum(axis=0)[None, :]
+            continue
+        Mc = M[r0:r0 + chunk]
+        MA, MB = Mc[:, rows].astype(float), Mc[:, cols].astype(float)
+        n = n + MA.T @ MB
+        sx = sx + A.T @ MB
+        sy = sy + MA.T @ B
+        sxx = sxx + (A * A).T @ MB
+        syy = syy + MA.T @ (B * B)
+    if M is None:
+        n = np.full(np.shape(sxy), float(X.shape[0]))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var = (sxx - sx * sx / n) * (syy - sy * sy / n)
+        r = cov / np.sqrt(var)
+    r[(n < 2) | ~(var > 0)] = np.nan
+    return np.clip(r, -1.0, 1.0), n
+
+
+def _centred(values):
+    """Centre ``values`` per column, zero the missing entries, return (X, mask)."""
+    X = np.array(values, dtype=float)
+    M = np.isfinite(X)
+    X[~M] = np.nan
+    if X.shape[0]:
+        X -= np.nanmean(X, axis=0)
+    X[~M] = 0.0
+    return X, M
+
+
+def _centred_ranks(values):
+    """Average (tie-aware) ranks of one column, centred, with missing entries zeroed."""
+    ok = np.isfinite(values)
+    v = values[ok]
+    order = np.argsort(v)
+    sv = v[order]
+    starts = np.flatnonzero(np.r_[True, sv[1:] != sv[:-1]])
+    ends = np.r_[starts[1:], sv.size]
+    ranked = np.empty(sv.size)
+    ranked[order] = np.repeat((starts + ends + 1) / 2.0, ends - starts)
+    out = np.zeros(values.shape)
+    out[ok] = ranked - (sv.size + 1) / 2.0
+    return out, ok
+
+
+class CorrelationService:
+    """
+    Shared correlation matrices for the loaded dataset.
+    Pearson, Spearman and Kendall results (r, pair counts and, on request,
+    p-values) are cached per method with the model version they were computed
+    at. ``mark_dirty`` (wired to ``PandasModel.columns_touched``) records
+    edited columns, so the next request at a newer version recomputes only
+    those rows/columns; structural changes drop the cache.
+
+    Pearson and Spearman are computed in column blocks on a thread pool
+    (numpy releases the GIL inside the matmuls). Spearman is Pearson on a
+    cached rank matrix; with missing values each column is ranked once over
+    its own valid rows rather than re-ranked per pair. Kendall's tau-b uses
+    scipy's O(n log n) algorithm per pair, in parallel, on a seeded sample of
+    ``kendall_rows`` rows for longer tables (``label`` names the sample, and
+    pair counts ``n`` are counts within it).
+    """
+    METHODS = ("pearson", "spearman", "kendall")
+    block_size = 32
+    kendall_rows = 5_000
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self._entries = {}    # method -> {"version", "columns", "r", "n", "p", "dirty"}
+        self._ranks = None    # {"version", "columns", "row_order", "X", "M", "dirty"}
+        self._floor = 0       # oldest version the cache may serve (last edit seen)
+        self._row_order = 0   # version of the last row reorder; ranks are only valid within one
+        self._lock = threading.RLock()
+
+    def mark_dirty(self, columns, version=None):
+        """Record an edit; ``version`` is the model version the edit produced."""
+        with self._lock:
+            if version is not None:
+                self._floor = max(self._floor, version)
+            if columns is None:
+                self._entries.clear()
+                self._ranks = None
+                return
+            caches = list(self._entries.values()) + ([self._ranks] if self._ranks else [])
+            for cache in caches:
+                cache["dirty"].update(columns)
+
+    def mark_reordered(self, version):
+        """Rows were reordered at ``version`` (wired to ``PandasModel.rows_reordered``)."""
+        with self._lock:
+            self._floor = max(self._floor, version)
+            self._row_order = max(self._row_order, version)
+            self._ranks = None
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+            self._ranks = None
+
+    def _current(self, version):
+        # Snapshots older than the last recorded edit are computed but never
+        # cached, or they would overwrite newer data and clear its dirty marks.
+        return version is not None and version >= self._floor
+
+    # ---------- public queries ----------
+    def matrix(self, df, version=None, method="pearson"):
+        """Correlation matrix of the numeric columns of ``df`` as a DataFrame."""
+        columns, entry = self._entry(df, version, method)
+        return self._frame(entry["r"], columns)
+
+    def pvalues(self, df, version=None, method="pearson"):
+        """Two-sided p-values matching ``matrix`` (t-test on r for Pearson/Spearman)."""
+        columns, entry = self._entry(df, version, method)
+        p = entry["p"]
+        if p is None:
+            p = self._t_pvalues(entry["r"], entry["n"])
+            with self._lock:
+                entry["p"] = p
+        return self._frame(p, columns)
+
+    def top_pairs(self, df, version=None, method="pearson", k=12):
+        """The ``k`` column pairs with the largest |r|, with p-values and pair counts."""
+        columns, entry = self._entry(df, version, method)
+        p = self.pvalues(df, version, method).to_numpy()
+        r = entry["r"]
+        i, j = np.triu_indices(len(columns), 1)
+        keep = np.isfinite(r[i, j])
+        i, j = i[keep], j[keep]
+        order = np.argsort(-np.abs(r[i, j]), kind="stable")[:k]
+        i, j = i[order], j[order]
+        return pd.DataFrame({
+            "column_a": [columns[a] for a in i],
+            "column_b": [columns[b] for b in j],
+            "r": r[i, j],
+            "p_value": p[i, j],
+            "n": entry["n"][i, j].astype(np.int64),
+        })
+
+    def label(self, df, method="pearson"):
+        """Display name of ``method`` for ``df``; sampled Kendall results say so."""
+        method = method.lower()
+        if method == "kendall" and len(df) > self.kendall_rows:
+            return f"Kendall, {self.kendall_rows:,}-row sample"
+        return method.title()
+
+    # ---------- cache bookkeeping ----------
+    def _entry(self, df, version, method):
+        method = method.lower()
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown correlation method: {method}")
+        num = df.select_dtypes(include="number")
+        columns = list(num.columns)
+        with self._lock:
+            entry = self._entries.get(method)
+            cacheable = self._current(version) and (entry is None or entry["version"] <= version)
+            if cacheable and entry is not None and entry["version"] == version \
+                    and entry["columns"] == columns:
+                return columns, entry
+            if entry is not None:
+                # The matrices are never written in place, so a shallow copy is
+                # a stable base once the lock is released
+                entry = dict(entry, dirty=set(entry["dirty"]))
+        if cacheable:
+            # Compute without the lock: mark_dirty runs on the GUI thread for
+            # every edit and must not wait for a large matrix
+            r, n, p = self._refresh(entry, num, columns, method, version)
+            entry = {"version": version, "columns": columns, "r": r, "n": n, "p": p, "dirty": set()}
+            with self._lock:
+                # An edit or a newer snapshot may have landed meanwhile
+                stored = self._entries.get(method)
+                if self._current(version) and (stored is None or stored["version"] <= version):
+                    self._entries[method] = entry
+            return columns, entry
+        # Uncached request (no version, or an older snapshot than the cache)
+        r, n, p = self._compute(num, list(range(len(columns))), method, None)
+        return columns, {"r": r, "n": n, "p": p}
+
+    @staticmethod
+    def _frame(mat, columns):
+        return pd.DataFrame(mat.copy(), index=columns, columns=columns)
+
+    def _refresh(self, entry, num, columns, method, version):
+        k = len(columns)
+        everything = list(range(k))
+        if entry is None or len(set(columns)) != k:
+            return self._compute(num, everything, method, version)
+        old = {c: i for i, c in enumerate(entry["columns"])}
+        stale = [i for i, c in enumerate(columns) if c not in old or c in entry["dirty"]]
+        if len(stale) > k // 2:
+            return self._compute(num, everything, method, version)
+        take = np.array([old.get(c, 0) for c in columns], dtype=np.int64)
+        out = []
+        for name in ("r", "n", "p"):
+            mat = entry[name]
+            out.append(None if mat is None else mat[np.ix_(take, take)])
+        if stale:
+            fresh = self._compute(num, stale, method, version)
+            for mat, rows in zip(out, fresh):
+                if mat is None or rows is None:
+                    continue
+                mat[stale, :] = rows
+                mat[:, stale] = rows.T
+            if fresh[2] is None:
+                out[2] = None     # Pearson/Spearman p-values are re-derived lazily
+        return tuple(out)
+
+    # ---------- computation ----------
+    def _compute(self, num, rows, method, version):
+        """(r, n, p) of columns ``rows`` against every column; square when ``rows`` is all."""
+        if method == "kendall":
+            return self._kendall(num, rows)
+        if method == "spearman":
+            X, M = self._ranked(num, version)
+        else:
+            X, M = _centred(num.to_numpy(dtype=float))
+        if M.all():
+            M = None
+        r, n = self._blocked(X, M, rows)
+        return r, n, None
+
+    def _blocked(self, X, M, rows):
+        k = X.shape[1]
+        full = len(rows) == k
+        blocks = [rows[i:i + self.block_size] for i in range(0, len(rows), self.block_size)]
+        # For the full matrix each block only needs the columns from its own start
+        # onwards; the lower triangle is mirrored afterwards.
+        targets = [list(range(b[0], k)) if full else list(range(k)) for b in blocks]
+        r_out = np.full((len(rows), k), np.nan)
+        n_out = np.zeros((len(rows), k))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            parts = pool.map(lambda bt: _pearson_block(X, M, *bt), zip(blocks, targets))
+            offset = 0
+            for block, cols, (r, n) in zip(blocks, targets, parts):
+                rows_at = slice(offset, offset + len(block))
+                cols_at = slice(cols[0], cols[0] + len(cols))
+                r_out[rows_at, cols_at] = r
+                n_out[rows_at, cols_at] = n
+                offset += len(block)
+        if full:
+            iu = np.triu_indices(k, 1)
+            r_out[iu[1], iu[0]] = r_out[iu]
+            n_out[iu[1], iu[0]] = n_out[iu]
+        return r_out, n_out
+
+    def _ranked(self, num, version):
+        """Centred rank matrix for Spearman, reusing clean columns of the cached one."""
+        columns = list(num.columns)
+        with self._lock:
+            cache = self._ranks
+            reusable = (
+                self._current(version) and cache is not None and cache["version"] <= version
+                and cache["row_order"] == self._row_order
+            )
+            if reusable and cache["version"] == version and cache["columns"] == columns:
+                return cache["X"], cache["M"]
+            reuse = {}
+            if reusable:
+                reuse = {c: i for i, c in enumerate(cache["columns"]) if c not in cache["dirty"]}
+            row_order = self._row_order
+        # Rank without the lock (see _entry); the cached X/M are never written in place
+        # Column-major so each ranked column is written contiguously
+        X = np.empty(num.shape, order="F")
+        M = np.empty(num.shape, dtype=bool, order="F")
+        todo = []
+        for j, col in enumerate(columns):
+            if col in reuse:
+                X[:, j] = cache["X"][:, reuse[col]]
+                M[:, j] = cache["M"][:, reuse[col]]
+            else:
+                todo.append(j)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            ranked = pool.map(lambda j: _centred_ranks(num.iloc[:, j].to_numpy(dtype=float)), todo)
+            for j, (ranks, ok) in zip(todo, ranked):
+                X[:, j] = ranks
+                M[:, j] = ok
+        with self._lock:
+            stored = self._ranks
+            if self._current(version) and self._row_order == row_order \
+                    and (stored is None or stored["version"] <= version):
+                self._ranks = {"version": version, "columns": columns, "row_order": row_order,
+                               "X": X, "M": M, "dirty": set()}
+        return X, M
+
+    def _kendall(self, num, rows):
+        values = num.to_numpy(dtype=float)
+        if len(values) > self.kendall_rows:
+            rng = np.random.default_rng(0)
+            values = values[np.sort(rng.choice(len(values), self.kendall_rows, replace=False))]
+        k = values.shape[1]
+        full = len(rows) == k
+        pairs = [(a, j) for a, i in enumerate(rows) for j in range(i if full else 0, k)]
+
+        def tau(pair):
+            a, j = pair
+            x, y = values[:, rows[a]], values[:, j]
+            ok = np.isfinite(x) & np.isfinite(y)
+            if ok.sum() < 2:
+                return np.nan, np.nan, ok.sum()
+            res = sp_stats.kendalltau(x[ok], y[ok])
+            return res.statistic, res.pvalue, ok.sum()
+
+        r = np.full((len(rows), k), np.nan)
+        p = np.full((len(rows), k), np.nan)
+        n = np.zeros((len(rows), k))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for (a, j), (t, pv, m) in zip(pairs, pool.map(tau, pairs)):
+                r[a, j], p[a, j], n[a, j] = t, pv, m
+        if full:
+            iu = np.triu_indices(k, 1)
+            for mat in (r, p, n):
+                mat[iu[1], iu[0]] = mat[iu]
+        return r, n, p
+
+    @staticmethod
+    def _t_pvalues(r, n):
+        dof = n - 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = np.abs(r) * np.sqrt(dof / np.maximum(1.0 - r * r, 0.0))
+            p = 2.0 * sp_stats.t.sf(t, dof)
+        p[dof < 1] = np.nan
+        np.fill_diagonal(p, np.nan)
+        return p
+
+
+# Shared by every view; DataCleaningApp marks edited columns dirty.
+CORRELATIONS = CorrelationService()
+
+
+# —————————————————————————————————
+#  HISTOGRAM / BINNING CACHE
+# —————————————————————————————————
+def finite_values(series):
+    """Finite float values of a column (non-numeric entries count as missing)."""
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+class VersionedColumnCache:
+    """
+    Per-column cache entries tagged with the model version they were computed
+    at. ``mark_dirty`` (wired to ``PandasModel.columns_touched``) drops edited
+    columns and records the edit's version; requests for older snapshots are
+    computed by the caller but never cached.
+    """
+    def __init__(self):
+        self._columns = {}    # column -> {"version", ...}
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def mark_dirty(self, columns, version=None):
+        with self._lock:
+            if version is not None:
+                self._floor = max(self._floor, version)
+            if columns is None:
+                self._columns.clear()
+                return
+            for col in columns:
+                self._columns.pop(col, None)
+
+    def reset(self):
+        with self._lock:
+            self._columns.clear()
+
+    def _lookup(self, column, version):
+        """(cacheable, entry) for a request at ``version``; call with the lock held."""
+        entry = self._columns.get(column)
+        cacheable = version is not None and version >= self._floor \
+            and (entry is None or entry["version"] <= version)
+        return cacheable, (entry if cacheable else None)
+
+    def _entry_for(self, column, version):
+        """The entry to store into for ``version``; call with the lock held."""
+        entry = self._columns.get(column)
+        if entry is None or entry["version"] < version:
+            entry = self._columns[column] = {"version": version}
+        return entry
+
+
+class BinningCache(VersionedColumnCache):
+    """
+    Histogram counts shared by every histogram-style view, cached per
+    (column, bins, range) and data version. Each column is binned once on a
+    fine grid over its finite range, so any request over that range whose bin
+    count divides ``fine_bins`` is answered by summing adjacent fine bins
+    instead of rescanning the column.
+    """
+    fine_bins = 4800      # divisible by 10, 12, 15, 16, 20, 24, 25, 30, 40, 50, 60, 64, 75, 100, ...
+
+    finite_values = staticmethod(finite_values)
+
+    def _store(self, column, version, fine, key=None, counts_edges=None):
+        with self._lock:
+            entry = self._entry_for(column, version)
+            entry["fine"] = fine
+            hists = entry.setdefault("hists", {})
+            if key is not None:
+                hists[key] = counts_edges
+
+    def fine_counts(self, df, column, version=None):
+        """``(counts, lo, hi)`` of the column on the fine grid, or None if it has no spread."""
+        with self._lock:
+            cacheable, entry = self._lookup(column, version)
+            if entry is not None and "fine" in entry:
+                return entry["fine"]
+        fine = self._fine(self.finite_values(df[column]))
+        if cacheable:
+            self._store(column, version, fine)
+        return fine
+
+    def histogram(self, df, column, bins=30, range=None, version=None):
+        """``(counts, edges)`` of the finite values of ``df[column]``, like ``np.histogram``."""
+        key = (int(bins), None if range is None else (float(range[0]), float(range[1])))
+        with self._lock:
+            cacheable, entry = self._lookup(column, version)
+            if entry is not None and key in entry.get("hists", {}):
+                counts, edges = entry["hists"][key]
+                return counts.copy(), edges.copy()
+            fine = entry.get("fine") if entry is not None else None
+
+        values = None
+        if fine is None:
+            values = self.finite_values(df[column])
+            fine = self._fine(values)
+        counts_edges = self._from_fine(fine, *key)
+        if counts_edges is None:
+            if values is None:
+                values = self.finite_values(df[column])
+            counts_edges = np.histogram(values, bins=key[0], range=key[1])
+
+        if cacheable:
+            self._store(column, version, fine, key, counts_edges)
+        counts, edges = counts_edges
+        return counts.copy(), edges.copy()
+
+    def _fine(self, values):
+        if values.size == 0:
+            return None
+        lo, hi = float(values.min()), float(values.max())
+        if not hi > lo:
+            return None
+        idx = ((values - lo) * (self.fine_bins / (hi - lo))).astype(np.int64)
+        np.minimum(idx, self.fine_bins - 1, out=idx)
+        return np.bincount(idx, minlength=self.fine_bins), lo, hi
+
+    def _from_fine(self, fine, bins, range):
+        """Sum adjacent fine bins when the request lines up with the fine grid."""
+        if fine is None or self.fine_bins % bins:
+            return None
+        counts, lo, hi = fine
+        if range is not None and (range[0] != lo or range[1] != hi):
+            return None
+        return counts.reshape(bins, -1).sum(axis=1), np.linspace(lo, hi, bins + 1)
+
+
+# Shared by every histogram view; DataCleaningApp marks edited columns dirty.
+COLUMN_BINS = BinningCache()
+
+
+# —————————————————————————————————
+#  BOX-PLOT STATISTICS
+# —————————————————————————————————
+BOX_MAX_FLIERS = 200
+
+
+def _sample_fliers(outliers, max_fliers, seed=0):
+    """At most ``max_fliers`` outliers: both extremes plus a uniform sample of the rest."""
+    if outliers.size <= max_fliers:
+        return outliers
+    rng = np.random.default_rng(seed)
+    keep = np.unique(np.concatenate([
+        [outliers.argmin(), outliers.argmax()],
+        rng.choice(outliers.size, max_fliers - 2, replace=False),
+    ]))
+    return outliers[keep]
+
+
+def _fence_stats(values, q1, med, q3, label, max_fliers):
+    """Whiskers (1.5·IQR rule) and sampled fliers in one vectorized pass over ``values``."""
+    iqr = q3 - q1
+    lo_fence, hi_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    inside = (values >= lo_fence) & (values <= hi_fence)
+    body = values[inside]
+    outliers = values[~inside]
+    n = values.size
+    return dict(
+        label=label, q1=q1, med=med, q3=q3, iqr=iqr, mean=float(values.mean()),
+        whislo=float(body.min()) if body.size else q1,
+        whishi=float(body.max()) if body.size else q3,
+        cilo=med - 1.57 * iqr / np.sqrt(n), cihi=med + 1.57 * iqr / np.sqrt(n),
+        fliers=_sample_fliers(outliers, max_fliers), n=n, n_fliers=int(outliers.size),
+    )
+
+
+def box_stats(values, label=None, max_fliers=BOX_MAX_FLIERS):
+    """
+    ``Axes.bxp``-ready statistics for the finite ``values`` of one column,
+    with exact quartiles (``np.percentile`` partitions rather than sorts). At
+    most ``max_fliers`` outliers are kept (``n_fliers`` holds the true
+    count). None for an empty column.
+    """
+    if values.size == 0:
+        return None
+    q1, med, q3 = np.percentile(values, [25, 50, 75])
+    return _fence_stats(values, float(q1), float(med), float(q3), label, max_fliers)
+
+
+def sketch_box_stats(sketch, moments, label=None, max_fliers=BOX_MAX_FLIERS):
+    """
+    Approximate box statistics for data only seen through a QuantileSketch and
+    RunningMoments (chunk mode). Quartiles come from the sketch; whiskers and
+    fliers from the items it retained, corrected with the exact min/max.
+    """
+    if sketch is None or sketch.n == 0:
+        return None
+    q1, med, q3 = (float(q) for q in sketch.quantiles([0.25, 0.5, 0.75]))
+    st = _fence_stats(np.concatenate(sketch.levels), q1, med, q3, label, max_fliers)
+    iqr = q3 - q1
+    lo_fence, hi_fence = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+    extremes = []
+    if moments.min >= lo_fence:
+        st["whislo"] = moments.min
+    else:
+        extremes.append(moments.min)
+    if moments.max <= hi_fence:
+        st["whishi"] = moments.max
+    else:
+        extremes.append(moments.max)
+    st["fliers"] = np.unique(np.concatenate([st["fliers"], extremes]))
+    st["n_fliers"] = None       # unknown without a full pass
+    st["mean"] = moments.mean
+    st["n"] = moments.count
+    st["cilo"] = med - 1.57 * iqr / np.sqrt(moments.count)
+    st["cihi"] = med + 1.57 * iqr / np.sqrt(moments.count)
+    return st
+
+
+class BoxStatsCache(VersionedColumnCache):
+    """Box-plot statistics per column, cached per data version."""
+
+    def stats(self, df, column, version=None, label=None):
+        with self._lock:
+            cacheable, entry = self._lookup(column, version)
+            st = entry.get("box", False) if entry is not None else False
+        if st is False:
+            st = box_stats(finite_values(df[column]), label=column)
+            if cacheable:
+                with self._lock:
+                    self._entry_for(column, version)["box"] = st
+        if st is None:
+            return None
+        st = dict(st)
+        st["label"] = column if label is None else label
+        return st
+
+
+# Shared by every box plot; DataCleaningApp marks edited columns dirty.
+COLUMN_BOXES = BoxStatsCache()
+
+
+# —————————————————————————————————
+#  TIME-SERIES PYRAMIDS
+# —————————————————————————————————
+
+# Combo label -> aggregation used per screen pixel by TimeSeriesPyramid.view
+TS_AGGREGATES = {"M4 (min/max)": "m4", "Mean": "mean", "Min": "min", "Max": "max"}
+
+
+def time_axis(values):
+    """``(x, is_date)``: matplotlib date numbers for datetime values, floats otherwise."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        index = pd.DatetimeIndex(values)
+        if index.tz is not None:
+            index = index.tz_convert(None)
+        return mdates.date2num(index.to_numpy()), True
+    return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float, na_value=np.nan), False
+
+
+def _reduce_runs(fields, starts):
+    """
+    Summarize the contiguous runs beginning at ``starts`` (first/last point,
+    min/max point, sum, count). ``fields`` is a level of the pyramid or the
+    raw series, whose ``count`` is None (one row per entry).
+    """
+    n = len(fields["ymin"])
+    sizes = np.diff(np.append(starts, n))
+    ends = starts + sizes - 1
+    out = {
+        "xf": fields["xf"][starts], "yf": fields["yf"][starts],
+        "xl": fields["xl"][ends], "yl": fields["yl"][ends],
+        "sum": np.add.reduceat(fields["sum"], starts),
+        "count": sizes if fields["count"] is None else np.add.reduceat(fields["count"], starts),
+    }
+    for key, ufunc in (("min", np.minimum), ("max", np.maximum)):
+        y = fields["y" + key]
+        best = ufunc.reduceat(y, starts)
+        hits = np.flatnonzero(y == np.repeat(best, sizes))
+        at = hits[np.searchsorted(hits, starts)]      # first extreme of each run
+        out["y" + key] = best
+        out["x" + key] = fields["x" + key][at]
+    return out
+
+
+class TimeSeriesPyramid:
+    """
+    Multi-resolution summary of one series sorted by x. Level ``k`` holds
+    runs of ``leaf * factor**k`` rows reduced to their first, last, minimum
+    and maximum points plus their sum, so any window is decimated from the
+    coarsest level that still has a couple of runs per pixel instead of from
+    the raw rows.
+    """
+    leaf = 64
+    factor = 4
+    top = 1024          # stop adding levels once one has this few runs
+    raw_per_pixel = 4   # windows this sparse are drawn from the raw rows
+
+    def __init__(self, x, y, is_date=False):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        ok = np.isfinite(x) & np.isfinite(y)
+        x, y = x[ok], y[ok]
+        if x.size > 1 and np.any(x[1:] < x[:-1]):
+            order = np.argsort(x, kind="stable")
+            x, y = x[order], y[order]
+        self.x, self.y, self.is_date = x, y, is_date
+        self.levels = []    # (rows per run, fields)
+        fields, size = self._raw(), 1
+        while len(fields["ymin"]) > self.top:
+            step = self.leaf if size == 1 else self.factor
+            fields = _reduce_runs(fields, np.arange(0, len(fields["ymin"]), step))
+            size *= step
+            self.levels.append((size, fields))
+
+    def __len__(self):
+        return self.x.size
+
+    def _raw(self):
+        x, y = self.x, self.y
+        return dict(xf=x, yf=y, xl=x, yl=y, xmin=x, ymin=y, xmax=x, ymax=y, sum=y, count=None)
+
+    def view(self, x0, x1, pixels, agg="m4"):
+        """
+        ``(x, y)`` vertices for the window ``[x0, x1]`` drawn ``pixels`` wide:
+        every row when the window is sparse, otherwise one bucket per pixel
+        reduced to its first/min/max/last points (``"m4"``) or to its
+        ``"mean"``, ``"min"`` or ``"max"``. One row beyond each edge is kept
+        so the line runs off the axes.
+        """
+        x = self.x
+        i0 = max(int(np.searchsorted(x, x0, "left")) - 1, 0)
+        i1 = min(int(np.searchsorted(x, x1, "right")) + 1, x.size)
+        pixels = max(int(pixels), 1)
+        if i1 - i0 <= self.raw_per_pixel * pixels:
+            return x[i0:i1], self.y[i0:i1]
+
+        fields, lo, hi = self._raw(), i0, i1
+        for size, level in reversed(self.levels):
+            b0, b1 = i0 // size, -(-i1 // size)
+            if b1 - b0 >= 2 * pixels:
+                fields, lo, hi = level, b0, b1
+                break
+        part = {k: (v[lo:hi] if v is not None else None) for k, v in fields.items()}
+        edges = np.linspace(x[i0], x[i1 - 1], pixels + 1)[1:-1]
+        starts = np.unique(np.append(0, np.searchsorted(part["xf"], edges, "left")))
+        runs = _reduce_runs(part, starts[starts < hi - lo])
+
+        if agg == "mean":
+            return (runs["xf"] + runs["xl"]) / 2, runs["sum"] / runs["count"]
+        if agg in ("min", "max"):
+            return runs["x" + agg], runs["y" + agg]
+        xs = np.column_stack([runs["xf"], runs["xmin"], runs["xmax"], runs["xl"]])
+        ys = np.column_stack([runs["yf"], runs["ymin"], runs["ymax"], runs["yl"]])
+        order = np.argsort(xs, axis=1, kind="stable")
+        return np.take_along_axis(xs, order, 1).ravel(), np.take_along_axis(ys, order, 1).ravel()
+
+
+class TimeSeriesCache(VersionedColumnCache):
+    """
+    Pyramids per (value column, x column) and data version; ``x=None`` means
+    the frame's index. Editing either column drops the pyramid; reordering
+    the rows drops the index-based ones (an x column moves with its values).
+    """
+    def mark_dirty(self, columns, version=None):
+        super().mark_dirty(columns, version)
+        if columns is None:
+            return
+        with self._lock:
+            for entry in self._columns.values():
+                for col in columns:
+                    entry.get("pyramids", {}).pop(col, None)
+
+    def mark_reordered(self, version):
+        """Rows were reordered at ``version`` (wired to ``PandasModel.rows_reordered``)."""
+        with self._lock:
+            self._floor = max(self._floor, version)
+            for entry in self._columns.values():
+                entry.get("pyramids", {}).pop(None, None)
+
+    def pyramid(self, df, column, x=None, version=None):
+        with self._lock:
+            cacheable, entry = self._lookup(column, version)
+            if entry is not None and x in entry.get("pyramids", {}):
+                return entry["pyramids"][x]
+        xs, is_date = time_axis(df.index if x is None else df[x])
+        ys = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        pyramid = TimeSeriesPyramid(xs, ys, is_date)
+        if cacheable:
+            with self._lock:
+                self._entry_for(column, version).setdefault("pyramids", {})[x] = pyramid
+        return pyramid
+
+
+# Shared by the time-series plots; DataCleaningApp marks edited columns dirty.
+COLUMN_SERIES = TimeSeriesCache()
+
+
 # ─────────────────────────────────────────────────────────
 # SettingsDialog: combined “Settings” + keyboard shortcuts + help
 # ─────────────────────────────────────────────────────────
@@ -904,15 +2040,1052 @@ class ConditionalDialog(QDialog):
         )
 
 
+# —————————————————————————————————
+#  PLOTTING HELPERS
+# —————————————————————————————————
+
+def _density_grid(x, y, xlim, ylim, nx, ny):
+    """Point counts on an ny×nx grid spanning xlim × ylim (row 0 = ylim[0])."""
+    x0, x1 = xlim
+    y0, y1 = ylim
+    if not (x1 > x0 and y1 > y0):
+        return np.zeros((ny, nx))
+    inside = (x >= x0) & (x <= x1) & (y >= y0) & (y <= y1)
+    ix = np.minimum(((x[inside] - x0) * (nx / (x1 - x0))).astype(np.int64), nx - 1)
+    iy = np.minimum(((y[inside] - y0) * (ny / (y1 - y0))).astype(np.int64), ny - 1)
+    counts = np.bincount(iy * nx + ix, minlength=nx * ny)
+    return counts.reshape(ny, nx).astype(float)
+
+
+def _padded_limits(lo, hi, frac=0.05):
+    span = hi - lo
+    pad = span * frac if span > 0 else (abs(lo) * frac or 1.0)
+    return lo - pad, hi + pad
+
+
+def binned_quantiles(counts, lo, hi, qs):
+    """Quantiles of equal-width binned data, interpolating linearly inside bins."""
+    counts = np.asarray(counts, dtype=float)
+    cdf = np.concatenate([[0.0], np.cumsum(counts)])
+    edges = np.linspace(lo, hi, counts.size + 1)
+    return np.interp(np.asarray(qs) * cdf[-1], cdf, edges)
+
+
+def kde_bandwidth(counts, lo, hi, method="scott"):
+    """Gaussian bandwidth from binned counts (Scott's rule, or Silverman's robust rule)."""
+    counts = np.asarray(counts, dtype=float)
+    n = counts.sum()
+    if n < 2:
+        return (hi - lo) or 1.0
+    dx = (hi - lo) / counts.size
+    centers = lo + (np.arange(counts.size) + 0.5) * dx
+    mean = (counts * centers).sum() / n
+    std = np.sqrt((counts * (centers - mean) ** 2).sum() / (n - 1))
+    if method == "silverman":
+        q25, q75 = binned_quantiles(counts, lo, hi, [0.25, 0.75])
+        spread = min(std, (q75 - q25) / 1.349) or std
+        bw = 0.9 * spread * n ** -0.2
+    else:
+        bw = std * n ** -0.2
+    return max(bw, dx)
+
+
+def fft_kde(counts, lo, hi, bw=None, cut=3.0, points=512, method="scott"):
+    """
+    Gaussian KDE of binned data by FFT convolution, O(m log m) in the bin count
+    instead of O(n · grid). ``counts`` may be 2-D (one row per group); ``bw`` is
+    then chosen per row unless given. The curve extends ``cut`` bandwidths past
+    [lo, hi] and is resampled to ``points`` x positions. Returns ``(x, density)``
+    with density shaped like ``counts`` (rows integrate to 1).
+    """
+    counts = np.atleast_2d(np.asarray(counts, dtype=float))
+    g, m = counts.shape
+    dx = (hi - lo) / m
+    if bw is None:
+        bw = np.array([kde_bandwidth(row, lo, hi, method) for row in counts])
+    bw = np.broadcast_to(np.asarray(bw, dtype=float), (g,)).copy()
+
+    # Bins far finer than the kernel add FFT work without changing the curve.
+    factor = int(bw.min() / dx // 20)
+    if factor > 1:
+        extra = (-m) % factor
+        counts = np.pad(counts, ((0, 0), (0, extra))).reshape(g, -1, factor).sum(axis=2)
+        hi = lo + (m + extra) * dx
+        m, dx = counts.shape[1], dx * factor
+
+    pad = int(np.ceil(cut * bw.max() / dx))
+    guard = int(np.ceil(4.0 * bw.max() / dx))     # keeps circular wrap-around out of view
+    span = m + 2 * pad
+    size = int(sp_fft.next_fast_len(span + guard))
+    grid = np.zeros((g, size))
+    grid[:, pad:pad + m] = counts
+    freqs = np.fft.rfftfreq(size, d=dx)
+    kernel = np.exp(-0.5 * (2.0 * np.pi * freqs[None, :] * bw[:, None]) ** 2)
+    smooth = np.fft.irfft(np.fft.rfft(grid, axis=1) * kernel, n=size, axis=1)[:, :span]
+
+    totals = counts.sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dens = np.clip(smooth, 0.0, None) / (totals * dx)
+    dens[totals[:, 0] == 0] = 0.0
+    x_bins = lo + (np.arange(span) - pad + 0.5) * dx
+    x = np.linspace(x_bins[0], x_bins[-1], points)
+    dens = np.vstack([np.interp(x, x_bins, row) for row in dens])
+    return x, (dens[0] if g == 1 else dens)
+
+
+def column_density(df, column, version=None, cut=3.0, points=512):
+    """FFT KDE of one column from the shared fine binning; None for constant/empty columns."""
+    fine = COLUMN_BINS.fine_counts(df, column, version)
+    if fine is None:
+        return None
+    counts, lo, hi = fine
+    return fft_kde(counts, lo, hi, cut=cut, points=points)
+
+
+def grouped_densities(values, groups, bins=1024, cut=3.0, points=512):
+    """
+    Per-group FFT KDEs on a shared x grid. All groups are binned in a single
+    bincount pass and convolved in one batched FFT.
+    Returns ``(labels, x, densities)`` with one density row per label.
+    """
+    values = np.asarray(values, dtype=float)
+    codes, labels = pd.factorize(pd.Series(groups), sort=True)
+    ok = np.isfinite(values) & (codes >= 0)
+    values, codes = values[ok], codes[ok]
+    if values.size == 0:
+        return [], None, None
+    lo, hi = float(values.min()), float(values.max())
+    if not hi > lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    idx = np.minimum(((values - lo) * (bins / (hi - lo))).astype(np.int64), bins - 1)
+    counts = np.bincount(codes * bins + idx, minlength=len(labels) * bins).reshape(len(labels), bins)
+    x, dens = fft_kde(counts, lo, hi, cut=cut, points=points)
+    return list(labels), x, np.atleast_2d(dens)
+
+
+def draw_violins(ax, columns_fine, positions=None, color="#008CBA", width=0.8, showmeans=True):
+    """
+    Violins drawn from binned densities (clipped to each column's data range),
+    with a median marker, an interquartile bar and, optionally, the mean.
+    ``columns_fine`` is a list of fine-grid tuples ``(counts, lo, hi)`` or None.
+    """
+    positions = list(range(1, len(columns_fine) + 1)) if positions is None else positions
+    for pos, fine in zip(positions, columns_fine):
+        if fine is None:
+            continue
+        counts, lo, hi = fine
+        x, dens = fft_kde(counts, lo, hi, cut=0.0, points=256)
+        half = dens / dens.max() * (width / 2) if dens.max() > 0 else dens
+        ax.fill_betweenx(x, pos - half, pos + half, color=color, alpha=0.45, linewidth=1,
+                         edgecolor=color)
+        q25, q50, q75 = binned_quantiles(counts, lo, hi, [0.25, 0.5, 0.75])
+        ax.vlines(pos, q25, q75, color="#333333", linewidth=4)
+        ax.scatter([pos], [q50], color="white", zorder=3, s=14)
+        ax.hlines([lo, hi], pos - width / 8, pos + width / 8, color=color)
+        if showmeans:
+            dx = (hi - lo) / counts.size
+            mean = (counts * (lo + (np.arange(counts.size) + 0.5) * dx)).sum() / counts.sum()
+            ax.hlines(mean, pos - width / 4, pos + width / 4, color="#C0392B")
+
+
+class ArtistLayer:
+    """
+    Keeps the artists of one Axes alive between redraws.
+    The first call with a key creates an (animated) artist; later calls only
+    swap its data. ``draw`` re-runs tight_layout only when the labels changed
+    and does a full canvas draw only when labels, limits, legend or the set of
+    artists changed; otherwise it restores the cached background and blits
+    the managed artists.
+    """
+    def __init__(self, ax):
+        self.ax = ax
+        self.canvas = ax.figure.canvas
+        self.artists = {}
+        self.proxies = {}    # key -> legend handle for artists a legend cannot draw (images)
+        self._labels = None
+        self._limits = None
+        self._legend_keys = None
+        self._background = None
+        self._relayout = True
+        self._full = True
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+
+    # ---------- artists ----------
+    def _add(self, key, artist):
+        artist.set_animated(True)
+        self.artists[key] = artist
+        self._full = True
+        return artist
+
+    def _get(self, key):
+        art = self.artists.get(key)
+        if art is not None:
+            art.set_visible(True)
+        return art
+
+    def scatter(self, key, x, y, **kw):
+        art = self._get(key)
+        if art is None:
+            return self._add(key, self.ax.scatter(x, y, **kw))
+        art.set_offsets(np.column_stack([x, y]))
+        if "s" in kw:
+            art.set_sizes(np.atleast_1d(kw.pop("s")))
+        art.update(kw)
+        return art
+
+    def line(self, key, x, y, **kw):
+        art = self._get(key)
+        if art is None:
+            return self._add(key, self.ax.plot(x, y, **kw)[0])
+        art.set_data(x, y)
+        art.update(kw)
+        return art
+
+    def bars(self, key, edges, heights, **kw):
+        """Histogram-style bars; rectangles are resized in place when the bin count is unchanged."""
+        art = self._get(key)
+        widths = np.diff(edges)
+        if art is None or len(art.patches) != len(heights):
+            self.replace(key, [])
+            container = self.ax.bar(edges[:-1], heights, width=widths, align="edge", **kw)
+            return self._add(key, _ArtistGroup(container.patches))
+        for rect, left, width, h in zip(art.patches, edges[:-1], widths, heights):
+            rect.set_x(left)
+            rect.set_width(width)
+            rect.set_height(h)
+        return art
+
+    def image(self, key, data, **kw):
+        art = self._get(key)
+        if art is None:
+            return self._add(key, self.ax.imshow(data, **kw))
+        art.set_data(data)
+        return art
+
+    def text(self, key, x, y, s, **kw):
+        art = self._get(key)
+        if art is None:
+            return self._add(key, self.ax.text(x, y, s, **kw))
+        art.set_position((x, y))
+        art.set_text(s)
+        return art
+
+    def replace(self, key, artists):
+        """Swap a group of artists that cannot be updated in place (box plots, bands)."""
+        old = self.artists.pop(key, None)
+        if old is not None:
+            old.remove()
+        if artists:
+            self._add(key, _ArtistGroup(artists))
+        self._full = True
+
+    def hide(self, *keys):
+        for key in keys:
+            art = self.artists.get(key)
+            if art is not None and art.get_visible():
+                art.set_visible(False)
+
+    # ---------- decorations ----------
+    def set_labels(self, title, xlabel, ylabel, **text_kw):
+        labels = (title, xlabel, ylabel)
+        if labels != self._labels:
+            self.ax.set_title(title, **text_kw)
+            self.ax.set_xlabel(xlabel, **text_kw)
+            self.ax.set_ylabel(ylabel, **text_kw)
+            self._labels = labels
+            self._relayout = self._full = True
+
+    def set_limits(self, xlim=None, ylim=None):
+        limits = (tuple(xlim) if xlim is not None else None, tuple(ylim) if ylim is not None else None)
+        if limits != self._limits:
+            if xlim is not None:
+                self.ax.set_xlim(xlim)
+            if ylim is not None:
+                self.ax.set_ylim(ylim)
+            self._limits = limits
+            self._full = True
+
+    def legend(self, **kw):
+        handles = [
+            (key, art) for key, art in self.artists.items()
+            if art.get_visible() and not isinstance(art, _ArtistGroup)
+            and art.get_label() and not art.get_label().startswith("_")
+        ]
+        keys = tuple((k, a.get_label()) for k, a in handles)
+        if keys != self._legend_keys:
+            old = self.ax.get_legend()
+            if old is not None:
+                old.remove()
+            if handles:
+                self.ax.legend(handles=[self.proxies.get(k, a) for k, a in handles], **kw)
+            self._legend_keys = keys
+            self._full = True
+
+    # ---------- drawing ----------
+    def _animated(self):
+        return sorted(
+            (a for a in self.ax.get_children() if a.get_animated() and a.get_visible()),
+            key=lambda a: a.get_zorder(),
+        )
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.ax.figure.bbox)
+        for art in self._animated():
+            self.ax.draw_artist(art)
+
+    def draw(self):
+        if self._relayout:
+            self.ax.figure.tight_layout()
+            self._relayout = False
+        if self._full or self._background is None:
+            self._full = False
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._background)
+        for art in self._animated():
+            self.ax.draw_artist(art)
+        self.canvas.blit(self.ax.figure.bbox)
+
+    def savefig(self, *args, **kwargs):
+        """savefig skips animated artists, so un-animate them for the export."""
+        arts = [a for a in self.ax.get_children() if a.get_animated()]
+        for a in arts:
+            a.set_animated(False)
+        try:
+            self.ax.figure.savefig(*args, **kwargs)
+        finally:
+            for a in arts:
+                a.set_animated(True)
+            self._full = True
+            self.draw()
+
+
+class _ArtistGroup:
+    """Minimal artist-like wrapper so ArtistLayer can manage lists of artists as one key."""
+    def __init__(self, artists):
+        self.patches = list(artists)
+
+    def set_animated(self, flag):
+        for a in self.patches:
+            a.set_animated(flag)
+
+    def set_visible(self, flag):
+        for a in self.patches:
+            a.set_visible(flag)
+
+    def get_visible(self):
+        return any(a.get_visible() for a in self.patches)
+
+    def remove(self):
+        for a in self.patches:
+            a.remove()
+
+
+class ScatterLOD:
+    """
+    Level-of-detail scatter drawn through an ArtistLayer.
+    Up to ``max_points`` points are drawn as a regular scatter. Larger data is
+    rasterized into a per-pixel density image of the visible window, which is
+    re-binned (debounced) whenever the view is zoomed or panned.
+    """
+    max_points = 50_000
+    rebin_delay_ms = 80
+
+    def __init__(self, layer):
+        self.layer = layer
+        self.ax = layer.ax
+        self.x = self.y = np.empty(0)
+        self._timer = None
+        self.ax.callbacks.connect("xlim_changed", self._schedule_rebin)
+        self.ax.callbacks.connect("ylim_changed", self._schedule_rebin)
+
+    @property
+    def dense(self):
+        return self.x.size > self.max_points
+
+    def draw(self, x, y, facecolor="#008CBA", **scatter_kw):
+        """Update the plot with x/y at the right level of detail and return the view limits."""
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        if self.x.size:
+            xlim = _padded_limits(float(self.x.min()), float(self.x.max()))
+            ylim = _padded_limits(float(self.y.min()), float(self.y.max()))
+        else:
+            xlim, ylim = (0.0, 1.0), (0.0, 1.0)
+        if not self.dense:
+            self.layer.hide("density")
+            self.layer.scatter("points", self.x, self.y, facecolor=facecolor, **scatter_kw)
+            return xlim, ylim
+
+        self.layer.hide("points")
+        image = self.layer.image(
+            "density", np.ma.masked_all((2, 2)), extent=(*xlim, *ylim), origin="lower",
+            aspect="auto", interpolation="nearest", norm=LogNorm(), zorder=1,
+        )
+        cmap = LinearSegmentedColormap.from_list("lod", ["#CCE8F4", facecolor])
+        cmap.set_bad(alpha=0.0)
+        image.set_cmap(cmap)
+        # Keep the scatter's legend entry: legends cannot draw images, so a marker stands in
+        label = scatter_kw.get("label")
+        image.set_label(label or "_nolegend_")
+        if label:
+            self.layer.proxies["density"] = Line2D(
+                [], [], linestyle="none", marker="o", markerfacecolor=facecolor,
+                markeredgecolor=scatter_kw.get("edgecolor", facecolor), label=label,
+            )
+        self._rebin(xlim, ylim)
+        return xlim, ylim
+
+    def _schedule_rebin(self, _ax=None):
+        if not self.dense:
+            return
+        if self._timer is None:
+            self._timer = self.ax.figure.canvas.new_timer(interval=self.rebin_delay_ms)
+            self._timer.single_shot = True
+            self._timer.add_callback(self._on_timer)
+        self._timer.stop()
+        self._timer.start()
+
+    def _on_timer(self):
+        if self.dense:
+            self._rebin()
+            self.layer.draw()
+
+    def _rebin(self, xlim=None, ylim=None):
+        xlim = tuple(sorted(xlim or self.ax.get_xlim()))
+        ylim = tuple(sorted(ylim or self.ax.get_ylim()))
+        # One cell per screen pixel of the axes
+        nx = int(np.clip(self.ax.bbox.width, 64, 1024))
+        ny = int(np.clip(self.ax.bbox.height, 64, 1024))
+        counts = _density_grid(self.x, self.y, xlim, ylim, nx, ny)
+        image = self.layer.artists["density"]
+        image.set_data(np.ma.masked_equal(counts, 0.0))
+        image.set_extent((*xlim, *ylim))
+        image.set_clim(1.0, max(counts.max(), 1.0))
+
+
+class TimeSeriesLOD:
+    """
+    Line for one TimeSeriesPyramid. The visible window is decimated to a few
+    vertices per screen pixel, and decimated again (debounced) whenever the
+    x-range changes, so zooming in brings back detail down to the raw rows.
+    """
+    redraw_delay_ms = 80
+
+    def __init__(self, ax, pyramid, agg="m4", **line_kw):
+        self.ax = ax
+        self.pyramid = pyramid
+        self.agg = agg
+        self._timer = None
+        if len(pyramid):
+            x, y = pyramid.view(pyramid.x[0], pyramid.x[-1], ax.bbox.width, agg)
+        else:
+            x = y = np.empty(0)
+        self.line, = ax.plot(x, y, **line_kw)
+        if pyramid.is_date:
+            ax.xaxis_date()
+        ax.callbacks.connect("xlim_changed", lambda _ax: self._schedule())
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = self.ax.figure.canvas.new_timer(interval=self.redraw_delay_ms)
+            self._timer.single_shot = True
+            self._timer.add_callback(self._update)
+        self._timer.stop()
+        self._timer.start()
+
+    def _update(self):
+        if self.line.axes is None or not len(self.pyramid):
+            return      # figure cleared meanwhile
+        x0, x1 = sorted(self.ax.get_xlim())
+        self.line.set_data(*self.pyramid.view(x0, x1, self.ax.bbox.width, self.agg))
+        self.ax.figure.canvas.draw_idle()
+
+
+class ScrollZoom:
+    """
+    Mouse-wheel zoom of the x range around the cursor, for canvases without a
+    navigation toolbar. Pooled canvases must be ``disconnect``-ed before reuse.
+    """
+    factor = 1.25
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.cid = canvas.mpl_connect("scroll_event", self._on_scroll)
+
+    def _on_scroll(self, event):
+        ax = event.inaxes
+        if ax is None or event.xdata is None:
+            return
+        scale = 1.0 / self.factor if event.button == "up" else self.factor
+        x0, x1 = ax.get_xlim()
+        c = event.xdata
+        ax.set_xlim(c - (c - x0) * scale, c + (x1 - c) * scale)
+        self.canvas.draw_idle()
+
+    def disconnect(self):
+        if self.cid is not None:
+            self.canvas.mpl_disconnect(self.cid)
+            self.cid = None
+
+
+def draw_time_series(ax, df, columns, x=None, version=None, agg="m4", **line_kw):
+    """One decimated line per column against ``df[x]`` (or the index); returns the TimeSeriesLODs."""
+    return [
+        TimeSeriesLOD(ax, COLUMN_SERIES.pyramid(df, col, x, version), agg, label=col, **line_kw)
+        for col in columns
+    ]
+
+
+def render_figure(build, figsize=(7, 5), dpi=100):
+    """
+    Build a pyplot-free Agg figure with ``build(fig)`` and rasterize it.
+    Safe to call from worker threads; returns an (h, w, 4) RGBA uint8 array.
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    build(fig)
+    try:
+        fig.tight_layout()
+    except Exception:
+        pass
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def save_built_figure(build, file_name, figsize=(7, 5), dpi=None, **savefig_kw):
+    """Build a fresh figure with ``build(fig)`` and write it straight to ``file_name``."""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    build(fig)
+    fig.savefig(file_name, dpi=dpi, **savefig_kw)
+    return file_name
+
+
+class RenderedFigureView(QWidget):
+    """
+    Shows figures that are built and rasterized on the thread pool.
+    The previous image stays visible, with a spinner, while a new one renders;
+    results of superseded requests are discarded. Resizing re-renders at the
+    new size once the user stops dragging.
+    """
+    SPINNER = "◐◓◑◒"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._request = 0
+        self._build = None
+        self._pixmap = None
+        self._frame = 0
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignCenter)
+        self.image_label.setMinimumSize(200, 150)
+        self.image_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        layout.addWidget(self.image_label)
+
+        self.spinner = QLabel(self)
+        self.spinner.setStyleSheet(
+            "background: rgba(0, 0, 0, 140); color: #FFFFFF; border-radius: 4px; padding: 2px 8px;"
+        )
+        self.spinner.hide()
+        self._spin_timer = QTimer(self)
+        self._spin_timer.setInterval(120)
+        self._spin_timer.timeout.connect(self._spin)
+
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(300)
+        self._resize_timer.timeout.connect(self._rerender)
+
+    def render(self, build):
+        """Render ``build(fig)`` off the GUI thread at the current widget size."""
+        self._build = build
+        self._request += 1
+        request = self._request
+        w = max(self.image_label.width(), 400)
+        h = max(self.image_label.height(), 300)
+        self._show_spinner(True)
+        worker = Worker(render_figure, build, (w / 100.0, h / 100.0), 100)
+        worker.signals.finished.connect(lambda rgba, r=request: self._on_rendered(rgba, r))
+        worker.signals.error.connect(lambda tb, r=request: self._on_failed(tb, r))
+        worker.start()
+
+    def clear(self):
+        """Drop the image and ignore any render still in flight."""
+        self._request += 1
+        self._build = None
+        self._pixmap = None
+        self._resize_timer.stop()
+        self._show_spinner(False)
+        self.image_label.clear()
+
+    def _on_rendered(self, rgba, request):
+        if request != self._request:
+            return
+        h, w = rgba.shape[:2]
+        image = QImage(rgba.data, w, h, 4 * w, QImage.Format_RGBA8888).copy()
+        self._pixmap = QPixmap.fromImage(image)
+        self._show_pixmap()
+        self._show_spinner(False)
+
+    def _on_failed(self, tb, request):
+        if request != self._request:
+            return
+        self._show_spinner(False)
+        self.image_label.setText(f"Render error:\n{tb.strip().splitlines()[-1]}")
+
+    def _show_pixmap(self):
+        if self._pixmap is not None:
+            self.image_label.setPixmap(self._pixmap.scaled(
+                self.image_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
+            ))
+
+    def _show_spinner(self, on):
+        if on:
+            self._spin()
+            self.spinner.show()
+            self.spinner.raise_()
+            self._spin_timer.start()
+        else:
+            self._spin_timer.stop()
+            self.spinner.hide()
+
+    def _spin(self):
+        self._frame = (self._frame + 1) % len(self.SPINNER)
+        self.spinner.setText(f"{self.SPINNER[self._frame]} Rendering…")
+        self.spinner.adjustSize()
+        self.spinner.move(self.width() - self.spinner.width() - 8, 8)
+
+    def _rerender(self):
+        if self._build is None or self._pixmap is None:
+            return
+        size = self._pixmap.size()
+        if abs(size.width() - self.image_label.width()) > 0.1 * size.width() or \
+                abs(size.height() - self.image_label.height()) > 0.1 * size.height():
+            self.render(self._build)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._show_pixmap()
+        self._resize_timer.start()
+
+
+class CanvasPool(QObject):
+    """
+    Owns the Qt canvases used by plot tabs. Figures are plain ``Figure``
+    objects, never registered with pyplot, so nothing keeps them alive once
+    released. Released canvases are cleared and kept for reuse (up to
+    ``max_idle``); the rest are closed. ``changed(open, bytes)`` reports the
+    number of figures in use and an estimate of their raster memory.
+    """
+    changed = pyqtSignal(int, int)
+    max_idle = 4
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._idle = []
+        self._live = set()
+
+    def acquire(self, figsize=(7, 5)):
+        canvas = self._idle.pop() if self._idle else FigureCanvas(Figure(figsize=figsize))
+        canvas.figure.set_size_inches(*figsize)
+        self._live.add(canvas)
+        self._emit()
+        return canvas
+
+    def release(self, canvas):
+        if canvas not in self._live:
+            return
+        self._live.discard(canvas)
+        canvas.figure.clear()
+        canvas.setParent(None)
+        if len(self._idle) < self.max_idle:
+            self._idle.append(canvas)
+        else:
+            canvas.close()
+            canvas.deleteLater()
+        self._emit()
+
+    @property
+    def open_figures(self):
+        return len(self._live)
+
+    def memory_bytes(self):
+        """RGBA render buffers of every live and idle canvas."""
+        total = 0
+        for canvas in list(self._live) + self._idle:
+            bbox = canvas.figure.bbox
+            total += int(bbox.width * bbox.height) * 4
+        return total
+
+    def _emit(self):
+        self.changed.emit(self.open_figures, self.memory_bytes())
+
+
+class PlotTab(QWidget):
+    """
+    Tab page owning one pooled canvas or one RenderedFigureView.
+    ``release`` gives the figure back; tab widgets call it when the tab is
+    closed or its detached window goes away.
+    """
+    def __init__(self, pool=None, parent=None):
+        super().__init__(parent)
+        self.pool = pool or CanvasPool.shared()
+        self.canvas = None
+        self.view = None
+        self.zoom = None    # ScrollZoom on the canvas, for time series
+        self.spec = None    # plot description, used by "Export All"
+        QVBoxLayout(self)
+
+    def use_canvas(self, figsize=(7, 5)):
+        self.canvas = self.pool.acquire(figsize)
+        self.layout().addWidget(self.canvas)
+        return self.canvas
+
+    def use_view(self):
+        self.view = RenderedFigureView()
+        self.layout().addWidget(self.view)
+        return self.view
+
+    def enable_scroll_zoom(self):
+        if self.zoom is None and self.canvas is not None:
+            self.zoom = ScrollZoom(self.canvas)
+
+    def release(self):
+        if self.zoom is not None:
+            self.zoom.disconnect()
+            self.zoom = None
+        if self.canvas is not None:
+            self.pool.release(self.canvas)
+            self.canvas = None
+        if self.view is not None:
+            self.view.clear()
+
+
+class PairPlotEngine:
+    """
+    Scatter matrix that stays cheap on wide and long frames.
+    At most ``max_columns`` columns are drawn. Off-diagonal panels show a shared
+    random row sample, or a 2-D density image once the frame is longer than
+    ``density_rows``. Diagonal histograms come from the shared ``COLUMN_BINS``
+    cache and are memoised for the lifetime of the engine. Panels are
+    computed in parallel; ``build(fig, columns)`` is safe to hand to
+    ``render_figure``.
+    """
+    max_columns = 6
+    max_points = 5_000
+    density_rows = 50_000
+    bins = 30
+    grid = 80
+
+    def __init__(self, df, version=None, max_workers=None):
+        self.df = df
+        self.version = version
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self._bins = {}       # column -> (counts, edges)
+        self._sample = None   # row positions shared by every scatter panel
+
+    def _values(self, col):
+        return pd.to_numeric(self.df[col], errors="coerce").to_numpy(dtype=float)
+
+    def histogram(self, col):
+        hit = self._bins.get(col)
+        if hit is None:
+            hit = COLUMN_BINS.histogram(self.df, col, self.bins, version=self.version)
+            self._bins[col] = hit
+        return hit
+
+    @property
+    def dense(self):
+        return len(self.df) > self.density_rows
+
+    def _rows(self):
+        if self._sample is None:
+            n = len(self.df)
+            if n > self.max_points:
+                rng = np.random.default_rng(0)
+                self._sample = np.sort(rng.choice(n, self.max_points, replace=False))
+            else:
+                self._sample = np.arange(n)
+        return self._sample
+
+    def _panel(self, xcol, ycol):
+        ex, ey = self.histogram(xcol)[1], self.histogram(ycol)[1]
+        xlim, ylim = (ex[0], ex[-1]), (ey[0], ey[-1])
+        x, y = self._values(xcol), self._values(ycol)
+        if self.dense:
+            return "density", _density_grid(x, y, xlim, ylim, self.grid, self.grid), xlim, ylim
+        rows = self._rows()
+        x, y = x[rows], y[rows]
+        ok = np.isfinite(x) & np.isfinite(y)
+        return "points", (x[ok], y[ok]), xlim, ylim
+
+    def compute(self, columns):
+        """Diagonal histograms and lower-triangle panels for ``columns``, in parallel."""
+        columns = list(columns)[:self.max_columns]
+        pairs = [(columns[j], columns[i]) for i in range(len(columns)) for j in range(i)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            hists = dict(zip(columns, pool.map(self.histogram, columns)))
+            panels = dict(zip(pairs, pool.map(lambda p: self._panel(*p), pairs)))
+        return columns, hists, panels
+
+    def build(self, fig, columns):
+        columns, hists, panels = self.compute(columns)
+        k = len(columns)
+        if k < 2:
+            ax = fig.subplots()
+            ax.set_axis_off()
+            ax.text(0.5, 0.5, "Select at least two numeric columns", ha="center", va="center")
+            return
+        axes = fig.subplots(k, k, squeeze=False)
+        for i, ycol in enumerate(columns):
+            for j, xcol in enumerate(columns):
+                ax = axes[i][j]
+                if i == j:
+                    counts, edges = hists[xcol]
+                    ax.stairs(counts, edges, fill=True, color="#008CBA", alpha=0.8)
+                else:
+                    kind, data, xlim, ylim = (panels[(xcol, ycol)] if j < i else
+                                              self._mirror(panels[(ycol, xcol)]))
+                    if kind == "density":
+                        ax.imshow(np.log1p(data), origin="lower", aspect="auto", cmap="Blues",
+                                  extent=(*xlim, *ylim), interpolation="nearest")
+                    else:
+                        ax.scatter(data[0], data[1], s=3, alpha=0.5, color="#008CBA",
+                                   linewidths=0, rasterized=True)
+                    ax.set_xlim(xlim)
+                    ax.set_ylim(ylim)
+                ax.tick_params(labelsize=6)
+                if i < k - 1:
+                    ax.set_xticklabels([])
+                else:
+                    ax.set_xlabel(xcol, fontsize=8)
+                if j > 0:
+                    ax.set_yticklabels([])
+                else:
+                    ax.set_ylabel(ycol, fontsize=8)
+        note = "density" if self.dense else f"sample of {len(self._rows()):,} rows"
+        fig.suptitle(f"Pair Plot ({note})")
+
+    @staticmethod
+    def _mirror(panel):
+        kind, data, xlim, ylim = panel
+        data = data.T if kind == "density" else (data[1], data[0])
+        return kind, data, ylim, xlim
+
+
+# —————————————————————————————————
+#  FIGURE EXPORT
+# —————————————————————————————————
+
+EXPORT_DPI = 300
+
+
+def _export_page(index, build, frame, spec, figsize, dpi, file_name=None):
+    """
+    Process-pool job: build one page with ``build(fig, frame, spec)`` and
+    render it at ``dpi``. Writes the PNG to ``file_name`` when given,
+    otherwise returns its bytes for the GUI process to bind into the PDF.
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    build(fig, frame, spec)
+    try:
+        fig.tight_layout()
+    except Exception:
+        pass
+    if file_name is not None:
+        fig.savefig(file_name, dpi=dpi)
+        return index, file_name
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi)
+    return index, buf.getvalue()
+
+
+def _export_file_name(index, title):
+    stem = "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in str(title)).strip("_")
+    return f"{index + 1:02d}_{stem[:60] or 'figure'}.png"
+
+
+def _prepare_pages(df, pages):
+    """
+    Fill heatmap and box specs from the shared caches so workers don't
+    recompute them, and pair every page with the slice of ``df`` its builder
+    still reads -- no columns at all once its numbers are precomputed.
+    """
+    prepared = []
+    for title, build, spec, figsize in pages:
+        kind = spec.get("kind")
+        if kind in ("Heatmap", "correlation") and spec.get("corr") is None:
+            spec = dict(spec, corr=CORRELATIONS.matrix(df, spec.get("version"), spec.get("method", "pearson")))
+        elif kind == "box" and spec.get("stats") is None:
+            spec = dict(spec, stats=COLUMN_BOXES.stats(df, spec["x"], spec.get("version")))
+        if spec.get("corr") is not None or spec.get("stats") is not None:
+            columns = []
+        else:
+            wanted = (*spec.get("columns", ()), spec.get("x"), spec.get("y"))
+            columns = [c for c in dict.fromkeys(wanted) if c in df.columns]
+        prepared.append((title, build, spec, figsize, df[columns]))
+    return prepared
+
+
+def export_figures(df, pages, target, fmt="pdf", dpi=EXPORT_DPI, progress=None, cancelled=None,
+                   max_workers=None):
+    """
+    Re-render ``pages`` -- ``(title, build, spec, figsize)`` tuples with a
+    module-level ``build`` -- in worker processes and write them as one
+    multi-page PDF (``fmt="pdf"``, one ``dpi`` image per page) or as PNGs in
+    the ``target`` folder. Each worker only receives the columns its page
+    draws. ``progress(done)`` is called as pages finish; once ``cancelled()``
+    is true pending pages are dropped and None is returned.
+    """
+    pages = _prepare_pages(df, pages)
+    if fmt == "png":
+        os.makedirs(target, exist_ok=True)
+    workers = max(1, min(len(pages), max_workers or os.cpu_count() or 1))
+    # Spawned, not forked: forking a process that runs Qt and worker threads can deadlock.
+    executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    results = [None] * len(pages)
+    try:
+        pending = set()
+        for i, (title, build, spec, figsize, frame) in enumerate(pages):
+            file_name = os.path.join(target, _export_file_name(i, title)) if fmt == "png" else None
+            pending.add(executor.submit(_export_page, i, build, frame, spec, figsize, dpi, file_name))
+        while pending:
+            if cancelled is not None and cancelled():
+                return None
+            done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, result = future.result()
+                results[index] = result
+            if progress is not None and done:
+                progress(len(pages) - len(pending))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if fmt == "png":
+        return results
+    with PdfPages(target) as pdf:
+        for (_, _, _, figsize, _), png in zip(pages, results):
+            fig = Figure(figsize=figsize, dpi=dpi)
+            fig.figimage(mpimg.imread(io.BytesIO(png), format="png"))
+            pdf.savefig(fig, dpi=dpi)
+    return target
+
+
+def run_figure_export(parent, df, pages):
+    """Ask where to export ``pages``, then run ``export_figures`` with a cancellable progress dialog."""
+    if not pages:
+        QMessageBox.information(parent, "Export All", "There are no figures to export.")
+        return
+    target, chosen = QFileDialog.getSaveFileName(
+        parent, "Export All Figures", "", "Multi-page PDF (*.pdf);;PNG Folder (*)"
+    )
+    if not target:
+        return
+    fmt = "png" if chosen.startswith("PNG") else "pdf"
+    if fmt == "pdf" and not target.lower().endswith(".pdf"):
+        target += ".pdf"
+
+    progress = QProgressDialog(f"Exporting {len(pages)} figures…", "Cancel", 0, len(pages), parent)
+    progress.setWindowModality(Qt.WindowModal)
+    progress.setMinimumDuration(0)
+    progress.setValue(0)
+    cancel = threading.Event()
+    progress.canceled.connect(cancel.set)
+
+    worker = Worker(export_figures, df, pages, target, fmt, cancelled=cancel.is_set)
+    worker.kwargs["progress"] = worker.signals.progress.emit
+    worker.signals.progress.connect(progress.setValue)
+
+    def finished(result):
+        progress.close()
+        if result is not None:
+            QMessageBox.information(parent, "Export All", f"Exported {len(pages)} figures to {target}")
+
+    def failed(tb):
+        progress.close()
+        QMessageBox.critical(parent, "Export Error", tb.strip().splitlines()[-1])
+
+    worker.signals.finished.connect(finished)
+    worker.signals.error.connect(failed)
+    worker.start()
+
+
+def draw_correlation_heatmap(fig, corr, title, color=None):
+    """Correlation matrix as an image with a colorbar."""
+    ax = fig.subplots()
+    im = ax.imshow(corr, cmap="coolwarm", vmin=-1, vmax=1)
+    ax.set_xticks(range(len(corr.columns)))
+    ax.set_xticklabels(corr.columns, rotation=45, ha="right", color=color)
+    ax.set_yticks(range(len(corr.index)))
+    ax.set_yticklabels(corr.index, color=color)
+    cbar = fig.colorbar(im, ax=ax)
+    if color is not None:
+        cbar.ax.yaxis.set_tick_params(color=color)
+        for tick in cbar.ax.get_yticklabels():
+            tick.set_color(color)
+    ax.set_title(title, color=color)
+    return ax
+
+
+def build_dashboard_figure(fig, df, spec):
+    """``export_figures`` builder for the dashboard views (correlation, box, scatter)."""
+    kind = spec["kind"]
+    if kind == "correlation":
+        corr = spec.get("corr")
+        if corr is None:
+            corr = CORRELATIONS.matrix(df, spec.get("version"), spec["method"])
+        draw_correlation_heatmap(fig, corr, spec.get("title") or f"Correlation Heatmap ({spec['method'].title()})")
+    elif kind == "box":
+        ax = fig.subplots()
+        st = spec.get("stats") or COLUMN_BOXES.stats(df, spec["x"], spec.get("version"))
+        if st is not None:
+            ax.bxp([st], patch_artist=True, boxprops=dict(facecolor="#008CBA"),
+                   flierprops=dict(marker="o", markersize=3, markerfacecolor="none"))
+        ax.set_title(spec["title"])
+        ax.set_ylabel(spec["x"])
+    elif kind == "scatter":
+        ax = fig.subplots()
+        x = df[spec["x"]].to_numpy(dtype=float, na_value=np.nan)
+        y = df[spec["y"]].to_numpy(dtype=float, na_value=np.nan)
+        ax.scatter(x, y, s=6, alpha=0.6, color="#008CBA", rasterized=len(x) > 50_000)
+        ax.set_title(spec["title"])
+        ax.set_xlabel(spec["x"])
+        ax.set_ylabel(spec["y"])
+
+
 # —————————————————————————————————
 #  VISUALIZATION & DASHBOARD DIALOGS
 # —————————————————————————————————
 
+def refill_combo(combo, items):
+    """Replace a combo's items without emitting signals, keeping the current choice if it still exists."""
+    current = combo.currentText()
+    combo.blockSignals(True)
+    combo.clear()
+    combo.addItems(items)
+    if current in items:
+        combo.setCurrentText(current)
+    combo.blockSignals(False)
+
+
 class VisualizeDialog(QDialog):
-    def __init__(self, df, parent=None):
+    def __init__(self, df, parent=None, version=None):
         super().__init__(parent)
         self.setWindowTitle("Visualize Column")
         self.df = df
+        self.version = version
         self.setMinimumSize(600, 480)
         self.setStyleSheet("""
             QDialog {
@@ -941,6 +3114,8 @@ class VisualizeDialog(QDialog):
         self.canvas = FigureCanvas(Figure(figsize=(5, 4)))
         layout.addWidget(self.canvas)
         self.ax = self.canvas.figure.subplots()
+        self.ax.tick_params(colors="#E0E0E0")
+        self.layer = ArtistLayer(self.ax)
         button_box = QDialogButtonBox(QDialogButtonBox.Close)
         button_box.rejected.connect(self.close)
         layout.addWidget(button_box)
@@ -948,22 +3123,31 @@ class VisualizeDialog(QDialog):
         if numeric_cols:
             self.plot_histogram(numeric_cols[0])
 
+    def set_data(self, df, version):
+        """Redraw from a new snapshot of the table."""
+        if version == self.version and df is self.df:
+            return
+        self.df = df
+        self.version = version
+        refill_combo(self.column_combo, df.select_dtypes(include="number").columns.tolist())
+        if self.column_combo.currentText():
+            self.plot_histogram(self.column_combo.currentText())
+
     def plot_histogram(self, col_name):
-        self.ax.clear()
-        series = self.df[col_name].dropna()
-        self.ax.hist(series, bins=20, edgecolor="#333333", color="#008CBA")
-        self.ax.set_title(f"Histogram: {col_name}", color="#E0E0E0")
-        self.ax.set_xlabel(col_name, color="#E0E0E0")
-        self.ax.set_ylabel("Frequency", color="#E0E0E0")
-        self.ax.tick_params(colors="#E0E0E0")
-        self.canvas.draw()
+        counts, edges = COLUMN_BINS.histogram(self.df, col_name, bins=20, version=self.version)
+        self.layer.bars("hist", edges, counts, edgecolor="#333333", color="#008CBA")
+        self.layer.set_labels(f"Histogram: {col_name}", col_name, "Frequency", color="#E0E0E0")
+        self.layer.set_limits(_padded_limits(edges[0], edges[-1], 0.02), (0, max(counts.max(), 1) * 1.05))
+        self.layer.draw()
 
 
 class DashboardDialog(QDialog):
-    def __init__(self, df, parent=None):
+    def __init__(self, df, parent=None, version=None, full_stats=None):
         super().__init__(parent)
         self.setWindowTitle("Dashboard")
         self.df = df
+        self.version = version
+        self.full_stats = full_stats    # StreamingStats over every chunk, in chunk mode
         self.setMinimumSize(880, 680)
         self.setStyleSheet("""
             QDialog {
@@ -998,11 +3182,23 @@ class DashboardDialog(QDialog):
         """)
         layout.addWidget(tabs)
 
-        # 1) Correlation Heatmap
+        # 1) Correlation Heatmap + strongest pairs
         corr_tab = QWidget()
         corr_layout = QVBoxLayout(corr_tab)
+        corr_form = QFormLayout()
+        self.corr_method = QComboBox()
+        self.corr_method.addItems(["Pearson", "Spearman", "Kendall"])
+        corr_form.addRow("Method:", self.corr_method)
+        corr_layout.addLayout(corr_form)
         self.corr_canvas = FigureCanvas(Figure(figsize=(5, 4)))
-        corr_layout.addWidget(self.corr_canvas)
+        corr_layout.addWidget(self.corr_canvas, 3)
+        self.corr_pairs = QTableWidget(0, 5)
+        self.corr_pairs.setHorizontalHeaderLabels(["Column A", "Column B", "r", "p-value", "n"])
+        self.corr_pairs.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.corr_pairs.setEditTriggers(QTableWidget.NoEditTriggers)
+        corr_layout.addWidget(self.corr_pairs, 1)
+        self._corr_request = 0
+        self.corr_method.currentTextChanged.connect(self.plot_correlation)
         self.plot_correlation()
         tabs.addTab(corr_tab, "Correlation")
 
@@ -1016,6 +3212,9 @@ class DashboardDialog(QDialog):
         form_layout.addRow("Numeric Column:", self.box_combo)
         box_layout.addLayout(form_layout)
         self.box_canvas = FigureCanvas(Figure(figsize=(5, 4)))
+        self.box_ax = self.box_canvas.figure.subplots()
+        self.box_ax.tick_params(colors="#E0E0E0")
+        self.box_layer = ArtistLayer(self.box_ax)
         box_layout.addWidget(self.box_canvas)
         self.box_combo.currentTextChanged.connect(self.plot_box)
         if numeric_cols:
@@ -1034,6 +3233,9 @@ class DashboardDialog(QDialog):
         form_layout2.addRow("Y-axis:", self.scatter_y)
         scatter_layout.addLayout(form_layout2)
         self.scatter_canvas = FigureCanvas(Figure(figsize=(5, 4)))
+        self.scatter_ax = self.scatter_canvas.figure.subplots()
+        self.scatter_ax.tick_params(colors="#E0E0E0")
+        self.scatter_layer = ArtistLayer(self.scatter_ax)
         scatter_layout.addWidget(self.scatter_canvas)
         self.scatter_x.currentTextChanged.connect(self.plot_scatter)
         self.scatter_y.currentTextChanged.connect(self.plot_scatter)
@@ -1041,62 +3243,152 @@ class DashboardDialog(QDialog):
             self.plot_scatter()
         tabs.addTab(scatter_tab, "Scatter")
 
+        export_btn = QPushButton("Export All…")
+        export_btn.clicked.connect(self.export_all)
+        layout.addWidget(export_btn, alignment=Qt.AlignRight)
+
+    TOP_PAIRS = 15
+
+    def set_data(self, df, version):
+        """Redraw every tab from a new snapshot of the table."""
+        if version == self.version and df is self.df:
+            return
+        self.df = df
+        self.version = version
+        numeric_cols = df.select_dtypes(include="number").columns.tolist()
+        for combo in (self.box_combo, self.scatter_x, self.scatter_y):
+            refill_combo(combo, numeric_cols)
+        self.plot_correlation()
+        if self.box_combo.currentText():
+            self.plot_box(self.box_combo.currentText())
+        self.plot_scatter()
+
+    def export_pages(self):
+        """The heatmap, a box plot for every numeric column and the current scatter."""
+        spec = dict(version=self.version)
+        method = self.corr_method.currentText().lower()
+        title = f"Correlation Heatmap ({CORRELATIONS.label(self.df, method)})"
+        pages = [("Correlation", build_dashboard_figure,
+                  dict(spec, kind="correlation", method=method, title=title), (8, 6))]
+        for i in range(self.box_combo.count()):
+            col = self.box_combo.itemText(i)
+            full = self.full_stats.columns.get(col) if self.full_stats is not None else None
+            stats, title = None, f"Box Plot: {col}"
+            if full is not None and full["sketch"] is not None:
+                stats = sketch_box_stats(full["sketch"], full["moments"], label=col)
+                title += f" (all {self.full_stats.rows:,} rows, approx.)"
+            pages.append((title, build_dashboard_figure, dict(spec, kind="box", x=col, stats=stats, title=title),
+                          (5, 4)))
+        x_col, y_col = self.scatter_x.currentText(), self.scatter_y.currentText()
+        if x_col and y_col:
+            title = f"Scatter: {x_col} vs {y_col}"
+            pages.append((title, build_dashboard_figure, dict(spec, kind="scatter", x=x_col, y=y_col, title=title),
+                          (6, 5)))
+        return pages
+
+    def export_all(self):
+        run_figure_export(self, self.df, self.export_pages())
+
     def plot_correlation(self):
+        # Rank correlations on wide tables take a while; compute them on the pool.
+        method = self.corr_method.currentText().lower()
+        self._corr_request += 1
+        request = self._corr_request
+        worker = Worker(lambda: (
+            CORRELATIONS.matrix(self.df, self.version, method),
+            CORRELATIONS.top_pairs(self.df, self.version, method, self.TOP_PAIRS),
+        ))
+        worker.signals.finished.connect(lambda res, r=request, m=method: self._on_correlation(res, r, m))
+        worker.signals.error.connect(
+            lambda tb: QMessageBox.critical(self, "Correlation Error", tb.strip().splitlines()[-1])
+        )
+        worker.start()
+
+    def _on_correlation(self, result, request, method):
+        if request != self._corr_request:
+            return      # a newer method was picked meanwhile
+        self._draw_correlation(method, *result)
+
+    def _draw_correlation(self, method, corr, pairs):
+        label = CORRELATIONS.label(self.df, method)
+        sampled = label != method.title()
+        self.corr_pairs.setHorizontalHeaderItem(4, QTableWidgetItem("n (in sample)" if sampled else "n"))
+        self.corr_pairs.setRowCount(len(pairs))
+        for row, rec in enumerate(pairs.itertuples(index=False)):
+            cells = [str(rec.column_a), str(rec.column_b), f"{rec.r:.3f}", f"{rec.p_value:.2e}", f"{rec.n:,}"]
+            for col, text in enumerate(cells):
+                self.corr_pairs.setItem(row, col, QTableWidgetItem(text))
+
         self.corr_canvas.figure.clear()
-        ax = self.corr_canvas.figure.subplots()
-        corr = self.df.select_dtypes(include="number").corr()
-        im = ax.imshow(corr, cmap="coolwarm", vmin=-1, vmax=1)
-        ax.set_xticks(range(len(corr.columns)))
-        ax.set_xticklabels(corr.columns, rotation=45, ha="right", color="#E0E0E0")
-        ax.set_yticks(range(len(corr.index)))
-        ax.set_yticklabels(corr.index, color="#E0E0E0")
-        cbar = self.corr_canvas.figure.colorbar(im, ax=ax)
-        cbar.ax.yaxis.set_tick_params(color="#E0E0E0")
-        for tick in cbar.ax.get_yticklabels():
-            tick.set_color("#E0E0E0")
-        ax.set_title("Correlation Heatmap", color="#E0E0E0")
+        draw_correlation_heatmap(
+            self.corr_canvas.figure, corr, f"Correlation Heatmap ({label})", color="#E0E0E0"
+        )
         self.corr_canvas.draw()
 
     def plot_box(self, col_name):
-        self.box_canvas.figure.clear()
-        ax = self.box_canvas.figure.subplots()
-        series = self.df[col_name].dropna()
-        ax.boxplot(
-            series,
+        # In chunk mode the box covers every chunk, from the streaming sketches.
+        full = self.full_stats.columns.get(col_name) if self.full_stats is not None else None
+        if full is not None and full["sketch"] is not None:
+            st = sketch_box_stats(full["sketch"], full["moments"], label=col_name)
+            title = f"Box Plot: {col_name} (all {self.full_stats.rows:,} rows, approx.)"
+        else:
+            st = COLUMN_BOXES.stats(self.df, col_name, self.version)
+            title = f"Box Plot: {col_name}"
+        if st is None:
+            self.box_layer.replace("box", [])
+            self.box_layer.draw()
+            return
+        parts = self.box_ax.bxp(
+            [st],
             vert=True,
             patch_artist=True,
             boxprops=dict(facecolor="#008CBA", edgecolor="#E0E0E0"),
             medianprops=dict(color="#333333"),
+            flierprops=dict(marker="o", markersize=3, markerfacecolor="none", markeredgecolor="#E0E0E0"),
         )
-        ax.set_title(f"Box Plot: {col_name}", color="#E0E0E0")
-        ax.set_ylabel(col_name, color="#E0E0E0")
-        ax.tick_params(colors="#E0E0E0")
-        self.box_canvas.draw()
+        self.box_layer.replace("box", [a for group in parts.values() for a in group])
+        lo = min(st["whislo"], st["fliers"].min()) if st["fliers"].size else st["whislo"]
+        hi = max(st["whishi"], st["fliers"].max()) if st["fliers"].size else st["whishi"]
+        if st["n_fliers"] and st["n_fliers"] > st["fliers"].size:
+            title += f"\n{st['fliers'].size} of {st['n_fliers']:,} outliers shown"
+        self.box_layer.set_labels(title, "", col_name, color="#E0E0E0")
+        self.box_layer.set_limits((0.5, 1.5), _padded_limits(lo, hi))
+        self.box_layer.draw()
 
     def plot_scatter(self):
         x_col = self.scatter_x.currentText()
         y_col = self.scatter_y.currentText()
         if x_col and y_col:
-            self.scatter_canvas.figure.clear()
-            ax = self.scatter_canvas.figure.subplots()
-            ax.scatter(self.df[x_col], self.df[y_col], alpha=0.8, color="#008CBA", edgecolor="#E0E0E0")
-            ax.set_xlabel(x_col, color="#E0E0E0")
-            ax.set_ylabel(y_col, color="#E0E0E0")
-            ax.set_title(f"Scatter: {x_col} vs {y_col}", color="#E0E0E0")
-            ax.tick_params(colors="#E0E0E0")
-            self.scatter_canvas.draw()
+            x = self.df[x_col].to_numpy(dtype=float, na_value=np.nan)
+            y = self.df[y_col].to_numpy(dtype=float, na_value=np.nan)
+            self.scatter_layer.scatter("points", x, y, alpha=0.8, facecolor="#008CBA", edgecolor="#E0E0E0")
+            self.scatter_layer.set_labels(f"Scatter: {x_col} vs {y_col}", x_col, y_col, color="#E0E0E0")
+            ok = np.isfinite(x) & np.isfinite(y)
+            if ok.any():
+                self.scatter_layer.set_limits(
+                    _padded_limits(x[ok].min(), x[ok].max()), _padded_limits(y[ok].min(), y[ok].max())
+                )
+            self.scatter_layer.draw()
 
 
 
 class ExploreDialog(QDialog):
-    def __init__(self, df, parent=None):
+    """
+    Tabbed overview plots. Each tab is drawn the first time it is shown and
+    kept until the data version changes (see ``set_data``).
+    """
+    def __init__(self, df, parent=None, version=None):
         super().__init__(parent)
         self.setWindowTitle("Explore Data")
         self.df = df
+        self.version = version
+        self._plot_funcs = []      # tab index -> plot function
+        self._rendered = set()     # tab indices drawn for the current version
         self.setMinimumSize(1000, 750)
 
         layout = QVBoxLayout(self)
         tabs = QTabWidget()
+        self.tabs = tabs
         layout.addWidget(tabs)
 
         # 1) Histogram
@@ -1115,162 +3407,1341 @@ class ExploreDialog(QDialog):
         self.corr_canvas = FigureCanvas(Figure(figsize=(6, 4)))
         self._add_tab(tabs, "Correlation", self.corr_canvas, self.plot_correlation)
 
-        # 5) Pair Plot (all numeric variables)
-        self.pair_canvas = FigureCanvas(Figure(figsize=(6, 4)))
-        self._add_tab(tabs, "Pair Plot", self.pair_canvas, self.plot_pairplot)
+        # 5) Pair Plot (picked numeric columns) — rendered off the GUI thread
+        self.pair_engine = None
+        self.pair_view = RenderedFigureView()
+        self.pair_picker = QListWidget()
+        self.pair_picker.setMaximumWidth(200)
+        self.pair_picker.itemChanged.connect(self._on_pair_pick)
+        self.pair_note = QLabel()
+        self.pair_note.setWordWrap(True)
+        pair_side = QVBoxLayout()
+        pair_side.addWidget(QLabel(f"Columns (max {PairPlotEngine.max_columns}):"))
+        pair_side.addWidget(self.pair_picker)
+        pair_side.addWidget(self.pair_note)
+        pair_panel = QWidget()
+        pair_row = QHBoxLayout(pair_panel)
+        pair_row.setContentsMargins(0, 0, 0, 0)
+        pair_row.addLayout(pair_side)
+        pair_row.addWidget(self.pair_view, 1)
+        self._add_tab(tabs, "Pair Plot", pair_panel, self.plot_pairplot)
 
         # 6) Violin Plot
         self.violin_canvas = FigureCanvas(Figure(figsize=(6, 4)))
         self._add_tab(tabs, "Violin Plot", self.violin_canvas, self.plot_violin)
 
-        # 7) Time Series (if datetime index or columns)
+        # 7) Time Series (if datetime index or columns), decimated per pixel
         self.ts_canvas = FigureCanvas(Figure(figsize=(6, 4)))
-        self._add_tab(tabs, "Time Series", self.ts_canvas, self.plot_timeseries)
+        self.ts_agg = QComboBox()
+        self.ts_agg.addItems(list(TS_AGGREGATES))
+        self.ts_agg.currentTextChanged.connect(self.plot_timeseries)
+        ts_panel = QWidget()
+        ts_layout = QVBoxLayout(ts_panel)
+        ts_layout.setContentsMargins(0, 0, 0, 0)
+        ts_form = QFormLayout()
+        ts_form.addRow("Aggregate:", self.ts_agg)
+        ts_layout.addLayout(ts_form)
+        # Zooming (toolbar or mouse wheel) re-decimates the lines down to raw rows
+        ts_layout.addWidget(NavigationToolbar(self.ts_canvas, ts_panel))
+        self.ts_zoom = ScrollZoom(self.ts_canvas)
+        ts_layout.addWidget(self.ts_canvas, 1)
+        self._add_tab(tabs, "Time Series", ts_panel, self.plot_timeseries)
+
+        tabs.currentChanged.connect(self._render_tab)
+        self._render_tab(tabs.currentIndex())
 
     def _add_tab(self, tabs, name, canvas, plot_func):
         tab = QWidget()
         vbox = QVBoxLayout(tab)
         vbox.addWidget(canvas)
         tabs.addTab(tab, name)
-        # Plot immediately
-        plot_func()
+        # Plotted lazily by _render_tab when the tab is first shown
+        self._plot_funcs.append(plot_func)
+
+    def _render_tab(self, index):
+        if index < 0 or index in self._rendered:
+            return
+        self._rendered.add(index)
+        self._plot_funcs[index]()
+
+    def set_data(self, df, version):
+        """Swap in a new frame; every tab goes stale and the visible one redraws."""
+        if version == self.version and df is self.df:
+            return
+        self.df = df
+        self.version = version
+        self._rendered.clear()
+        self._render_tab(self.tabs.currentIndex())
 
     def plot_histogram(self):
         self.hist_canvas.figure.clear()
         ax = self.hist_canvas.figure.subplots()
         num_cols = self.df.select_dtypes(include="number").columns
         if len(num_cols) > 0:
-            self.df[num_cols[0]].hist(ax=ax, bins=30, color="#008CBA", edgecolor="black")
+            counts, edges = COLUMN_BINS.histogram(self.df, num_cols[0], bins=30, version=self.version)
+            ax.stairs(counts, edges, fill=True, color="#008CBA")
+            ax.stairs(counts, edges, color="black")
+            ax.grid(True)
             ax.set_title(f"Histogram: {num_cols[0]}")
         self.hist_canvas.draw()
 
-    def plot_box(self):
-        self.box_canvas.figure.clear()
-        ax = self.box_canvas.figure.subplots()
-        num_cols = self.df.select_dtypes(include="number").columns
-        if len(num_cols) > 0:
-            self.df[num_cols].plot(kind="box", ax=ax, patch_artist=True, color={"boxes":"#008CBA"})
-            ax.set_title("Box Plots")
-        self.box_canvas.draw()
+    def plot_box(self):
+        self.box_canvas.figure.clear()
+        ax = self.box_canvas.figure.subplots()
+        num_cols = self.df.select_dtypes(include="number").columns
+        stats = [COLUMN_BOXES.stats(self.df, col, self.version) for col in num_cols]
+        stats = [st for st in stats if st is not None]
+        if stats:
+            ax.bxp(stats, patch_artist=True, boxprops=dict(facecolor="#008CBA"),
+                   flierprops=dict(marker="o", markersize=3, markerfacecolor="none"))
+            ax.set_title("Box Plots")
+        self.box_canvas.draw()
+
+    def plot_scatter(self):
+        self.scatter_canvas.figure.clear()
+        ax = self.scatter_canvas.figure.subplots()
+        num_cols = self.df.select_dtypes(include="number").columns
+        if len(num_cols) >= 2:
+            ax.scatter(self.df[num_cols[0]], self.df[num_cols[1]], color="#008CBA", alpha=0.7)
+            ax.set_xlabel(num_cols[0]); ax.set_ylabel(num_cols[1])
+            ax.set_title("Scatter Plot")
+        self.scatter_canvas.draw()
+
+    def plot_correlation(self):
+        self.corr_canvas.figure.clear()
+        ax = self.corr_canvas.figure.subplots()
+        corr = CORRELATIONS.matrix(self.df, self.version)
+        cax = ax.imshow(corr, cmap="coolwarm", vmin=-1, vmax=1)
+        ax.set_xticks(range(len(corr.columns)))
+        ax.set_xticklabels(corr.columns, rotation=45, ha="right")
+        ax.set_yticks(range(len(corr.index)))
+        ax.set_yticklabels(corr.index)
+        self.corr_canvas.figure.colorbar(cax, ax=ax)
+        ax.set_title("Correlation Heatmap")
+        self.corr_canvas.draw()
+
+    def plot_pairplot(self):
+        num_cols = list(self.df.select_dtypes(include="number").columns)
+        engine = self.pair_engine
+        if engine is None or engine.df is not self.df or engine.version != self.version:
+            self.pair_engine = PairPlotEngine(self.df, self.version)
+            previous = set(self._picked_pair_columns()) if engine is not None else set()
+            keep = [c for c in num_cols if c in previous] or num_cols[:PairPlotEngine.max_columns]
+            self.pair_picker.blockSignals(True)
+            self.pair_picker.clear()
+            for col in num_cols:
+                item = QListWidgetItem(str(col))
+                item.setData(Qt.UserRole, col)
+                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                item.setCheckState(Qt.Checked if col in keep else Qt.Unchecked)
+                self.pair_picker.addItem(item)
+            self.pair_picker.blockSignals(False)
+        self.pair_view.render(partial(self.pair_engine.build, columns=self._picked_pair_columns()))
+
+    def _picked_pair_columns(self):
+        return [
+            self.pair_picker.item(i).data(Qt.UserRole)
+            for i in range(self.pair_picker.count())
+            if self.pair_picker.item(i).checkState() == Qt.Checked
+        ]
+
+    def _on_pair_pick(self, item):
+        cap = PairPlotEngine.max_columns
+        if item.checkState() == Qt.Checked and len(self._picked_pair_columns()) > cap:
+            self.pair_picker.blockSignals(True)
+            item.setCheckState(Qt.Unchecked)
+            self.pair_picker.blockSignals(False)
+            self.pair_note.setText(f"At most {cap} columns; uncheck one first.")
+            return
+        self.pair_note.clear()
+        self.plot_pairplot()
+
+    def plot_violin(self):
+        self.violin_canvas.figure.clear()
+        ax = self.violin_canvas.figure.subplots()
+        num_cols = self.df.select_dtypes(include="number").columns
+        if len(num_cols) > 0:
+            draw_violins(ax, [COLUMN_BINS.fine_counts(self.df, col, self.version) for col in num_cols])
+            ax.set_xticks(range(1, len(num_cols) + 1))
+            ax.set_xticklabels(num_cols, rotation=45)
+            ax.set_title("Violin Plots")
+        self.violin_canvas.draw()
+
+    def plot_timeseries(self):
+        self.ts_canvas.figure.clear()
+        ax = self.ts_canvas.figure.subplots()
+        date_cols = self.df.select_dtypes(include="datetime").columns
+        num_cols = self.df.select_dtypes(include="number").columns
+        x = date_cols[0] if len(date_cols) > 0 else None
+        if len(num_cols) > 0 and (x is not None or isinstance(self.df.index, pd.DatetimeIndex)):
+            draw_time_series(ax, self.df, [num_cols[0]], x, self.version,
+                             TS_AGGREGATES[self.ts_agg.currentText()], color="#008CBA")
+            ax.set_xlabel(x or "")
+            ax.set_title("Time Series")
+        self.ts_canvas.draw()
+
+
+# —————————————————————————————————
+#  Fit DIALOGS
+# —————————————————————————————————
+
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QDialog, QDockWidget,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QComboBox, QSpinBox, QLineEdit, QTextEdit, QCheckBox,
+    QFileDialog, QMessageBox, QColorDialog,
+    QListWidget, QListWidgetItem   # <-- add these
+)
+
+# ──────────────────────────────────────────────────────────────────────────────
+# NEW FIT PANEL (no modal dialog, no black window)
+# ──────────────────────────────────────────────────────────────────────────────
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple, Dict, Callable
+import ast
+import hashlib
+import numpy as np
+import pandas as pd
+from scipy.optimize import curve_fit, least_squares
+from scipy.signal import find_peaks, peak_widths
+from scipy.stats import t as t_dist
+from scipy.special import wofz
+
+from PyQt5.QtWidgets import (
+    QWidget, QMainWindow, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
+    QDoubleSpinBox, QCheckBox, QPushButton, QPlainTextEdit, QFileDialog,
+    QGroupBox, QFormLayout, QSplitter, QProgressBar
+)
+from PyQt5.QtCore import Qt
+
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+from matplotlib.widgets import SpanSelector
+
+
+# ---------- model functions ----------
+def _exp(x, a, b):              # y = a * exp(b x)
+    return a * np.exp(b * x)
+
+def _gauss(x, a, mu, sigma):    # a * exp(-(x-mu)^2 / (2 sigma^2))
+    return a * np.exp(-((x - mu)**2) / (2.0 * sigma**2))
+
+def _lorentz(x, a, x0, gamma):  # a * gamma^2 / ((x-x0)^2 + gamma^2)
+    return a * (gamma**2 / ((x - x0)**2 + gamma**2))
+
+def _voigt(x, a, mu, sigma, gamma):
+    z = ((x - mu) + 1j * gamma) / (sigma * np.sqrt(2))
+    return a * np.real(wofz(z)) / (sigma * np.sqrt(2 * np.pi))
+
+
+# ---------- peak seeding ----------
+def detect_peaks(x, y, n_peaks: int = 1):
+    """
+    Seeds for peak fits from the data itself. Returns the sorted x, the
+    background level (5th percentile), the sampling step and ``n_peaks``
+    ``(height above background, center, FWHM)`` seeds sorted by center: the
+    most prominent maxima of the lightly smoothed signal, then -- when fewer
+    are visible -- the largest maxima of what those seeds leave unexplained.
+    """
+    order = np.argsort(x)
+    xs, ys = x[order], y[order]
+    span = float(xs[-1] - xs[0]) or 1.0
+    step = float(np.median(np.diff(xs))) if xs.size > 1 else span
+    step = step if step > 0 else span / max(xs.size, 1)
+    base = float(np.percentile(ys, 5))
+    resid = ys - base
+    # Light smoothing and a noise-scaled prominence keep counting noise on
+    # a tall peak from outranking real, smaller peaks
+    smooth = np.convolve(resid, np.array([1, 4, 6, 4, 1]) / 16.0, mode="same")
+    noise = 1.4826 * float(np.median(np.abs(np.diff(ys)))) / np.sqrt(2.0)
+
+    peaks, props = find_peaks(smooth, prominence=3.0 * noise)
+    top = peaks[np.argsort(props["prominences"])[::-1][:n_peaks]]
+    widths = peak_widths(smooth, top, rel_height=0.5)[0] * step if top.size else np.empty(0)
+    seeds = [(float(resid[i]), float(xs[i]), max(float(w), 2 * step)) for i, w in zip(top, widths)]
+    # Fewer visible maxima than peaks: place the rest on what the seeds leave unexplained
+    fwhm = float(np.median(widths)) if widths.size else span / (4 * n_peaks)
+    while len(seeds) < n_peaks:
+        left = resid - sum(h * np.exp(-4 * np.log(2) * (xs - c)**2 / w**2) for h, c, w in seeds)
+        i = int(np.argmax(left))
+        seeds.append((max(float(left[i]), 0.0), float(xs[i]), max(fwhm, 2 * step)))
+    return xs, base, step, sorted(seeds, key=lambda s: s[1])
+
+
+def peak_seed(shape: str, height: float, center: float, fwhm: float, xs, step: float):
+    """Starting parameters and lower/upper bounds of one ``shape`` peak from its height, center and FWHM."""
+    span = float(xs[-1] - xs[0]) or 1.0
+    if shape == "gaussian":
+        p0 = [height, center, fwhm / 2.355]
+    elif shape == "lorentzian":
+        p0 = [height, center, fwhm / 2.0]
+    else:
+        sigma, gamma = fwhm / 3.6, fwhm / 4.0
+        peak = wofz(1j * gamma / (sigma * np.sqrt(2.0))).real / (sigma * np.sqrt(2.0 * np.pi))
+        p0 = [height / peak, center, sigma, gamma]      # a is the area for Voigt
+    lo = [0.0, xs[0], step / 4] + ([0.0] if shape == "voigt" else [])
+    hi = [np.inf, xs[-1], span] + ([span] if shape == "voigt" else [])
+    return p0, lo, hi
+
+
+def _clip_into(p0, lo, hi) -> np.ndarray:
+    """``p0`` moved just inside finite bounds (least-squares solvers need a strictly feasible start)."""
+    lo, hi = np.asarray(lo, dtype=float), np.asarray(hi, dtype=float)
+    margin = 1e-9 * np.where(np.isfinite(hi - lo), hi - lo, 0.0)
+    return np.clip(np.nan_to_num(np.asarray(p0, dtype=float)), lo + margin, hi - margin)
+
+
+def _within(p0, lo, hi) -> bool:
+    p0 = np.asarray(p0, dtype=float)
+    return p0.shape == np.shape(lo) and bool(np.all((p0 >= lo) & (p0 <= hi)))
+
+
+def single_peak_seed(shape: str, x, y):
+    """
+    ``(p0, (lower, upper))`` for a single-peak model without background term.
+    These models are measured from 0, so both a peak (a > 0) and a dip
+    (a < 0) are seeded wherever the data reach that side of 0, each both from
+    the detected peak and from the data's moments (for a peak that fills the
+    window, where prominence sees only its flanks); the seed closest to the
+    data wins. Bounds keep the center in the data and the width positive.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    f = {"gaussian": _gauss, "lorentzian": _lorentz, "voigt": _voigt}[shape]
+    span = float(np.ptp(x)) or 1.0
+    best, best_cost = None, np.inf
+    for sign in (1.0, -1.0):
+        ys = sign * y
+        if np.max(ys) <= 0 and best is not None:
+            continue        # the data never reach this side of 0
+        xs, base, step, [(h, c, w)] = detect_peaks(x, ys, 1)
+        weight = np.clip(ys, 0.0, None)
+        if weight.sum() > 0:
+            mean = float(np.average(x, weights=weight))
+            fwhm = 2.355 * float(np.sqrt(np.average((x - mean)**2, weights=weight)))
+        else:
+            mean, fwhm = c, w
+        for height, center, width in ((max(h + base, h), c, w),
+                                      (float(np.max(ys)), mean, min(max(fwhm, 2 * step), span))):
+            p0, lo, hi = peak_seed(shape, height, center, width, xs, step)
+            if sign < 0:
+                p0[0], lo[0], hi[0] = -p0[0], -hi[0], -lo[0]
+            p0 = _clip_into(p0, lo, hi)
+            cost = float(np.sum((f(x, *p0) - y)**2))
+            if best is None or cost < best_cost:
+                best, best_cost = (p0, (np.array(lo, dtype=float), np.array(hi, dtype=float))), cost
+    return best
+
+
+# ---------- composite peak models ----------
+def _peak_terms(shape, x, P):
+    """
+    Values and partial derivatives of ``len(P)`` peaks at once.
+    ``P`` is (n_peaks, n_shape_params) in the order of the single-peak
+    functions above; returns values (n, m) and partials (n, k, m).
+    """
+    a, center = P[:, :1], P[:, 1:2]
+    d = x[None, :] - center
+    if shape == "gaussian":
+        sigma = P[:, 2:3]
+        e = np.exp(-d**2 / (2.0 * sigma**2))
+        vals = a * e
+        parts = [e, vals * d / sigma**2, vals * d**2 / sigma**3]
+    elif shape == "lorentzian":
+        gamma = P[:, 2:3]
+        den = d**2 + gamma**2
+        shape_ = gamma**2 / den
+        vals = a * shape_
+        parts = [shape_, 2.0 * vals * d / den, 2.0 * a * gamma * d**2 / den**2]
+    else:   # voigt: d/dz wofz(z) = -2 z w(z) + 2i/sqrt(pi)
+        sigma, gamma = P[:, 2:3], P[:, 3:4]
+        s2 = sigma * np.sqrt(2.0)
+        z = (d + 1j * gamma) / s2
+        w = wofz(z)
+        dw = -2.0 * z * w + 2j / np.sqrt(np.pi)
+        c = 1.0 / (sigma * np.sqrt(2.0 * np.pi))
+        vals = a * c * w.real
+        parts = [c * w.real, -a * c * dw.real / s2,
+                 a * c * (np.real(dw * -z) - w.real) / sigma, -a * c * dw.imag / s2]
+    return vals, np.stack(parts, axis=1)
+
+
+# Analytic Jacobians for curve_fit(jac=...): (len(x), n_params) arrays
+def _exp_jac(x, a, b):
+    e = np.exp(b * x)
+    return np.column_stack([e, a * x * e])
+
+def _peak_jac(shape, x, *params):
+    return _peak_terms(shape, np.asarray(x, dtype=float), np.array([params], dtype=float))[1][0].T
+
+def _gauss_jac(x, a, mu, sigma):
+    return _peak_jac("gaussian", x, a, mu, sigma)
+
+def _lorentz_jac(x, a, x0, gamma):
+    return _peak_jac("lorentzian", x, a, x0, gamma)
+
+def _voigt_jac(x, a, mu, sigma, gamma):
+    return _peak_jac("voigt", x, a, mu, sigma, gamma)
+
+
+class CompositePeakModel:
+    """
+    Sum of ``n_peaks`` Gaussian, Lorentzian or Voigt peaks plus a polynomial
+    background of degree ``background``, fitted with bounded trust-region
+    least squares and an analytic, vectorized Jacobian. Parameters are laid
+    out peak by peak (``a1, mu1, sigma1, a2, ...``) followed by ``c0..ck``.
+    """
+    SHAPES = {
+        "gaussian": ("a", "mu", "sigma"),
+        "lorentzian": ("a", "x0", "gamma"),
+        "voigt": ("a", "mu", "sigma", "gamma"),
+    }
+
+    def __init__(self, shape: str, n_peaks: int, background: int = 1):
+        if shape not in self.SHAPES:
+            raise ValueError(f"Unknown peak shape: {shape}")
+        self.shape = shape
+        self.n_peaks = max(int(n_peaks), 1)
+        self.background = max(int(background), -1)    # -1: no background
+        self.k = len(self.SHAPES[shape])
+
+    @property
+    def names(self):
+        peaks = [f"{p}{i + 1}" for i in range(self.n_peaks) for p in self.SHAPES[self.shape]]
+        return peaks + [f"c{j}" for j in range(self.background + 1)]
+
+    def _split(self, p):
+        split = self.n_peaks * self.k
+        return p[:split].reshape(self.n_peaks, self.k), p[split:]
+
+    def __call__(self, x, p):
+        P, coef = self._split(np.asarray(p, dtype=float))
+        vals, _ = _peak_terms(self.shape, x, P)
+        return vals.sum(axis=0) + (np.polyval(coef[::-1], x) if coef.size else 0.0)
+
+    def jacobian(self, x, p):
+        P, coef = self._split(np.asarray(p, dtype=float))
+        _, parts = _peak_terms(self.shape, x, P)
+        J = parts.transpose(2, 0, 1).reshape(x.size, -1)
+        if coef.size:
+            J = np.hstack([J, x[:, None] ** np.arange(coef.size)])
+        return J
+
+    def guess(self, x, y):
+        """Initial parameters and bounds from the most prominent peaks above the background."""
+        xs, base, step, seeds = detect_peaks(x, y, self.n_peaks)
+        p0, lo, hi = [], [], []
+        for h, c, w in seeds:
+            p, l, u = peak_seed(self.shape, h, c, w, xs, step)
+            p0 += p; lo += l; hi += u
+        coef = [base] + [0.0] * self.background if self.background >= 0 else []
+        p0 += coef
+        lo += [-np.inf] * len(coef)
+        hi += [np.inf] * len(coef)
+        lo, hi = np.array(lo, dtype=float), np.array(hi, dtype=float)
+        return _clip_into(p0, lo, hi), (lo, hi)
+
+    def fit(self, x, y, p0=None, bounds=None, monitor=None, **lsq_kw):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        if x.size <= len(self.names):
+            raise ValueError(f"{len(self.names)} parameters need more than {x.size} points")
+        guess_p0, guess_bounds = self.guess(x, y)
+        bounds = bounds or guess_bounds
+        if p0 is None:
+            p0 = guess_p0
+        else:
+            p0 = _clip_into(p0, *bounds)    # a warm start from another range may sit outside these bounds
+        model = _watched(lambda x_, *p: self(x_, np.asarray(p)), monitor)
+        jac = _watched_jac(lambda x_, *p: self.jacobian(x_, np.asarray(p)), monitor)
+        try:
+            res = least_squares(
+                lambda p: model(x, *p) - y, p0, jac=lambda p: jac(x, *p),
+                bounds=bounds, method="trf", x_scale="jac", **lsq_kw,
+            )
+            popt = res.x
+        except FitStopped as stop:
+            if not stop.timed_out or monitor.best is None:
+                raise
+            popt = monitor.best
+        yhat = self(x, popt)
+        return FitResult(
+            name=f"{self.n_peaks} × {self.shape.title()} + poly{self.background}" if self.background >= 0
+            else f"{self.n_peaks} × {self.shape.title()}",
+            params=dict(zip(self.names, map(float, popt))),
+            x=x, y_fit=yhat, cov=_covariance(self.jacobian(x, popt), y - yhat), r2=_r2_score(y, yhat),
+            model=lambda x_, *p: self(x_, np.asarray(p)), jac=lambda x_, *p: self.jacobian(x_, np.asarray(p)),
+        )
+
+
+# ---------- helpers ----------
+@dataclass
+class FitResult:
+    name: str
+    params: Dict[str, float]
+    x: np.ndarray
+    y_fit: np.ndarray
+    cov: np.ndarray | None
+    r2: float | None
+    model: Callable | None = None   # f(x, *params), params in ``params`` order
+    jac: Callable | None = None     # df/dparams(x, *params) -> (n, k)
+    fitted: np.ndarray | None = None    # mask of the points the fit used; None = all
+
+    @property
+    def popt(self) -> np.ndarray:
+        return np.array([float(v) for v in self.params.values()])
+
+
+def _r2_score(y, yhat) -> float:
+    ss_res = np.sum((y - yhat) ** 2.0)
+    ss_tot = np.sum((y - np.mean(y)) ** 2.0)
+    return float(1.0 - ss_res / ss_tot) if ss_tot > 0 else np.nan
+
+
+def _covariance(J, resid) -> np.ndarray:
+    """Parameter covariance as curve_fit computes it: pinv(J^T J) scaled by the residual variance."""
+    _, sv, vt = np.linalg.svd(J, full_matrices=False)
+    keep = sv > np.finfo(float).eps * max(J.shape) * sv[0]
+    cov = (vt[keep].T / sv[keep]**2) @ vt[keep]
+    return cov * float(np.sum(resid**2)) / max(J.shape[0] - J.shape[1], 1)
+
+
+# ---------- fit monitoring ----------
+class FitStopped(Exception):
+    """Raised inside an optimizer's callbacks to stop a fit (cancelled or timed out)."""
+    def __init__(self, timed_out: bool):
+        super().__init__("Fit timed out" if timed_out else "Fit cancelled")
+        self.timed_out = timed_out
+
+
+class FitMonitor:
+    """
+    Watches a running fit through its model and Jacobian evaluations.
+    Keeps the best parameters seen, reports ``progress(dict)`` at most every
+    ``interval`` seconds and stops the fit with FitStopped once ``cancelled()``
+    is true or ``timeout`` seconds have passed.
+    """
+    def __init__(self, y, progress=None, cancelled=None, timeout=None, interval=0.1):
+        self.y = np.asarray(y, dtype=float)
+        self.progress = progress
+        self.cancelled = cancelled
+        self.timeout = timeout
+        self.interval = interval
+        self.started = time.monotonic()
+        self.evaluations = self.iterations = 0
+        self.best, self.best_cost = None, np.inf
+        self.timed_out = False
+        self._reported = 0.0
+
+    def check(self):
+        if self.cancelled is not None and self.cancelled():
+            raise FitStopped(False)
+        if self.timeout and time.monotonic() - self.started > self.timeout:
+            self.timed_out = True
+            raise FitStopped(True)
+
+    def observe(self, params, yhat):
+        self.evaluations += 1
+        if np.shape(yhat) == self.y.shape:
+            cost = float(np.sum((yhat - self.y) ** 2))
+            if cost < self.best_cost:
+                self.best, self.best_cost = np.array(params, dtype=float), cost
+        now = time.monotonic()
+        if self.progress is not None and now - self._reported >= self.interval:
+            self._reported = now
+            self.progress({"evaluations": self.evaluations, "iterations": self.iterations,
+                           "cost": self.best_cost, "elapsed": now - self.started})
+        self.check()
+
+
+def _watched(f, monitor):
+    """Model ``f(x, *p)`` that reports each evaluation to ``monitor``."""
+    if monitor is None:
+        return f
+    def watched(x, *p):
+        out = f(x, *p)
+        monitor.observe(p, out)
+        return out
+    return watched
+
+
+def _watched_jac(jac, monitor):
+    """Jacobian ``jac(x, *p)`` counted as one optimizer iteration per call."""
+    if monitor is None:
+        return jac
+    def watched(x, *p):
+        monitor.iterations += 1
+        monitor.check()
+        return jac(x, *p)
+    return watched
+
+
+def _fit_curve(f, jac, x, y, p0, monitor=None, **kw):
+    """
+    ``curve_fit`` with an optional FitMonitor. A fit that times out returns
+    the best parameters seen so far, with the covariance taken at them.
+    """
+    if monitor is not None:
+        monitor.y = np.asarray(y, dtype=float)  # score against the points actually fitted (Exponential masks)
+    try:
+        return curve_fit(_watched(f, monitor), x, y, p0=p0, jac=_watched_jac(jac, monitor), **kw)
+    except FitStopped as stop:
+        if not stop.timed_out or monitor.best is None:
+            raise
+        popt = monitor.best
+        return popt, _covariance(jac(x, *popt), y - f(x, *popt))
+
+
+def fit_model(name: str, x: np.ndarray, y: np.ndarray, expr: str = None,
+              peaks: int = 3, background: int = 1, monitor: FitMonitor = None,
+              p0=None) -> FitResult:
+    """
+    Fit the named model (as listed in the Fit panel) to ``x``/``y``.
+    ``expr`` is the expression for the "Custom" model; ``peaks`` and
+    ``background`` (polynomial degree) configure the multi-peak models.
+    An optional ``monitor`` reports progress and can stop iterative fits;
+    ``p0`` replaces the built-in starting guess of iterative models.
+    Module-level so batch fits can run it in worker processes.
+    """
+    name = name.lower()
+
+    if name.endswith("peaks"):
+        return CompositePeakModel(name.split()[0], peaks, background).fit(x, y, p0=p0, monitor=monitor)
+
+    if name.startswith("linear"):
+        p, cov = np.polyfit(x, y, 1, cov=True)
+        yhat = np.poly1d(p)(x)
+        return FitResult(
+            name="Linear",
+            params={"slope": float(p[0]), "intercept": float(p[1])},
+            x=x, y_fit=yhat, cov=cov, r2=_r2_score(y, yhat),
+            model=lambda x_, a, b: a * x_ + b,
+            jac=lambda x_, a, b: np.column_stack([x_, np.ones_like(x_)]),
+        )
+
+    if name.startswith("polynomial"):
+        deg = 2 if "2" in name else 3
+        p, cov = np.polyfit(x, y, deg, cov=True)
+        yhat = np.poly1d(p)(x)
+        params = {f"c{i}": float(v) for i, v in enumerate(p[::-1])}  # c0 + c1 x + ...
+        return FitResult(
+            name=f"Polynomial (deg {deg})",
+            params=params, x=x, y_fit=yhat, cov=cov[::-1, ::-1], r2=_r2_score(y, yhat),  # cov in c0.. order
+            model=lambda x_, *c: np.polyval(c[::-1], x_),
+            jac=lambda x_, *c: np.vander(x_, len(c), increasing=True),
+        )
+
+    if name.startswith("exponential"):
+        # require positive y for log-likelihood stability
+        mask = y > 0
+        if np.count_nonzero(mask) < 3:
+            raise ValueError("Exponential requires positive y values.")
+        p0 = (max(y[mask]), 0.1) if p0 is None else p0
+        popt, pcov = _fit_curve(_exp, _exp_jac, x[mask], y[mask], p0, monitor)
+        yhat = _exp(x, *popt)
+        return FitResult(
+            name="Exponential", params={"a": popt[0], "b": popt[1]},
+            x=x, y_fit=yhat, cov=pcov, r2=_r2_score(y[mask], _exp(x[mask], *popt)),
+            model=_exp, jac=_exp_jac, fitted=mask,
+        )
+
+    if name.startswith("gaussian"):
+        seed, bounds = single_peak_seed("gaussian", x, y)
+        p0 = seed if p0 is None or not _within(p0, *bounds) else p0    # stale warm starts re-seed
+        popt, pcov = _fit_curve(_gauss, _gauss_jac, x, y, p0, monitor, bounds=bounds)
+        yhat = _gauss(x, *popt)
+        return FitResult(
+            name="Gaussian", params={"a": popt[0], "mu": popt[1], "sigma": popt[2]},
+            x=x, y_fit=yhat, cov=pcov, r2=_r2_score(y, yhat), model=_gauss, jac=_gauss_jac,
+        )
+
+    if name.startswith("lorentz"):
+        seed, bounds = single_peak_seed("lorentzian", x, y)
+        p0 = seed if p0 is None or not _within(p0, *bounds) else p0    # stale warm starts re-seed
+        popt, pcov = _fit_curve(_lorentz, _lorentz_jac, x, y, p0, monitor, bounds=bounds)
+        yhat = _lorentz(x, *popt)
+        return FitResult(
+            name="Lorentzian", params={"a": popt[0], "x0": popt[1], "gamma": popt[2]},
+            x=x, y_fit=yhat, cov=pcov, r2=_r2_score(y, yhat), model=_lorentz, jac=_lorentz_jac,
+        )
+
+    if name.startswith("voigt"):
+        seed, bounds = single_peak_seed("voigt", x, y)
+        p0 = seed if p0 is None or not _within(p0, *bounds) else p0    # stale warm starts re-seed
+        popt, pcov = _fit_curve(_voigt, _voigt_jac, x, y, p0, monitor, bounds=bounds)
+        yhat = _voigt(x, *popt)
+        return FitResult(
+            name="Voigt", params={"a": popt[0], "mu": popt[1], "sigma": popt[2], "gamma": popt[3]},
+            x=x, y_fit=yhat, cov=pcov, r2=_r2_score(y, yhat), model=_voigt, jac=_voigt_jac,
+        )
+
+    if name.startswith("custom"):
+        f = compile_expression((expr or "").strip())
+        p0 = np.ones(len(f.params)) if p0 is None else p0
+        popt, pcov = _fit_curve(f, f.jacobian, x, y, p0, monitor, maxfev=20000)
+        yhat = f(x, *popt)
+        params = {p: float(v) for p, v in zip(f.params, popt)}
+        return FitResult(
+            name=f"Custom: {f.source}", params=params, x=x, y_fit=yhat, cov=pcov, r2=_r2_score(y, yhat),
+            model=f, jac=f.jacobian,
+        )
+
+    raise ValueError(f"Unknown model: {name}")
+
+
+# ---------- result cache ----------
+class FitCache:
+    """
+    LRU of fit results keyed by a digest of the fitted (masked) arrays, the
+    model and its options, bounded by entry count and by the bytes of the
+    stored curves. It also remembers the latest parameters per source data
+    and model, so refitting the same columns over a new range starts the
+    optimizer from the previous solution.
+    """
+    def __init__(self, max_entries: int = 32, max_bytes: int = 256 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._results = OrderedDict()    # (data, model) -> FitResult
+        self._starts = OrderedDict()     # (source, model) -> parameter vector
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(*arrays) -> str:
+        h = hashlib.blake2b(digest_size=16)
+        for a in arrays:
+            a = np.ascontiguousarray(a, dtype=float)
+            h.update(str(a.shape).encode())
+            h.update(a)
+        return h.hexdigest()
+
+    @staticmethod
+    def model_key(name: str, expr: str = None, **options) -> tuple:
+        """Only the settings the named model actually reads, so unrelated edits still hit."""
+        name = name.lower()
+        return (
+            name,
+            (expr or "").strip() if name.startswith("custom") else None,
+            tuple(sorted(options.items())) if name.endswith("peaks") else (),
+        )
+
+    @staticmethod
+    def _size(fit: FitResult) -> int:
+        return fit.x.nbytes + fit.y_fit.nbytes
+
+    def get(self, data: str, model: tuple):
+        with self._lock:
+            fit = self._results.get((data, model))
+            if fit is not None:
+                self._results.move_to_end((data, model))
+            return fit
+
+    def put(self, data: str, model: tuple, fit: FitResult):
+        with self._lock:
+            old = self._results.pop((data, model), None)
+            if old is not None:
+                self._bytes -= self._size(old)
+            self._results[(data, model)] = fit
+            self._bytes += self._size(fit)
+            while self._results and (len(self._results) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._results.popitem(last=False)
+                self._bytes -= self._size(evicted)
+
+    def warm_start(self, source: str, model: tuple):
+        with self._lock:
+            return self._starts.get((source, model))
+
+    def remember(self, source: str, model: tuple, params):
+        with self._lock:
+            self._starts[(source, model)] = np.array(params, dtype=float)
+            self._starts.move_to_end((source, model))
+            while len(self._starts) > 4 * self.max_entries:
+                self._starts.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self._starts.clear()
+            self._bytes = 0
+
+    def fit(self, name: str, x: np.ndarray, y: np.ndarray, expr: str = None, source: str = None,
+            monitor: FitMonitor = None, **options) -> FitResult:
+        """
+        ``fit_model`` through the cache. ``source`` identifies the unmasked
+        data the range was cut from (e.g. ``digest`` of the full columns) and
+        enables the warm start; a warm start that fails falls back to the
+        model's own guess. Fits stopped at a time limit are neither cached nor
+        remembered as warm starts.
+        """
+        model = self.model_key(name, expr, **options)
+        data = self.digest(x, y)
+        fit = self.get(data, model)
+        if fit is not None:
+            return fit
+        p0 = self.warm_start(source, model) if source is not None else None
+        fit = None
+        if p0 is not None:
+            try:
+                fit = fit_model(name, x, y, expr, monitor=monitor, p0=p0, **options)
+            except (RuntimeError, ValueError):
+                fit = None      # no convergence from the old solution; start cold
+        if fit is None:
+            fit = fit_model(name, x, y, expr, monitor=monitor, **options)
+        if monitor is None or not monitor.timed_out:
+            if source is not None:
+                self.remember(source, model, list(fit.params.values()))
+            self.put(data, model, fit)
+        return fit
+
+
+FIT_CACHE = FitCache()
+
+
+# ---------- compiled custom expressions ----------
+_EXPR_FUNCS = {
+    "exp": np.exp, "log": np.log, "log10": np.log10, "sqrt": np.sqrt, "abs": np.abs,
+    "sin": np.sin, "cos": np.cos, "tan": np.tan, "arctan": np.arctan,
+    "sinh": np.sinh, "cosh": np.cosh, "tanh": np.tanh,
+}
+# No single letters here: every other free name (a, b, c, d, e, ...) is a fit parameter
+_EXPR_CONSTS = {"pi": np.pi, "euler": np.e}
+_EXPR_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow)
+
+
+def _num(v):
+    return ast.Constant(value=v)
+
+
+def _is_num(node, v=None):
+    return isinstance(node, ast.Constant) and (v is None or node.value == v)
+
+
+def _bin(left, op, right):
+    """BinOp with the trivial identities (0 + u, 1 * u, u ** 1, ...) folded away."""
+    if isinstance(op, ast.Add):
+        if _is_num(left, 0): return right
+        if _is_num(right, 0): return left
+    elif isinstance(op, ast.Sub):
+        if _is_num(right, 0): return left
+        if _is_num(left, 0): return _neg(right)
+    elif isinstance(op, ast.Mult):
+        if _is_num(left, 0) or _is_num(right, 0): return _num(0)
+        if _is_num(left, 1): return right
+        if _is_num(right, 1): return left
+    elif isinstance(op, ast.Div):
+        if _is_num(left, 0): return _num(0)
+        if _is_num(right, 1): return left
+    elif isinstance(op, ast.Pow):
+        if _is_num(right, 0): return _num(1)
+        if _is_num(right, 1): return left
+    if _is_num(left) and _is_num(right):
+        folded = ast.fix_missing_locations(ast.Expression(ast.BinOp(left, op, right)))
+        return _num(eval(compile(folded, "<fit>", "eval")))
+    return ast.BinOp(left=left, op=op, right=right)
+
+
+def _neg(node):
+    if _is_num(node):
+        return _num(-node.value)
+    return ast.UnaryOp(op=ast.USub(), operand=node)
+
+
+def _call(fn, arg):
+    return ast.Call(func=ast.Name(id=fn, ctx=ast.Load()), args=[arg], keywords=[])
+
+
+def _diff(node, var):
+    """Symbolic derivative of a whitelisted expression tree with respect to ``var``."""
+    if isinstance(node, ast.Constant):
+        return _num(0)
+    if isinstance(node, ast.Name):
+        return _num(1 if node.id == var else 0)
+    if isinstance(node, ast.UnaryOp):
+        d = _diff(node.operand, var)
+        return _neg(d) if isinstance(node.op, ast.USub) else d
+    if isinstance(node, ast.BinOp):
+        u, v, op = node.left, node.right, node.op
+        du, dv = _diff(u, var), _diff(v, var)
+        if isinstance(op, (ast.Add, ast.Sub)):
+            return _bin(du, op, dv)
+        if isinstance(op, ast.Mult):
+            return _bin(_bin(du, ast.Mult(), v), ast.Add(), _bin(u, ast.Mult(), dv))
+        if isinstance(op, ast.Div):
+            top = _bin(_bin(du, ast.Mult(), v), ast.Sub(), _bin(u, ast.Mult(), dv))
+            return _bin(top, ast.Div(), _bin(v, ast.Pow(), _num(2)))
+        # u ** v
+        if _is_num(dv, 0):
+            return _bin(_bin(v, ast.Mult(), _bin(u, ast.Pow(), _bin(v, ast.Sub(), _num(1)))), ast.Mult(), du)
+        inner = _bin(_bin(dv, ast.Mult(), _call("log", u)), ast.Add(), _bin(_bin(v, ast.Mult(), du), ast.Div(), u))
+        return _bin(node, ast.Mult(), inner)
+    # whitelisted single-argument call
+    fn, u = node.func.id, node.args[0]
+    du = _diff(u, var)
+    if _is_num(du, 0):
+        return _num(0)
+    outer = {
+        "exp": lambda: node,
+        "log": lambda: _bin(_num(1), ast.Div(), u),
+        "log10": lambda: _bin(_num(1), ast.Div(), _bin(u, ast.Mult(), _num(float(np.log(10))))),
+        "sqrt": lambda: _bin(_num(0.5), ast.Div(), node),
+        "abs": lambda: _bin(u, ast.Div(), node),
+        "sin": lambda: _call("cos", u),
+        "cos": lambda: _neg(_call("sin", u)),
+        "tan": lambda: _bin(_num(1), ast.Div(), _bin(_call("cos", u), ast.Pow(), _num(2))),
+        "arctan": lambda: _bin(_num(1), ast.Div(), _bin(_num(1), ast.Add(), _bin(u, ast.Pow(), _num(2)))),
+        "sinh": lambda: _call("cosh", u),
+        "cosh": lambda: _call("sinh", u),
+        "tanh": lambda: _bin(_num(1), ast.Sub(), _bin(node, ast.Pow(), _num(2))),
+    }[fn]()
+    return _bin(outer, ast.Mult(), du)
+
+
+class _ExprCheck(ast.NodeTransformer):
+    """Rejects anything outside arithmetic, whitelisted functions, names and numbers."""
+    def generic_visit(self, node):
+        raise ValueError(f"'{ast.unparse(node)}' is not allowed in a fit expression")
+
+    def visit_Expression(self, node):
+        node.body = self.visit(node.body)
+        return node
+
+    def visit_BinOp(self, node):
+        if isinstance(node.op, ast.BitXor):
+            raise ValueError("Use ** for powers (x**2); ^ binds looser than * in Python")
+        if not isinstance(node.op, _EXPR_OPS):
+            raise ValueError(f"Operator in '{ast.unparse(node)}' is not allowed in a fit expression")
+        node.left, node.right = self.visit(node.left), self.visit(node.right)
+        return node
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, (ast.USub, ast.UAdd)):
+            raise ValueError(f"'{ast.unparse(node)}' is not allowed in a fit expression")
+        node.operand = self.visit(node.operand)
+        return node
+
+    def visit_Call(self, node):
+        func = node.func
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) \
+                and func.value.id in ("np", "numpy"):
+            func = ast.Name(id=func.attr, ctx=ast.Load())     # np.exp(...) -> exp(...)
+        if not (isinstance(func, ast.Name) and func.id in _EXPR_FUNCS) or len(node.args) != 1 or node.keywords:
+            raise ValueError(f"'{ast.unparse(node)}' is not allowed; use one of {', '.join(_EXPR_FUNCS)}")
+        return ast.Call(func=func, args=[self.visit(node.args[0])], keywords=[])
+
+    def visit_Name(self, node):
+        if node.id in _EXPR_FUNCS:
+            raise ValueError(f"'{node.id}' is a function, not a value")
+        return ast.Name(id=node.id, ctx=ast.Load())
+
+    def visit_Constant(self, node):
+        if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+            raise ValueError(f"{node.value!r} is not a number")
+        return node
+
+
+class CompiledExpression:
+    """
+    A custom fit expression in ``x``, parsed once through a whitelisted AST.
+    Every other free name is a parameter (``params``, sorted). The model and
+    its symbolic partial derivatives are compiled to vectorized callables,
+    evaluated with numexpr for large inputs when it is installed.
+    """
+    numexpr_min_size = 50_000
+
+    def __init__(self, source: str):
+        source = source.strip()
+        if not source:
+            raise ValueError("Enter a custom expression, e.g. a*x**2 + b*x + c")
+        try:
+            tree = ast.parse(source, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression: {e.msg}") from None
+        tree = ast.fix_missing_locations(_ExprCheck().visit(tree))
+        names = {n.id for n in ast.walk(tree) if isinstance(n, ast.Name)}
+        if "x" not in names:
+            raise ValueError("The expression must use x")
+        self.source = source
+        self.params = tuple(sorted(names - {"x"} - set(_EXPR_CONSTS) - set(_EXPR_FUNCS)))
+        if not self.params:
+            raise ValueError("The expression has no parameters to fit")
+        derivs = [ast.fix_missing_locations(ast.Expression(_diff(tree.body, p))) for p in self.params]
+        self._code = self._compile(tree)
+        self._jac_code = [self._compile(d) for d in derivs]
+        self.jacobian_source = [ast.unparse(d.body) for d in derivs]
+
+    @staticmethod
+    def _compile(tree):
+        return compile(tree, "<fit expression>", "eval"), ast.unparse(tree.body)
+
+    def _eval(self, code, x, values):
+        compiled, text = code
+        env = dict(_EXPR_CONSTS, x=x, **dict(zip(self.params, values)))
+        if numexpr is not None and np.size(x) >= self.numexpr_min_size:
+            out = numexpr.evaluate(text, local_dict=env)
+        else:
+            out = eval(compiled, {"__builtins__": {}, **_EXPR_FUNCS}, env)
+        return np.broadcast_to(np.asarray(out, dtype=float), np.shape(x))
+
+    def __call__(self, x, *values):
+        return self._eval(self._code, x, values)
+
+    def jacobian(self, x, *values):
+        return np.column_stack([self._eval(code, x, values) for code in self._jac_code])
+
+
+@lru_cache(maxsize=64)
+def compile_expression(source: str) -> CompiledExpression:
+    """Cached ``CompiledExpression`` for ``source``; re-fits reuse the compiled form."""
+    return CompiledExpression(source)
+
+
+# ---------- shared fit pool ----------
+# A spawned worker re-imports this module (numpy, scipy, Qt) before its first
+# fit, which costs more than thousands of small fits. Jobs below POOL_MIN_WORK
+# points x fits therefore run in-process; bigger ones share one long-lived pool
+# so that start-up is paid once per session, not once per job.
+POOL_MIN_WORK = 1_000_000
+_FIT_POOL = None
+_FIT_POOL_LOCK = threading.Lock()
+
+
+def fit_pool() -> ProcessPoolExecutor:
+    """The shared spawn-context process pool, created on first use."""
+    global _FIT_POOL
+    with _FIT_POOL_LOCK:
+        if _FIT_POOL is None:
+            _FIT_POOL = ProcessPoolExecutor(os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+        return _FIT_POOL
+
+
+def _run_pooled(jobs, sizes, progress=None, cancelled=None):
+    """
+    Run ``(fn, *args)`` jobs on the shared pool and return their results in
+    job order, or None once ``cancelled()`` is true. ``progress`` receives the
+    running total of ``sizes`` of the finished jobs. Jobs not yet started are
+    dropped on cancel or error; the pool itself stays up for the next caller.
+    """
+    global _FIT_POOL
+    results = [None] * len(jobs)
+    pending = {}
+    try:
+        pending = {fit_pool().submit(*job): i for i, job in enumerate(jobs)}
+        done_size = 0
+        while pending:
+            if cancelled is not None and cancelled():
+                return None
+            done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = pending.pop(future)
+                results[i] = future.result()
+                done_size += sizes[i]
+            if progress is not None and done:
+                progress(done_size)
+    except BrokenProcessPool:
+        with _FIT_POOL_LOCK:
+            _FIT_POOL = None        # a worker died; the next job gets a fresh pool
+        raise
+    finally:
+        for future in pending:
+            future.cancel()
+    return results
+
+
+# ---------- batch fitting ----------
+def column_fit_tasks(df: pd.DataFrame, xcol: str, ycols) -> list:
+    """One batch task per Y column, all against ``xcol``."""
+    x = df[xcol].to_numpy(dtype=float, na_value=np.nan)
+    return [(str(col), (x, df[col].to_numpy(dtype=float, na_value=np.nan))) for col in ycols]
+
+
+def group_fit_tasks(df: pd.DataFrame, xcol: str, ycol: str, by: str) -> list:
+    """One batch task per value of the grouping column ``by``."""
+    return [
+        (f"{by}={key}", (g[xcol].to_numpy(dtype=float, na_value=np.nan),
+                         g[ycol].to_numpy(dtype=float, na_value=np.nan)))
+        for key, g in df[[xcol, ycol, by]].groupby(by, sort=True)
+    ]
+
 
-    def plot_scatter(self):
-        self.scatter_canvas.figure.clear()
-        ax = self.scatter_canvas.figure.subplots()
-        num_cols = self.df.select_dtypes(include="number").columns
-        if len(num_cols) >= 2:
-            ax.scatter(self.df[num_cols[0]], self.df[num_cols[1]], color="#008CBA", alpha=0.7)
-            ax.set_xlabel(num_cols[0]); ax.set_ylabel(num_cols[1])
-            ax.set_title("Scatter Plot")
-        self.scatter_canvas.draw()
+def file_fit_tasks(paths, xcol: str, ycol: str) -> list:
+    """One batch task per CSV file; the files are read by the worker processes."""
+    return [(os.path.basename(path), (path, xcol, ycol)) for path in paths]
+
+
+def _fit_row(label, source, name, expr, x_range, options=None) -> dict:
+    """Fit one batch task and flatten the result into a parameter-table row."""
+    row = {"target": label, "model": name, "n": 0, "converged": False, "r2": np.nan, "message": ""}
+    try:
+        if isinstance(source[0], str):
+            path, xcol, ycol = source
+            frame = pd.read_csv(path, usecols=[xcol, ycol])
+            source = (frame[xcol].to_numpy(dtype=float, na_value=np.nan),
+                      frame[ycol].to_numpy(dtype=float, na_value=np.nan))
+        x, y = (np.asarray(a, dtype=float) for a in source)
+        mask = np.isfinite(x) & np.isfinite(y)
+        if x_range is not None:
+            mask &= (x >= x_range[0]) & (x <= x_range[1])
+        x, y = x[mask], y[mask]
+        row["n"] = int(x.size)
+        if x.size < 3:
+            raise ValueError("fewer than 3 points in range")
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fit = fit_model(name, x, y, expr, **(options or {}))
+        values = np.array([float(v) for v in fit.params.values()])
+        errors = np.sqrt(np.abs(np.diag(fit.cov))) if fit.cov is not None else np.full(values.size, np.nan)
+        row.update(model=fit.name, r2=fit.r2,
+                   converged=bool(np.all(np.isfinite(values)) and np.all(np.isfinite(errors))))
+        for (key, value), err in zip(fit.params.items(), errors):
+            row[key] = float(value)
+            row[f"{key}_err"] = float(err)
+    except Exception as e:
+        row["message"] = str(e)
+    return row
+
+
+def _fit_rows(tasks, name, expr, x_range, options=None) -> list:
+    return [_fit_row(label, source, name, expr, x_range, options) for label, source in tasks]
+
+
+def batch_fit(tasks, name: str, expr: str = None, x_range=None, progress=None, cancelled=None,
+              max_workers=None, options=None):
+    """
+    Fit ``name`` to every ``(label, source)`` task -- ``source`` is an
+    ``(x, y)`` pair or a ``(path, xcol, ycol)`` CSV reference -- spread over
+    the shared fit pool once the job is big enough (``POOL_MIN_WORK``).
+    Returns the parameter table (estimates, ``*_err`` standard errors, R²,
+    convergence flag, error message), in task order, or None once
+    ``cancelled()`` is true. ``options`` go to ``fit_model``.
+    """
+    if not tasks:
+        return pd.DataFrame()
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(tasks)))
+    # A CSV task's size is unknown until it is read; count it as a full job.
+    work = sum(POOL_MIN_WORK if isinstance(source[0], str) else len(source[0]) for _, source in tasks)
+    if workers == 1 or work < POOL_MIN_WORK:
+        rows = []
+        for i, (label, source) in enumerate(tasks):
+            if cancelled is not None and cancelled():
+                return None
+            rows.append(_fit_row(label, source, name, expr, x_range, options))
+            if progress is not None:
+                progress(i + 1)
+        return pd.DataFrame(rows)
+
+    # Small chunks keep the pool busy to the end; each carries its own arrays.
+    size = max(1, -(-len(tasks) // (workers * 8)))
+    chunks = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+    results = _run_pooled([(_fit_rows, chunk, name, expr, x_range, options) for chunk in chunks],
+                          [len(chunk) for chunk in chunks], progress, cancelled)
+    if results is None:
+        return None
+    return pd.DataFrame([row for rows in results for row in rows])
 
-    def plot_correlation(self):
-        self.corr_canvas.figure.clear()
-        ax = self.corr_canvas.figure.subplots()
-        corr = self.df.select_dtypes(include="number").corr()
-        cax = ax.imshow(corr, cmap="coolwarm", vmin=-1, vmax=1)
-        ax.set_xticks(range(len(corr.columns)))
-        ax.set_xticklabels(corr.columns, rotation=45, ha="right")
-        ax.set_yticks(range(len(corr.index)))
-        ax.set_yticklabels(corr.index)
-        self.corr_canvas.figure.colorbar(cax, ax=ax)
-        ax.set_title("Correlation Heatmap")
-        self.corr_canvas.draw()
 
-    def plot_pairplot(self):
-        self.pair_canvas.figure.clear()
-        ax = self.pair_canvas.figure.subplots()
-        num_cols = self.df.select_dtypes(include="number").columns
-        if len(num_cols) > 1:
-            pd.plotting.scatter_matrix(self.df[num_cols], ax=ax, alpha=0.7, diagonal="hist")
-            ax.set_title("Pair Plot")
-        self.pair_canvas.draw()
+# ---------- confidence & prediction bands ----------
+BAND_POINTS = 400        # bands are evaluated on at most this many x positions
+BOOTSTRAP_SAMPLES = 200
 
-    def plot_violin(self):
-        self.violin_canvas.figure.clear()
-        ax = self.violin_canvas.figure.subplots()
-        num_cols = self.df.select_dtypes(include="number").columns
-        if len(num_cols) > 0:
-            ax.violinplot([self.df[col].dropna() for col in num_cols], showmeans=True)
-            ax.set_xticks(range(1, len(num_cols) + 1))
-            ax.set_xticklabels(num_cols, rotation=45)
-            ax.set_title("Violin Plots")
-        self.violin_canvas.draw()
 
-    def plot_timeseries(self):
-        self.ts_canvas.figure.clear()
-        ax = self.ts_canvas.figure.subplots()
-        date_cols = self.df.select_dtypes(include="datetime").columns
-        num_cols = self.df.select_dtypes(include="number").columns
-        if len(date_cols) > 0 and len(num_cols) > 0:
-            self.df.plot(x=date_cols[0], y=num_cols[0], ax=ax, color="#008CBA")
-            ax.set_title("Time Series")
-        self.ts_canvas.draw()
+def band_grid(x: np.ndarray, points: int = BAND_POINTS) -> np.ndarray:
+    """Sorted evaluation grid for a band: the data's own x when small, else an even decimation."""
+    x = np.asarray(x, dtype=float)
+    x = x[np.isfinite(x)]
+    if x.size <= points:
+        return np.unique(x)
+    return np.linspace(x.min(), x.max(), points)
 
 
-# —————————————————————————————————
-#  Fit DIALOGS
-# —————————————————————————————————
+def _residual_dof(fit: FitResult, x, y):
+    """(residuals at the points the fit used, degrees of freedom) of a fit."""
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if fit.fitted is not None:
+        x, y = x[fit.fitted], y[fit.fitted]
+    resid = y - fit.model(x, *fit.popt)
+    resid = resid[np.isfinite(resid)]
+    return resid, max(resid.size - len(fit.params), 1)
 
-from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QDialog, QDockWidget,
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QComboBox, QSpinBox, QLineEdit, QTextEdit, QCheckBox,
-    QFileDialog, QMessageBox, QColorDialog,
-    QListWidget, QListWidgetItem   # <-- add these
-)
 
-# ──────────────────────────────────────────────────────────────────────────────
-# NEW FIT PANEL (no modal dialog, no black window)
-# ──────────────────────────────────────────────────────────────────────────────
-from dataclasses import dataclass
-from typing import Tuple, Dict, Callable
-import numpy as np
-import pandas as pd
-from scipy.optimize import curve_fit
-from scipy.special import wofz
+def delta_bands(fit: FitResult, x, y, grid, level: float = 0.95):
+    """
+    Delta-method bands on ``grid``: the fitted curve and the half-widths of the
+    confidence band (uncertainty of the mean curve, sqrt(J C J^T)) and of the
+    prediction band (adds the residual variance of a new observation).
+    The Jacobian is evaluated for the whole grid in one call.
+    """
+    if fit.model is None or fit.jac is None or fit.cov is None:
+        raise ValueError(f"{fit.name} has no covariance to build a band from")
+    popt = fit.popt
+    curve = fit.model(grid, *popt)
+    J = np.broadcast_to(fit.jac(grid, *popt), (grid.size, popt.size))
+    var_mean = np.einsum("ij,jk,ik->i", J, np.asarray(fit.cov, dtype=float), J)
+    resid, dof = _residual_dof(fit, x, y)
+    s2 = float(resid @ resid) / dof
+    t = float(t_dist.ppf(0.5 + level / 2.0, dof))
+    var_mean = np.clip(var_mean, 0.0, None)
+    return curve, t * np.sqrt(var_mean), t * np.sqrt(var_mean + s2)
+
+
+def _bootstrap_curves(name, x, y_fit, resid, grid, expr, options, p0, seed, count) -> np.ndarray:
+    """Refit ``count`` residual-resampled data sets; one row of curve values on ``grid`` per sample."""
+    rng = np.random.default_rng(seed)
+    curves = np.full((count, grid.size), np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for i in range(count):
+            y_boot = y_fit + rng.choice(resid, size=y_fit.size, replace=True)
+            try:
+                fit = fit_model(name, x, y_boot, expr, p0=p0, **(options or {}))
+                curves[i] = fit.model(grid, *fit.popt)
+            except Exception:
+                pass        # a failed refit just drops that sample
+    return curves
 
-from PyQt5.QtWidgets import (
-    QWidget, QMainWindow, QVBoxLayout, QHBoxLayout, QLabel, QComboBox,
-    QDoubleSpinBox, QCheckBox, QPushButton, QPlainTextEdit, QFileDialog,
-    QGroupBox, QFormLayout, QSplitter
-)
-from PyQt5.QtCore import Qt
 
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from matplotlib.widgets import SpanSelector
+def bootstrap_bands(fit: FitResult, name: str, x, y, grid, expr: str = None, options=None,
+                    level: float = 0.95, samples: int = BOOTSTRAP_SAMPLES, seed: int = 0,
+                    progress=None, cancelled=None, max_workers=None):
+    """
+    Residual-bootstrap confidence band on ``grid``: refits ``name`` to the
+    fitted curve plus resampled residuals (warm-started from ``fit``) --
+    in-process for small jobs, else on the shared fit pool -- and takes
+    percentiles of the refitted curves. Returns
+    ``(curve, lower, upper)``, or None once ``cancelled()`` is true.
+    """
+    x = np.asarray(x, dtype=float)
+    y_fit = fit.model(x, *fit.popt)
+    resid, _ = _residual_dof(fit, x, y)
+    curve = fit.model(grid, *fit.popt)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, samples))
+    size = max(1, -(-samples // (workers * 4)))
+    counts = [min(size, samples - i) for i in range(0, samples, size)]
+    args = (name, x, y_fit, resid, grid, expr, options, fit.popt)
+
+    if workers == 1 or x.size * samples < POOL_MIN_WORK:
+        parts = []
+        for i, count in enumerate(counts):
+            if cancelled is not None and cancelled():
+                return None
+            parts.append(_bootstrap_curves(*args, seed + i, count))
+            if progress is not None:
+                progress(sum(counts[:i + 1]))
+    else:
+        parts = _run_pooled([(_bootstrap_curves, *args, seed + i, count) for i, count in enumerate(counts)],
+                            counts, progress, cancelled)
+        if parts is None:
+            return None
 
+    curves = np.vstack(parts)
+    curves = curves[np.all(np.isfinite(curves), axis=1)]
+    if len(curves) < 10:
+        raise RuntimeError("too few bootstrap refits converged for a band")
+    alpha = (1.0 - level) / 2.0
+    lower, upper = np.quantile(curves, [alpha, 1.0 - alpha], axis=0)
+    return curve, lower, upper
 
-# ---------- model functions ----------
-def _exp(x, a, b):              # y = a * exp(b x)
-    return a * np.exp(b * x)
 
-def _gauss(x, a, mu, sigma):    # a * exp(-(x-mu)^2 / (2 sigma^2))
-    return a * np.exp(-((x - mu)**2) / (2.0 * sigma**2))
+BAND_KINDS = {"Confidence": "confidence", "Prediction": "prediction", "Bootstrap": "bootstrap"}
 
-def _lorentz(x, a, x0, gamma):  # a * gamma^2 / ((x-x0)^2 + gamma^2)
-    return a * (gamma**2 / ((x - x0)**2 + gamma**2))
 
-def _voigt(x, a, mu, sigma, gamma):
-    z = ((x - mu) + 1j * gamma) / (sigma * np.sqrt(2))
-    return a * np.real(wofz(z)) / (sigma * np.sqrt(2 * np.pi))
+def fit_band(fit: FitResult, x, y, kind: str = "confidence", level: float = 0.95,
+             name: str = None, expr: str = None, options=None, **bootstrap_kw):
+    """
+    ``(grid, lower, upper)`` of a fit's band on a decimated grid: delta-method
+    ``"confidence"`` or ``"prediction"``, or a ``"bootstrap"`` confidence band
+    (refits ``name``; extra keywords go to ``bootstrap_bands``). None if the
+    bootstrap was cancelled.
+    """
+    grid = band_grid(x)
+    if kind == "bootstrap":
+        out = bootstrap_bands(fit, name, x, y, grid, expr, options, level, **bootstrap_kw)
+        return None if out is None else (grid, out[1], out[2])
+    curve, conf, pred = delta_bands(fit, x, y, grid, level)
+    half = pred if kind == "prediction" else conf
+    return grid, curve - half, curve + half
 
 
-# ---------- helpers ----------
-@dataclass
-class FitResult:
-    name: str
-    params: Dict[str, float]
-    x: np.ndarray
-    y_fit: np.ndarray
-    cov: np.ndarray | None
-    r2: float | None
+# ---------- model comparison ----------
+COMPARE_MODELS = ("Linear", "Polynomial (deg 2)", "Polynomial (deg 3)", "Exponential",
+                  "Gaussian", "Lorentzian", "Voigt")
 
 
-def _r2_score(y, yhat) -> float:
-    ss_res = np.sum((y - yhat) ** 2.0)
-    ss_tot = np.sum((y - np.mean(y)) ** 2.0)
-    return float(1.0 - ss_res / ss_tot) if ss_tot > 0 else np.nan
+def _compare_one(name, x, y, grid, timeout=None, cancelled=None) -> dict:
+    """
+    Fit one candidate and score it; the curve on ``grid`` rides along for the
+    overlay. ``timeout`` limits this model's fit (it is then scored at its
+    best parameters so far); cancelling raises FitStopped.
+    """
+    row = {"model": name, "k": np.nan, "rss": np.nan, "red_chi2": np.nan, "aic": np.nan, "bic": np.nan,
+           "r2": np.nan, "message": "", "curve": None}
+    monitor = FitMonitor(y, cancelled=cancelled, timeout=timeout)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            fit = fit_model(name, x, y, monitor=monitor)
+        resid = y - fit.model(x, *fit.popt)
+        n, k = x.size, len(fit.params)
+        rss = float(resid @ resid)
+        if not np.isfinite(rss):
+            raise ValueError("non-finite residuals")
+        # Gaussian-error least squares: -2 log L = n log(RSS/n) + const
+        log_l = n * np.log(max(rss, np.finfo(float).tiny) / n)
+        row.update(k=k, rss=rss, red_chi2=rss / max(n - k, 1), aic=log_l + 2 * k,
+                   bic=log_l + k * np.log(n), r2=fit.r2, curve=fit.model(grid, *fit.popt),
+                   message="stopped at the time limit" if monitor.timed_out else "")
+    except FitStopped as stop:
+        if not stop.timed_out:
+            raise
+        row["message"] = "no usable parameters within the time limit"
+    except Exception as e:
+        row["message"] = str(e)
+    return row
+
+
+def compare_models(x, y, names=COMPARE_MODELS, progress=None, cancelled=None, max_workers=None,
+                   timeout=None):
+    """
+    Fit every candidate in ``names`` to the same ``x``/``y`` concurrently on
+    a thread pool and rank them by AIC. Each fit has its own FitMonitor, so
+    ``timeout`` limits every model and ``cancelled()`` stops all of them
+    mid-optimization. Returns
+    ``(table, grid, curves)``: the table has k, RSS, reduced χ² (RSS per
+    degree of freedom -- unweighted), AIC, BIC, their deltas to the best
+    model and R²; ``curves`` maps model name to its values on ``grid``.
+    None once ``cancelled()`` is true.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    keep = np.isfinite(x) & np.isfinite(y)
+    x, y = x[keep], y[keep]
+    grid = band_grid(x)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(names)))
+    rows = [None] * len(names)
+    # Threads rather than processes: the fits are short and numpy releases the
+    # GIL in their heavy parts, while a spawned worker re-imports this module
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        pending = {executor.submit(_compare_one, name, x, y, grid, timeout, cancelled): i
+                   for i, name in enumerate(names)}
+        while pending:
+            if cancelled is not None and cancelled():
+                return None
+            done, _ = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    rows[pending.pop(future)] = future.result()
+                except FitStopped:
+                    return None
+            if progress is not None and done:
+                progress(sum(row is not None for row in rows))
+    finally:
+        # Running fits see cancelled() at their next evaluation and stop
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    curves = {row["model"]: row.pop("curve") for row in rows}
+    table = pd.DataFrame(rows).sort_values(["aic", "bic"], na_position="last").reset_index(drop=True)
+    table.insert(5, "d_aic", table["aic"] - table["aic"].min())
+    table.insert(7, "d_bic", table["bic"] - table["bic"].min())
+    return table, grid, {name: curve for name, curve in curves.items() if curve is not None}
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -1281,12 +4752,15 @@ class FitDialog(QWidget):
     Fresh, minimal, reliable fit panel.
     - Immediate scatter on open
     - Drag a range to fit (SpanSelector) or use spinboxes
-    - Overlays chosen fit + optional 95% CI
+    - Overlays chosen fit + optional 95% confidence, prediction or bootstrap band
     - PNG export
     """
+    COMPARE_KEYS = ("compare0", "compare1", "compare2")
+    COMPARE_STYLES = (("#E4572E", "-"), ("#17BEBB", "--"), ("#76B041", ":"))
+
     def __init__(self, df: pd.DataFrame, parent=None):
         super().__init__(parent)
-        self.df = df.copy()
+        self.df = df    # read-only snapshot (PandasModel.view); never written to
 
         # Layout scaffold (splitter: plot left | results right)
         root = QVBoxLayout(self)
@@ -1355,12 +4829,26 @@ class FitDialog(QWidget):
         opt_row1 = QHBoxLayout()
         self.model = QComboBox(); self.model.addItems(
             ["Linear", "Polynomial (deg 2)", "Polynomial (deg 3)",
-             "Exponential", "Gaussian", "Lorentzian", "Voigt", "Custom"]
+             "Exponential", "Gaussian", "Lorentzian", "Voigt",
+             "Gaussian peaks", "Lorentzian peaks", "Voigt peaks", "Custom"]
         )
-        self.show_ci = QCheckBox("95% CI")
-        opt_row1.addWidget(QLabel("Model:")); opt_row1.addWidget(self.model); opt_row1.addWidget(self.show_ci)
+        self.show_ci = QCheckBox("95% band")
+        self.band_kind = QComboBox(); self.band_kind.addItems(list(BAND_KINDS))
+        opt_row1.addWidget(QLabel("Model:")); opt_row1.addWidget(self.model)
+        opt_row1.addWidget(self.show_ci); opt_row1.addWidget(self.band_kind)
         form.addRow(opt_row1)
 
+        # Multi-peak options
+        opt_row2 = QHBoxLayout()
+        self.n_peaks = QSpinBox(); self.n_peaks.setRange(1, 100); self.n_peaks.setValue(3)
+        self.bg_degree = QSpinBox(); self.bg_degree.setRange(-1, 3); self.bg_degree.setValue(1)
+        self.bg_degree.setSpecialValueText("none")
+        opt_row2.addWidget(QLabel("Peaks:")); opt_row2.addWidget(self.n_peaks)
+        opt_row2.addWidget(QLabel("Background degree:")); opt_row2.addWidget(self.bg_degree)
+        form.addRow(opt_row2)
+        self.model.currentTextChanged.connect(self._on_model_change)
+        self._on_model_change(self.model.currentText())
+
         self.custom_expr = QComboBox()
         self.custom_expr.setEditable(True)
         self.custom_expr.setPlaceholderText("Custom: e.g. a*x**2 + b*x + c")
@@ -1371,13 +4859,30 @@ class FitDialog(QWidget):
         self.btn_plot = QPushButton("Plot Data")
         self.btn_fit  = QPushButton("Run Fit")
         self.btn_save = QPushButton("Save PNG")
-        btn_row.addWidget(self.btn_plot); btn_row.addWidget(self.btn_fit); btn_row.addWidget(self.btn_save)
+        self.btn_batch = QPushButton("Batch Fit…")
+        self.btn_compare = QPushButton("Compare Models")
+        self.btn_cancel = QPushButton("Cancel"); self.btn_cancel.setEnabled(False)
+        btn_row.addWidget(self.btn_plot); btn_row.addWidget(self.btn_fit); btn_row.addWidget(self.btn_compare)
+        btn_row.addWidget(self.btn_cancel)
+        btn_row.addWidget(self.btn_save); btn_row.addWidget(self.btn_batch)
         form.addRow(btn_row)
 
+        # Background fit: time limit and live progress
+        run_row = QHBoxLayout()
+        self.timeout = QDoubleSpinBox(); self.timeout.setRange(0, 3600); self.timeout.setValue(30)
+        self.timeout.setDecimals(0); self.timeout.setSuffix(" s"); self.timeout.setSpecialValueText("no limit")
+        self.fit_status = QLabel("")
+        run_row.addWidget(QLabel("Time limit:")); run_row.addWidget(self.timeout)
+        run_row.addWidget(self.fit_status, 1)
+        form.addRow(run_row)
+        self._fit_request = 0
+        self._fit_cancel = None
+
         # Canvas (force visible background)
         self.fig = Figure(facecolor="white")
         self.ax = self.fig.add_subplot(111)
         self.canvas = FigureCanvas(self.fig)
+        self.layer = ArtistLayer(self.ax)
         left_lay.addWidget(self.canvas)
 
         # SpanSelector for interactive range
@@ -1389,13 +4894,30 @@ class FitDialog(QWidget):
         # Wiring
         self.btn_plot.clicked.connect(self._plot_scatter)
         self.btn_fit.clicked.connect(self._run_fit)
+        self.btn_compare.clicked.connect(self._run_compare)
+        self.btn_cancel.clicked.connect(self._cancel_fit)
         self.btn_save.clicked.connect(self._save_png)
+        self.btn_batch.clicked.connect(self._open_batch)
         self.x_combo.currentIndexChanged.connect(self._plot_scatter)
         self.y_combo.currentIndexChanged.connect(self._plot_scatter)
 
         # Draw once
         self._plot_scatter(first=True)
 
+    def set_data(self, df: pd.DataFrame, version=None):
+        """Replot from a new snapshot of the table, keeping the chosen columns and ranges."""
+        if df is self.df:
+            return
+        self.df = df
+        numeric = df.select_dtypes(include="number").columns.tolist()
+        refill_combo(self.x_combo, numeric)
+        refill_combo(self.y_combo, numeric)
+        if numeric:
+            lo, hi = float(df[numeric].min().min()), float(df[numeric].max().max())
+            for spin in (self.xmin_spin, self.xmax_spin, self.ymin_spin, self.ymax_spin):
+                spin.setRange(min(lo, spin.minimum()), max(hi, spin.maximum()))
+        self._plot_scatter()
+
     # ---------- data helpers ----------
     def _get_xy(self) -> Tuple[np.ndarray, np.ndarray, str, str]:
         xcol = self.x_combo.currentText()
@@ -1407,15 +4929,17 @@ class FitDialog(QWidget):
         return x, y, xcol, ycol
 
     # ---------- UI actions ----------
-    def _plot_scatter(self, first: bool=False):
+    def _plot_scatter(self, first: bool=False, redraw: bool=True):
         x, y, xcol, ycol = self._get_xy()
-        self.ax.clear()
+        self.layer.hide("fit", "ci", *self.COMPARE_KEYS)
 
         if x.size == 0 or y.size == 0:
-            self.ax.text(0.5, 0.5, "Choose valid X and Y numeric columns.",
-                         ha="center", va="center", transform=self.ax.transAxes)
-            self.canvas.draw_idle()
+            self.layer.hide("data")
+            self.layer.text("message", 0.5, 0.5, "Choose valid X and Y numeric columns.",
+                            ha="center", va="center", transform=self.ax.transAxes)
+            self.layer.draw()
             return
+        self.layer.hide("message")
 
         # set default range once
         if first:
@@ -1435,19 +4959,23 @@ class FitDialog(QWidget):
 
         xs, ys = x[mask], y[mask]
 
-        self.ax.scatter(xs, ys, s=18, edgecolor="black", linewidth=0.4, color="#00A6ED", label="Data")
-        self.ax.set_title(f"{ycol} vs {xcol}")
-        self.ax.set_xlabel(xcol); self.ax.set_ylabel(ycol)
-        self.ax.legend(loc="best")
-        self.fig.tight_layout()
-        self.canvas.draw_idle()
+        self.layer.scatter("data", xs, ys, s=18, edgecolor="black", linewidth=0.4, facecolor="#00A6ED", label="Data")
+        self.layer.set_labels(f"{ycol} vs {xcol}", xcol, ycol)
+        if xs.size:
+            self.layer.set_limits(_padded_limits(xs.min(), xs.max()), _padded_limits(ys.min(), ys.max()))
+        self.layer.legend(loc="best")
+        if redraw:
+            self.layer.draw()
         self._write_tip()
 
     def _write_tip(self):
         self.results.setPlainText(
             "Tip: Drag on the plot to set the fit interval (blue translucent band).\n"
             "Then click ‘Run Fit’. Use the spinboxes to tweak exact x-min/x-max and y-min/y-max.\n"
-            "Custom model uses variables: x and letters a, b, c, ... in order."
+            "Custom model: x is the variable; every other name (a, b, mu, ...) is a fit parameter, "
+            "listed alphabetically.\n"
+            f"Functions: {', '.join(_EXPR_FUNCS)} (also as np.name). "
+            f"Constants: {', '.join(_EXPR_CONSTS)}. Use ** for powers."
         )
 
     def _on_span(self, xmin: float, xmax: float):
@@ -1455,142 +4983,358 @@ class FitDialog(QWidget):
         self.xmax_spin.setValue(float(max(xmin, xmax)))
         self.canvas.draw_idle()
 
+    def _on_model_change(self, name: str):
+        multi = name.endswith("peaks")
+        self.n_peaks.setEnabled(multi)
+        self.bg_degree.setEnabled(multi)
+
+    def _open_batch(self):
+        self.batch_dialog = BatchFitDialog(self)
+        self.batch_dialog.show()
+
     def _save_png(self):
         fn, _ = QFileDialog.getSaveFileName(self, "Save PNG", "fit.png", "PNG Files (*.png)")
         if not fn: return
         if not fn.lower().endswith(".png"): fn += ".png"
-        self.fig.savefig(fn, dpi=300, facecolor=self.fig.get_facecolor())
+        self.layer.savefig(fn, dpi=300, facecolor=self.fig.get_facecolor())
 
     # ---------- fit core ----------
-    def _run_fit(self):
+    def _masked_xy(self):
+        """(x, y, x_in_range, y_in_range), or None after warning when the range is (nearly) empty."""
         x, y, xcol, ycol = self._get_xy()
         xmin, xmax = self.xmin_spin.value(), self.xmax_spin.value()
         ymin, ymax = self.ymin_spin.value(), self.ymax_spin.value()
-
-        # Apply mask
         mask = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
-        x, y = x[mask], y[mask]
-
-        if len(x) < 3:
+        if np.count_nonzero(mask) < 3:
             QMessageBox.warning(self, "Not enough data", "No data points in chosen interval.")
+            return None
+        return x, y, x[mask], y[mask]
+
+    def _start_fit_job(self, job, cancel: threading.Event, status: str, on_finished):
+        """Run ``job(progress)`` on a worker; a newer fit or comparison cancels and supersedes it."""
+        self._cancel_fit()
+        self._fit_cancel = cancel
+        self._fit_request += 1
+        request = self._fit_request
+        worker = Worker(job)
+        worker.kwargs["progress"] = worker.signals.progress.emit
+        worker.signals.progress.connect(lambda info: request == self._fit_request and self._on_fit_progress(info))
+        worker.signals.finished.connect(lambda out: request == self._fit_request and on_finished(out))
+        worker.signals.error.connect(lambda tb: request == self._fit_request and self._on_fit_error(tb))
+        self.btn_cancel.setEnabled(True)
+        self.fit_status.setText(status)
+        worker.start()
+
+    def _run_fit(self):
+        data = self._masked_xy()
+        if data is None:
+            return
+        x_all, y_all, x, y = data
+        cancel = threading.Event()
+        name, expr, options = self.model.currentText(), self.custom_expr.currentText(), self._fit_options()
+        timeout = self.timeout.value() or None
+        band_label = self.band_kind.currentText().lower()
+        band_kind = BAND_KINDS[self.band_kind.currentText()] if self.show_ci.isChecked() else None
+
+        def job(progress):
+            monitor = FitMonitor(y, progress=progress, cancelled=cancel.is_set, timeout=timeout)
+            try:
+                fit = FIT_CACHE.fit(name, x, y, expr, source=FitCache.digest(x_all, y_all),
+                                    monitor=monitor, **options)
+            except FitStopped as stop:
+                if stop.timed_out:
+                    raise RuntimeError(f"no usable parameters within {timeout:g} s") from None
+                return None
+            band = None
+            if band_kind is not None:
+                try:
+                    band = fit_band(fit, x, y, band_kind, name=name, expr=expr, options=options,
+                                    progress=lambda n: progress({"bootstrap": n}), cancelled=cancel.is_set)
+                    band = None if band is None else (*band, band_label)
+                except Exception as e:
+                    band = f"No {band_kind} band: {e}"
+            return fit, monitor.timed_out, band
+
+        self._start_fit_job(job, cancel, f"Fitting {name}…", self._on_fit_finished)
+
+    def _run_compare(self):
+        data = self._masked_xy()
+        if data is None:
             return
+        _, _, x, y = data
+        cancel = threading.Event()
 
-        name = self.model.currentText()
-        try:
-            fit = self._fit_dispatch(name, x, y)
-        except Exception as e:
-            self.results.setPlainText(f"Fit error: {e}")
+        timeout = self.timeout.value() or None
+
+        def job(progress):
+            return compare_models(x, y, progress=lambda n: progress({"compared": n}), cancelled=cancel.is_set,
+                                  timeout=timeout)
+
+        self._start_fit_job(job, cancel, f"Comparing {len(COMPARE_MODELS)} models…", self._on_compare_finished)
+
+    def _cancel_fit(self):
+        if self._fit_cancel is not None:
+            self._fit_cancel.set()
+            self._fit_cancel = None
+        self.btn_cancel.setEnabled(False)
+
+    def _on_fit_progress(self, info: dict):
+        if "bootstrap" in info:
+            self.fit_status.setText(f"Bootstrap {info['bootstrap']}/{BOOTSTRAP_SAMPLES} refits")
+            return
+        if "compared" in info:
+            self.fit_status.setText(f"Fitted {info['compared']}/{len(COMPARE_MODELS)} models")
+            return
+        self.fit_status.setText(
+            f"iter {info['iterations']} · evals {info['evaluations']} · "
+            f"cost {info['cost']:.4g} · {info['elapsed']:.1f} s"
+        )
+
+    def _on_fit_error(self, tb: str):
+        self._fit_cancel = None
+        self.btn_cancel.setEnabled(False)
+        self.fit_status.setText("")
+        self.results.setPlainText(f"Fit error: {tb.strip().splitlines()[-1]}")
+
+    def _on_fit_finished(self, out):
+        self._fit_cancel = None
+        self.btn_cancel.setEnabled(False)
+        if out is None:
+            self.fit_status.setText("Fit cancelled.")
+            return
+        fit, timed_out, band = out
+        self.fit_status.setText("Stopped at the time limit." if timed_out else "")
+        self._show_fit(fit, timed_out, band)
+
+    def _on_compare_finished(self, out):
+        self._fit_cancel = None
+        self.btn_cancel.setEnabled(False)
+        if out is None:
+            self.fit_status.setText("Comparison cancelled.")
             return
+        self.fit_status.setText("")
+        table, grid, curves = out
+        self._plot_scatter(first=False, redraw=False)
+        ranked = [m for m in table["model"] if m in curves]
+        for key, model, (color, style) in zip(self.COMPARE_KEYS, ranked, self.COMPARE_STYLES):
+            d_aic = float(table.loc[table["model"] == model, "d_aic"].iloc[0])
+            self.layer.line(key, grid, curves[model], color=color, linestyle=style, lw=2,
+                            label=f"{model} (ΔAIC {d_aic:.1f})")
+        self.layer.legend(loc="best")
+        self.layer.draw()
+
+        lines = ["Model comparison (ranked by AIC)", ""]
+        lines.append(f"{'model':<20}{'k':>3}{'ΔAIC':>10}{'ΔBIC':>10}{'red χ²':>12}{'R²':>9}")
+        for row in table.itertuples(index=False):
+            if not np.isfinite(row.aic):
+                lines.append(f"{row.model:<20} failed: {row.message}")
+                continue
+            lines.append(f"{row.model:<20}{row.k:>3.0f}{row.d_aic:>10.2f}{row.d_bic:>10.2f}"
+                         f"{row.red_chi2:>12.4g}{row.r2:>9.4f}" + (f"  ({row.message})" if row.message else ""))
+        self.results.setPlainText("\n".join(lines))
 
+    def _show_fit(self, fit: FitResult, timed_out: bool = False, band=None):
         # Draw scatter with range again
-        self._plot_scatter(first=False)
+        self._plot_scatter(first=False, redraw=False)
 
         # Overlay fit
         order = np.argsort(fit.x)
-        self.ax.plot(fit.x[order], fit.y_fit[order], "--", color="#FF6B6B", lw=2, label=f"{fit.name} fit")
+        self.layer.line("fit", fit.x[order], fit.y_fit[order], linestyle="--", color="#FF6B6B", lw=2,
+                        label=f"{fit.name} fit")
 
-        # CI band if available
-        if self.show_ci.isChecked() and fit.cov is not None:
-            try:
-                sig = np.sqrt(np.diag(fit.cov))
-                ci = 1.96 * (np.nanmean(sig) if sig.size > 0 else 0.0)
-                self.ax.fill_between(fit.x[order], fit.y_fit[order]-ci, fit.y_fit[order]+ci,
-                                     alpha=0.18, color="#FF6B6B", linewidth=0)
-            except Exception:
-                pass
+        # Band computed with the fit (delta method or bootstrap, on a decimated grid)
+        if isinstance(band, tuple):
+            grid, lower, upper, kind = band
+            artist = self.ax.fill_between(grid, lower, upper, alpha=0.18, color="#FF6B6B", linewidth=0,
+                                          label=f"95% {kind} band")
+            self.layer.replace("ci", [artist])
 
-        self.ax.legend(loc="best")
-        self.fig.tight_layout()
-        self.canvas.draw_idle()
+        self.layer.legend(loc="best")
+        self.layer.draw()
 
         # Results text
         lines = [f"Model: {fit.name}"]
+        if timed_out:
+            lines.append("Stopped at the time limit — best parameters so far (not converged)")
         if fit.r2 is not None and not np.isnan(fit.r2):
             lines.append(f"R²: {fit.r2:.5f}")
         for k, v in fit.params.items():
             lines.append(f"{k} = {v:.6g}")
+        if isinstance(band, str):
+            lines.append(band)
         self.results.setPlainText("\n".join(lines))
 
 
     # ---------- dispatch ----------
-    def _fit_dispatch(self, name: str, x: np.ndarray, y: np.ndarray) -> FitResult:
-        name = name.lower()
-
-        if name.startswith("linear"):
-            p, cov = np.polyfit(x, y, 1, cov=True)
-            yhat = np.poly1d(p)(x)
-            return FitResult(
-                name="Linear",
-                params={"slope": float(p[0]), "intercept": float(p[1])},
-                x=x, y_fit=yhat, cov=cov, r2=_r2_score(y, yhat)
-            )
-
-        if name.startswith("polynomial"):
-            deg = 2 if "2" in name else 3
-            p, cov = np.polyfit(x, y, deg, cov=True)
-            yhat = np.poly1d(p)(x)
-            params = {f"c{i}": float(v) for i, v in enumerate(p[::-1])}  # c0 + c1 x + ...
-            return FitResult(
-                name=f"Polynomial (deg {deg})",
-                params=params, x=x, y_fit=yhat, cov=cov, r2=_r2_score(y, yhat)
-            )
-
-        if name.startswith("exponential"):
-            # require positive y for log-likelihood stability
-            mask = y > 0
-            if np.count_nonzero(mask) < 3:
-                raise ValueError("Exponential requires positive y values.")
-            popt, pcov = curve_fit(_exp, x[mask], y[mask], p0=(max(y[mask]), 0.1))
-            yhat = _exp(x, *popt)
-            return FitResult(
-                name="Exponential", params={"a": popt[0], "b": popt[1]},
-                x=x, y_fit=yhat, cov=pcov, r2=_r2_score(y[mask], _exp(x[mask], *popt))
-            )
-
-        if name.startswith("gaussian"):
-            p0 = (float(np.nanmax(y)), float(np.nanmean(x)), float(np.nanstd(x)) or 1.0)
-            popt, pcov = curve_fit(_gauss, x, y, p0=p0, maxfev=10000)
-            yhat = _gauss(x, *popt)
-            return FitResult(
-                name="Gaussian", params={"a": popt[0], "mu": popt[1], "sigma": popt[2]},
-                x=x, y_fit=yhat, cov=pcov, r2=_r2_score(y, yhat)
-            )
-
-        if name.startswith("lorentz"):
-            p0 = (float(np.nanmax(y)), float(np.nanmean(x)), 1.0)
-            popt, pcov = curve_fit(_lorentz, x, y, p0=p0, maxfev=10000)
-            yhat = _lorentz(x, *popt)
-            return FitResult(
-                name="Lorentzian", params={"a": popt[0], "x0": popt[1], "gamma": popt[2]},
-                x=x, y_fit=yhat, cov=pcov, r2=_r2_score(y, yhat)
-            )
-
-        if name.startswith("voigt"):
-            p0 = (float(np.nanmax(y)), float(np.nanmean(x)), float(np.nanstd(x)) or 1.0, 1.0)
-            popt, pcov = curve_fit(_voigt, x, y, p0=p0, maxfev=20000)
-            yhat = _voigt(x, *popt)
-            return FitResult(
-                name="Voigt", params={"a": popt[0], "mu": popt[1], "sigma": popt[2], "gamma": popt[3]},
-                x=x, y_fit=yhat, cov=pcov, r2=_r2_score(y, yhat)
-            )
+    def _fit_options(self) -> dict:
+        return {"peaks": self.n_peaks.value(), "background": self.bg_degree.value()}
 
-        if name.startswith("custom"):
-            expr = self.custom_expr.currentText().strip()
-            if not expr:
-                raise ValueError("Enter a custom expression, e.g. a*x**2 + b*x + c")
-            # a, b, c, d, e ... plus x available
-            letters = list("abcdefghijklmnopqrstuvwxyz")
-            def f(x, *vals):
-                ns = dict(zip(letters, vals)); ns["x"] = x
-                return eval(expr, {}, ns)
-            popt, pcov = curve_fit(f, x, y, p0=[1, 1, 1], maxfev=20000)
-            yhat = f(x, *popt)
-            params = {letters[i]: float(v) for i, v in enumerate(popt)}
-            return FitResult(
-                name=f"Custom: {expr}", params=params, x=x, y_fit=yhat, cov=pcov, r2=_r2_score(y, yhat)
-            )
 
-        raise ValueError(f"Unknown model: {name}")
+# ──────────────────────────────────────────────────────────────────────────────
+# BatchFitDialog: the Fit panel's model over many columns, groups or files
+# ──────────────────────────────────────────────────────────────────────────────
+class BatchFitDialog(QDialog):
+    """
+    Runs the fit panel's model, X column and X range over many targets
+    (Y columns, groups of a column, or CSV files with the same X/Y columns)
+    on a process pool and collects one parameter-table row per target.
+    """
+    MODES = ("Y columns", "Groups", "Files")
+
+    def __init__(self, panel: "FitDialog"):
+        super().__init__(panel)
+        self.panel = panel
+        self.setWindowTitle("Batch Fit")
+        self.resize(900, 600)
+        self.table = pd.DataFrame()
+        self.paths = []
+        self._cancel = None
+
+        lay = QVBoxLayout(self)
+        form = QFormLayout()
+        self.mode = QComboBox(); self.mode.addItems(self.MODES)
+        form.addRow("Fit across:", self.mode)
+        self.targets = QListWidget()
+        self.targets.setMaximumHeight(160)
+        form.addRow("Y columns:", self.targets)
+        self.group_col = QComboBox()
+        form.addRow("Group by:", self.group_col)
+        self.btn_files = QPushButton("Choose CSV files…")
+        self.files_label = QLabel("No files chosen")
+        file_row = QHBoxLayout(); file_row.addWidget(self.btn_files); file_row.addWidget(self.files_label, 1)
+        form.addRow("Files:", file_row)
+        lay.addLayout(form)
+
+        run_row = QHBoxLayout()
+        self.btn_run = QPushButton("Run Batch")
+        self.btn_cancel = QPushButton("Cancel"); self.btn_cancel.setEnabled(False)
+        self.btn_export = QPushButton("Export Table…"); self.btn_export.setEnabled(False)
+        self.progress = QProgressBar()
+        run_row.addWidget(self.btn_run); run_row.addWidget(self.btn_cancel)
+        run_row.addWidget(self.progress, 1); run_row.addWidget(self.btn_export)
+        lay.addLayout(run_row)
+
+        self.result_view = QTableWidget(0, 0)
+        self.result_view.setEditTriggers(QTableWidget.NoEditTriggers)
+        lay.addWidget(self.result_view, 1)
+
+        self.mode.currentTextChanged.connect(self._on_mode)
+        self.btn_files.clicked.connect(self._choose_files)
+        self.btn_run.clicked.connect(self._run)
+        self.btn_cancel.clicked.connect(self._on_cancel)
+        self.btn_export.clicked.connect(self._export)
+        self._fill_columns()
+        self._on_mode(self.mode.currentText())
+
+    def _fill_columns(self):
+        df, xcol = self.panel.df, self.panel.x_combo.currentText()
+        self.targets.clear()
+        for col in df.select_dtypes(include="number").columns:
+            if col == xcol:
+                continue
+            item = QListWidgetItem(str(col))
+            item.setData(Qt.UserRole, col)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if col == self.panel.y_combo.currentText() else Qt.Unchecked)
+            self.targets.addItem(item)
+        self.group_col.clear()
+        self.group_col.addItems([str(c) for c in df.columns if c != xcol])
+
+    def _on_mode(self, mode):
+        self.targets.setEnabled(mode == "Y columns")
+        self.group_col.setEnabled(mode == "Groups")
+        self.btn_files.setEnabled(mode == "Files")
+
+    def _choose_files(self):
+        paths, _ = QFileDialog.getOpenFileNames(self, "Spectra to Fit", "", "CSV Files (*.csv);;All Files (*)")
+        if paths:
+            self.paths = paths
+            self.files_label.setText(f"{len(paths)} files")
+
+    def _tasks(self):
+        """Build the batch tasks on the worker thread (grouping a big frame takes a while)."""
+        df, xcol, ycol = self.panel.df, self.panel.x_combo.currentText(), self.panel.y_combo.currentText()
+        mode = self.mode.currentText()
+        if mode == "Y columns":
+            ycols = [self.targets.item(i).data(Qt.UserRole) for i in range(self.targets.count())
+                     if self.targets.item(i).checkState() == Qt.Checked]
+            return lambda: column_fit_tasks(df, xcol, ycols)
+        if mode == "Groups":
+            by = self.group_col.currentText()
+            return lambda: group_fit_tasks(df, xcol, ycol, by)
+        paths = list(self.paths)
+        return lambda: file_fit_tasks(paths, xcol, ycol)
+
+    def _run(self):
+        panel = self.panel
+        name, expr = panel.model.currentText(), panel.custom_expr.currentText()
+        options = panel._fit_options()
+        x_range = (panel.xmin_spin.value(), panel.xmax_spin.value())
+        make_tasks = self._tasks()
+        self._cancel = cancel = threading.Event()
+
+        def job(progress):
+            tasks = make_tasks()
+            progress(("total", len(tasks)))
+            return batch_fit(tasks, name, expr, x_range, progress=progress, cancelled=cancel.is_set,
+                             options=options)
+
+        worker = Worker(job)
+        worker.kwargs["progress"] = worker.signals.progress.emit
+        worker.signals.progress.connect(self._on_progress)
+        worker.signals.finished.connect(self._on_finished)
+        worker.signals.error.connect(self._on_error)
+        self.btn_run.setEnabled(False); self.btn_cancel.setEnabled(True)
+        self.progress.setRange(0, 0)
+        worker.start()
+
+    def _on_progress(self, value):
+        if isinstance(value, tuple):
+            self.progress.setRange(0, max(value[1], 1))
+            self.progress.setValue(0)
+        else:
+            self.progress.setValue(value)
+
+    def _on_cancel(self):
+        if self._cancel is not None:
+            self._cancel.set()
+
+    def _done(self):
+        self.btn_run.setEnabled(True); self.btn_cancel.setEnabled(False)
+        self.progress.setRange(0, 1); self.progress.setValue(0)
+
+    def _on_error(self, tb):
+        self._done()
+        QMessageBox.critical(self, "Batch Fit Error", tb.strip().splitlines()[-1])
+
+    def _on_finished(self, table):
+        self._done()
+        if table is None:
+            return      # cancelled
+        self.table = table
+        self.btn_export.setEnabled(not table.empty)
+        self.result_view.setRowCount(len(table))
+        self.result_view.setColumnCount(len(table.columns))
+        self.result_view.setHorizontalHeaderLabels([str(c) for c in table.columns])
+        for r, rec in enumerate(table.itertuples(index=False)):
+            for c, value in enumerate(rec):
+                text = f"{value:.6g}" if isinstance(value, float) else str(value)
+                self.result_view.setItem(r, c, QTableWidgetItem(text))
+        failed = int((~table["converged"]).sum())
+        self.progress.setFormat(f"{len(table)} fits, {failed} not converged")
+
+    def _export(self):
+        fn, _ = QFileDialog.getSaveFileName(self, "Export Parameter Table", "batch_fit.csv",
+                                            "CSV Files (*.csv);;Excel Files (*.xlsx)")
+        if not fn:
+            return
+        try:
+            if fn.lower().endswith(".xlsx"):
+                self.table.to_excel(fn, index=False)
+            else:
+                self.table.to_csv(fn, index=False)
+        except Exception as e:
+            QMessageBox.critical(self, "Export Error", str(e))
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -1973,8 +5717,10 @@ class AITabDock(QDockWidget):
             reply(self._summary_text(df), "df.describe(include='all')")
             return True
 
-        if any(w in ql for w in ("correl", "correlated", "correlation", "pearson")):
-            reply(self._correlation_text(df), "df.corr()")
+        if any(w in ql for w in ("correl", "correlated", "correlation", "pearson", "spearman", "kendall")):
+            method = "kendall" if "kendall" in ql else "spearman" if ("spearman" in ql or "rank" in ql) else "pearson"
+            code = "df.corr()" if method == "pearson" else f"df.corr(method='{method}')"
+            reply(self._correlation_text(df, method), code)
             return True
 
         if any(w in ql for w in ("missing", "null", "nan", "na")):
@@ -2047,15 +5793,17 @@ class AITabDock(QDockWidget):
             print(f"(describe failed: {e})", file=buf)
         return buf.getvalue()
 
-    def _correlation_text(self, df: pd.DataFrame) -> str:
+    def _correlation_text(self, df: pd.DataFrame, method: str = "pearson") -> str:
         num = df.select_dtypes(include="number")
         if num.shape[1] < 2:
             return "Not enough numeric columns to compute correlations."
-        corr = num.corr()
-        # upper triangle pairs sorted
-        pairs = corr.where(~np.tril(np.ones(corr.shape)).astype(bool)) \
-                    .stack().sort_values(ascending=False)
-        return pairs.head(self._TOP_CORR_PAIRS).to_string()
+        # strongest pairs by |r|, with significance
+        pairs = CORRELATIONS.top_pairs(num, self.model.version, method, self._TOP_CORR_PAIRS)
+        if pairs.empty:
+            return "No column pair has enough overlapping values."
+        pairs["r"] = pairs["r"].round(3)
+        pairs["p_value"] = pairs["p_value"].map(lambda p: f"{p:.2e}")
+        return f"{CORRELATIONS.label(num, method)} correlation, strongest pairs:\n" + pairs.to_string(index=False)
 
     def _missing_text(self, df: pd.DataFrame) -> str:
         miss = df.isna().sum()
@@ -2726,6 +6474,9 @@ class FitWindow(QMainWindow):
         self.panel = FitDialog(df, self)   # reuse FitDialog as a widget
         self.setCentralWidget(self.panel)
 
+    def set_data(self, df, version):
+        self.panel.set_data(df, version)
+
 
 # ─────────────────────────────
 # ExploreWindow
@@ -2739,6 +6490,25 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from pandas.plotting import scatter_matrix
 
+class DetachedTabWindow(QMainWindow):
+    """Floating window for a detached tab; releases the tab's figure when closed."""
+    closed = pyqtSignal(object)
+
+    def __init__(self, widget, title, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setWindowTitle(f"Detached: {title}")
+        self.setCentralWidget(widget)
+        self.resize(700, 500)
+
+    def closeEvent(self, event):
+        widget = self.centralWidget()
+        if hasattr(widget, "release"):
+            widget.release()
+        self.closed.emit(self)
+        super().closeEvent(event)
+
+
 class DraggableTabWidget(QTabWidget):
     """Custom TabWidget that allows detachable tabs."""
     def __init__(self, parent=None):
@@ -2746,13 +6516,23 @@ class DraggableTabWidget(QTabWidget):
         self.setTabsClosable(True)
         self.tabCloseRequested.connect(self.close_tab)
         self.setMovable(True)  # allows reordering within tab bar
+        self._detached = []    # keeps floating windows alive until they close
 
     def close_tab(self, index):
         widget = self.widget(index)
         if widget:
+            if hasattr(widget, "release"):
+                widget.release()
             widget.deleteLater()
         self.removeTab(index)
 
+    def release_all(self):
+        """Close every tab and detached window, returning their figures."""
+        for win in list(self._detached):
+            win.close()
+        while self.count():
+            self.close_tab(0)
+
     def mouseDoubleClickEvent(self, event):
         """Detach tab on double-click (could be drag if preferred)."""
         index = self.tabBar().tabAt(event.pos())
@@ -2764,20 +6544,113 @@ class DraggableTabWidget(QTabWidget):
             self.removeTab(index)
 
             # Create floating window
-            win = QMainWindow()
-            win.setWindowTitle(f"Detached: {title}")
-            win.setCentralWidget(widget)
-            win.resize(700, 500)
+            win = DetachedTabWindow(widget, title)
+            win.closed.connect(self._detached.remove)
+            self._detached.append(win)
             win.show()
 
 
+def draw_explore_plot(ax, df, spec):
+    """Draw one Explore plot described by ``spec`` (kind, x, y, labels, title) onto ``ax``."""
+    plot_kind, x_col, y_col = spec["kind"], spec["x"], spec["y"]
+    try:
+        if plot_kind == "Histogram":
+            counts, edges = COLUMN_BINS.histogram(df, x_col, bins=20, version=spec.get("version"))
+            ax.stairs(counts, edges, fill=True, color="#1f77b4")
+            ax.stairs(counts, edges, color="black")
+        elif plot_kind == "Boxplot":
+            st = COLUMN_BOXES.stats(df, x_col, spec.get("version"))
+            if st is None:
+                raise ValueError(f"'{x_col}' has no numeric values")
+            ax.bxp([st], flierprops=dict(marker="o", markersize=3, markerfacecolor="none"))
+        elif plot_kind == "Scatter" and y_col in df.columns:
+            df.plot(kind="scatter", x=x_col, y=y_col, ax=ax)
+        elif plot_kind == "Heatmap":
+            corr = spec.get("corr")
+            if corr is None:
+                corr = CORRELATIONS.matrix(df, spec.get("version"), spec.get("method", "pearson"))
+            sns.heatmap(corr, annot=True, cmap="coolwarm", vmin=-1, vmax=1, ax=ax)
+        elif plot_kind == "KDE":
+            density = column_density(df, x_col, spec.get("version"))
+            if density is None:
+                raise ValueError(f"'{x_col}' has no spread to estimate a density from")
+            xs, ys = density
+            ax.fill_between(xs, ys, color="#1f77b4", alpha=0.25)
+            ax.plot(xs, ys, color="#1f77b4")
+            ax.set_ylim(bottom=0)
+        elif plot_kind == "Violin":
+            draw_violins(ax, [COLUMN_BINS.fine_counts(df, x_col, spec.get("version"))],
+                         positions=[0], color="#1f77b4", showmeans=False)
+            ax.set_xticks([0])
+            ax.set_xticklabels([x_col])
+        elif plot_kind == "Ridge":
+            _draw_ridge(ax, df, x_col, y_col)
+        elif plot_kind == "Time Series":
+            # A datetime X is the time axis for Y; otherwise both are plotted against the index
+            if x_col in df.columns and pd.api.types.is_datetime64_any_dtype(df[x_col]):
+                x, cols = x_col, [y_col]
+            else:
+                x, cols = None, list(dict.fromkeys(c for c in [x_col, y_col] if c in df.columns))
+            draw_time_series(ax, df, cols, x, spec.get("version"), spec.get("agg", "m4"))
+            ax.legend()
+
+        ax.set_xlabel(spec["xlabel"])
+        ax.set_ylabel(spec["ylabel"])
+        ax.set_title(spec["title"])
+
+    except Exception as e:
+        ax.text(0.5, 0.5, f"Error: {e}", ha="center", va="center")
+
+
+RIDGE_MAX_GROUPS = 40
+
+
+def _draw_ridge(ax, df, x_col, y_col):
+    """Ridgeline of ``x_col``'s density for each value of the grouping column ``y_col``."""
+    if y_col not in df.columns or df[y_col].nunique() > RIDGE_MAX_GROUPS:
+        raise ValueError(f"Ridge plots need a grouping Y column with at most {RIDGE_MAX_GROUPS} values")
+    labels, xs, dens = grouped_densities(pd.to_numeric(df[x_col], errors="coerce"), df[y_col])
+    if not labels:
+        raise ValueError(f"'{x_col}' has no numeric values")
+    scale = 1.6 / dens.max() if dens.max() > 0 else 1.0
+    colors = mpl_colormaps["viridis"](np.linspace(0.15, 0.85, len(labels)))
+    for i, (row, color) in enumerate(zip(dens, colors)):
+        ax.fill_between(xs, i, i + row * scale, color=color, alpha=0.8, zorder=len(labels) - i)
+        ax.plot(xs, i + row * scale, color="black", linewidth=0.8, zorder=len(labels) - i)
+    ax.set_yticks(range(len(labels)))
+    ax.set_yticklabels([str(label) for label in labels])
+    ax.set_xlim(xs[0], xs[-1])
+
+
+def pair_plot_columns(df, x_col, y_col):
+    """Numeric columns for a pair plot: the chosen X and Y first, then the rest, capped."""
+    numeric = list(df.select_dtypes(include="number").columns)
+    picked = [c for c in dict.fromkeys((x_col, y_col)) if c in numeric]
+    picked += [c for c in numeric if c not in picked]
+    return picked[:PairPlotEngine.max_columns]
+
+
+def build_explore_figure(fig, df, spec):
+    """``render_figure`` builder for an Explore plot spec."""
+    if spec["kind"] == "Pair Plot":
+        columns = [c for c in spec["columns"] if c in df.columns]
+        PairPlotEngine(df, spec.get("version")).build(fig, columns)
+        return
+    draw_explore_plot(fig.subplots(), df, spec)
+
+
 class ExploreWindow(QMainWindow):
-    def __init__(self, df, parent=None):
+    # Kinds whose drawing cost scales with the data (annotated heatmaps, KDE
+    # fits) are built and rasterized on the thread pool instead of the GUI thread.
+    RENDERED_KINDS = ("Heatmap", "KDE", "Violin", "Ridge", "Pair Plot")
+
+    def __init__(self, df, parent=None, version=None):
         super().__init__(parent)
         self.setWindowTitle("Explore Data")
         self.resize(1100, 750)
 
         self.df = df
+        self.version = version
 
         container = QWidget()
         layout = QVBoxLayout(container)
@@ -2786,11 +6659,31 @@ class ExploreWindow(QMainWindow):
         controls = QHBoxLayout()
         self.plot_type = QComboBox()
         self.plot_type.addItems(
-            ["Histogram", "Boxplot", "Scatter", "Heatmap", "KDE", "Violin", "Time Series"]
+            ["Histogram", "Boxplot", "Scatter", "Heatmap", "KDE", "Violin", "Ridge", "Time Series", "Pair Plot"]
         )
         controls.addWidget(QLabel("Plot Type:"))
         controls.addWidget(self.plot_type)
 
+        # Correlation method, used by the Heatmap kind
+        self.corr_method = QComboBox()
+        self.corr_method.addItems(["Pearson", "Spearman", "Kendall"])
+        self.corr_method.setEnabled(False)
+        self.plot_type.currentTextChanged.connect(
+            lambda kind: self.corr_method.setEnabled(kind == "Heatmap")
+        )
+        controls.addWidget(QLabel("Corr:"))
+        controls.addWidget(self.corr_method)
+
+        # Per-pixel aggregation, used by the Time Series kind
+        self.ts_agg = QComboBox()
+        self.ts_agg.addItems(list(TS_AGGREGATES))
+        self.ts_agg.setEnabled(False)
+        self.plot_type.currentTextChanged.connect(
+            lambda kind: self.ts_agg.setEnabled(kind == "Time Series")
+        )
+        controls.addWidget(QLabel("Agg:"))
+        controls.addWidget(self.ts_agg)
+
         self.x_select = QComboBox()
         self.x_select.addItems(self.df.columns)
         self.x_select.setEditable(True)
@@ -2821,6 +6714,10 @@ class ExploreWindow(QMainWindow):
         empty_btn.clicked.connect(self.add_empty_tab)
         controls.addWidget(empty_btn)
 
+        export_btn = QPushButton("⤓ Export All")
+        export_btn.clicked.connect(self.export_all)
+        controls.addWidget(export_btn)
+
         layout.addLayout(controls)
 
         # Custom Tab Widget with detach feature
@@ -2829,6 +6726,22 @@ class ExploreWindow(QMainWindow):
 
         self.setCentralWidget(container)
 
+        # Figures come from a shared pool and are returned when tabs close
+        self.canvas_pool = CanvasPool.shared()
+        self.canvas_pool.changed.connect(self._show_figure_memory)
+        self._show_figure_memory(self.canvas_pool.open_figures, self.canvas_pool.memory_bytes())
+
+    def _show_figure_memory(self, count, nbytes):
+        self.statusBar().showMessage(f"Open figures: {count}  ·  ~{nbytes / 2**20:.1f} MB")
+
+    def closeEvent(self, event):
+        self.tabs.release_all()
+        try:
+            self.canvas_pool.changed.disconnect(self._show_figure_memory)
+        except TypeError:
+            pass
+        super().closeEvent(event)
+
     def add_empty_tab(self):
         placeholder = QLabel("Empty Tab – Add a Plot Later")
         placeholder.setAlignment(Qt.AlignCenter)
@@ -2843,73 +6756,104 @@ class ExploreWindow(QMainWindow):
         y_col = self.y_select.currentText()
         x_label = self.x_label_input.text() or x_col
         y_label = self.y_label_input.text() or y_col
-        title = self.title_input.text() or f"{plot_kind}: {x_col} vs {y_col}"
-
-        fig, ax = plt.subplots(figsize=(7, 5))
-
-        try:
-            if plot_kind == "Histogram":
-                self.df[x_col].plot(kind="hist", bins=20, edgecolor="black", ax=ax)
-            elif plot_kind == "Boxplot":
-                self.df[[x_col]].plot(kind="box", ax=ax)
-            elif plot_kind == "Scatter" and y_col in self.df.columns:
-                self.df.plot(kind="scatter", x=x_col, y=y_col, ax=ax)
-            elif plot_kind == "Heatmap":
-                sns.heatmap(self.df.select_dtypes("number").corr(), annot=True, cmap="coolwarm", ax=ax)
-            elif plot_kind == "KDE":
-                sns.kdeplot(self.df[x_col], fill=True, ax=ax)
-            elif plot_kind == "Violin":
-                sns.violinplot(data=self.df[[x_col]], ax=ax)
-            elif plot_kind == "Time Series":
-                cols = [c for c in [x_col, y_col] if c in self.df.columns]
-                self.df[cols].plot(ax=ax, legend=True)
-
-            ax.set_xlabel(x_label)
-            ax.set_ylabel(y_label)
-            ax.set_title(title)
+        method = self.corr_method.currentText().lower()
+        columns = pair_plot_columns(self.df, x_col, y_col) if plot_kind == "Pair Plot" else []
+        if plot_kind == "Heatmap":
+            default = f"Correlation Heatmap ({CORRELATIONS.label(self.df, method)})"
+        elif plot_kind == "Pair Plot":
+            default = "Pair Plot: " + ", ".join(map(str, columns))
+        else:
+            default = f"{plot_kind}: {x_col} vs {y_col}"
+        title = self.title_input.text() or default
+        spec = dict(kind=plot_kind, x=x_col, y=y_col, xlabel=x_label, ylabel=y_label, title=title,
+                    version=self.version, method=method, columns=columns,
+                    agg=TS_AGGREGATES[self.ts_agg.currentText()])
+        tab = PlotTab(self.canvas_pool)
+        tab.spec = spec
+        self._draw_tab(tab)
 
-        except Exception as e:
-            ax.text(0.5, 0.5, f"Error: {e}", ha="center", va="center")
+        save_btn = QPushButton("Save Plot")
+        save_btn.clicked.connect(
+            lambda: self._save_plot(partial(build_explore_figure, df=self.df, spec=tab.spec))
+        )
+        tab.layout().addWidget(save_btn)
 
-        canvas = FigureCanvas(fig)
+        self.tabs.addTab(tab, title)
 
-        tab = QWidget()
-        tab_layout = QVBoxLayout(tab)
-        tab_layout.addWidget(canvas)
+    def _draw_tab(self, tab):
+        if tab.spec["kind"] in self.RENDERED_KINDS:
+            view = tab.view or tab.use_view()
+            view.render(partial(build_explore_figure, df=self.df, spec=tab.spec))
+        else:
+            canvas = tab.canvas or tab.use_canvas((7, 5))
+            if tab.spec["kind"] == "Time Series":
+                tab.enable_scroll_zoom()    # zooming re-decimates the lines down to raw rows
+            canvas.figure.clear()
+            draw_explore_plot(canvas.figure.subplots(), self.df, tab.spec)
+            canvas.draw_idle()
+
+    def _plot_tabs(self):
+        """Every plot tab, docked ones in tab order followed by detached ones."""
+        widgets = [self.tabs.widget(i) for i in range(self.tabs.count())]
+        widgets += [win.centralWidget() for win in self.tabs._detached]
+        return [w for w in widgets if getattr(w, "spec", None) is not None]
+
+    def set_data(self, df, version):
+        """Redraw every plot tab from a new snapshot of the table."""
+        if version == self.version and df is self.df:
+            return
+        self.df = df
+        self.version = version
+        for combo in (self.x_select, self.y_select):
+            refill_combo(combo, [str(c) for c in df.columns])
+        for tab in self._plot_tabs():
+            tab.spec = dict(tab.spec, version=version)
+            self._draw_tab(tab)
 
-        save_btn = QPushButton("Save Plot")
-        save_btn.clicked.connect(lambda: self._save_plot(canvas))
-        tab_layout.addWidget(save_btn)
+    def export_pages(self):
+        return [(tab.spec["title"], build_explore_figure, tab.spec, (7, 5)) for tab in self._plot_tabs()]
 
-        self.tabs.addTab(tab, title)
+    def export_all(self):
+        run_figure_export(self, self.df, self.export_pages())
 
-    def _save_plot(self, canvas):
+    def _save_plot(self, build):
         file_name, _ = QFileDialog.getSaveFileName(
             self, "Save Plot", "", "PNG Image (*.png);;JPEG Image (*.jpg);;PDF File (*.pdf)"
         )
-        if file_name:
-            canvas.figure.savefig(file_name, bbox_inches="tight")
+        if not file_name:
+            return
+        worker = Worker(save_built_figure, build, file_name, bbox_inches="tight")
+        worker.signals.error.connect(
+            lambda tb: QMessageBox.critical(self, "Save Error", tb.strip().splitlines()[-1])
+        )
+        worker.start()
 
 
 class VisualizeWindow(QMainWindow):
-    def __init__(self, df=None, parent=None):
+    def __init__(self, df=None, parent=None, version=None):
         super().__init__(parent)
         self.setWindowTitle("Visualize Data")
         self.setGeometry(240, 240, 900, 600)
 
-        self.panel = VisualizeDialog(df, self)
+        self.panel = VisualizeDialog(df, self, version)
         self.setCentralWidget(self.panel)
 
+    def set_data(self, df, version):
+        self.panel.set_data(df, version)
+
 
 class DashboardWindow(QMainWindow):
-    def __init__(self, df=None, parent=None):
+    def __init__(self, df=None, parent=None, version=None, full_stats=None):
         super().__init__(parent)
         self.setWindowTitle("Dashboard")
         self.setGeometry(260, 260, 1000, 700)
 
-        self.panel = DashboardDialog(df, self)
+        self.panel = DashboardDialog(df, self, version, full_stats)
         self.setCentralWidget(self.panel)
 
+    def set_data(self, df, version):
+        self.panel.set_data(df, version)
+
 
 # —————————————————————————————————
 #  MAIN APPLICATION WINDOW
@@ -2933,6 +6877,7 @@ class DataCleaningApp(QMainWindow):
         self.chunks = []
         self.current_chunk_idx = 0
         self.chunk_mode = False
+        self.full_stats = None  # StreamingStats over every chunk (chunk mode only)
 
         # Use a QStackedWidget to switch between “Welcome” and “Data” pages
         self.stacked = QStackedWidget()
@@ -2948,7 +6893,30 @@ class DataCleaningApp(QMainWindow):
         # Start with an empty DataFrame
         self.df = pd.DataFrame()
         self.model = PandasModel(self.df, workflow_callback=self.addWorkflowStep)
+        self.summary_stats = ColumnStatsCache()
+        self.model.columns_touched.connect(self.summary_stats.mark_dirty)
+        self.model.columns_touched.connect(
+            lambda cols: CORRELATIONS.mark_dirty(cols, self.model.version)
+        )
+        self.model.rows_reordered.connect(CORRELATIONS.mark_reordered)
+        self.model.columns_touched.connect(
+            lambda cols: COLUMN_BINS.mark_dirty(cols, self.model.version)
+        )
+        self.model.columns_touched.connect(
+            lambda cols: COLUMN_BOXES.mark_dirty(cols, self.model.version)
+        )
+        self.model.columns_touched.connect(
+            lambda cols: COLUMN_SERIES.mark_dirty(cols, self.model.version)
+        )
+        self.model.rows_reordered.connect(COLUMN_SERIES.mark_reordered)
         self.model.data_changed.connect(self.updateSummary)
+        # Open tool windows get a fresh snapshot shortly after the data changes
+        self._tool_windows = []
+        self._snapshot_timer = QTimer(self)
+        self._snapshot_timer.setSingleShot(True)
+        self._snapshot_timer.setInterval(300)
+        self._snapshot_timer.timeout.connect(self._pushSnapshot)
+        self.model.data_changed.connect(self._snapshot_timer.start)
         self.model.cell_edited.connect(self.recordEdit)
 
         # Build pages & dock
@@ -2964,8 +6932,21 @@ class DataCleaningApp(QMainWindow):
         self.applyStyle()
         self.loadSettings()
 
+    def _showToolWindow(self, window):
+        """Show a tool window and keep feeding it snapshots while it is open."""
+        self._tool_windows.append(window)
+        window.show()
+
+    def _pushSnapshot(self):
+        self._tool_windows = [w for w in self._tool_windows if w.isVisible()]
+        if not self._tool_windows:
+            return
+        df, version = self.model.view(), self.model.version
+        for window in self._tool_windows:
+            window.set_data(df, version)
+
     def openFitDialog(self):
-        df = self.model.getDataFrame()
+        df = self.model.view()
         if df.empty:
             QMessageBox.warning(self, "No Data", "Please load a dataset before fitting.")
             return
@@ -2974,28 +6955,31 @@ class DataCleaningApp(QMainWindow):
 
 
     def openFitWindow(self):
-        df = self.model.getDataFrame()
+        df = self.model.view()
         if df.empty:
             QMessageBox.warning(self, "No Data", "Please load a dataset before fitting.")
             return
         self.fit_window = FitWindow(df, self)
-        self.fit_window.show()
+        self._showToolWindow(self.fit_window)
 
     def openVisualizeWindow(self):
-        df = self.model.getDataFrame()
+        df = self.model.view()
         if df.empty:
             QMessageBox.warning(self, "No Data", "Please load a dataset before visualizing.")
             return
-        self.viz_window = VisualizeWindow(df, self)
-        self.viz_window.show()
+        self.viz_window = VisualizeWindow(df, self, version=self.model.version)
+        self._showToolWindow(self.viz_window)
 
     def openDashboardWindow(self):
-        df = self.model.getDataFrame()
+        df = self.model.view()
         if df.empty:
             QMessageBox.warning(self, "No Data", "Please load a dataset before dashboard view.")
             return
-        self.dash_window = DashboardWindow(df, self)
-        self.dash_window.show()
+        self.dash_window = DashboardWindow(
+            df, self, version=self.model.version,
+            full_stats=self.full_stats if self.chunk_mode else None,
+        )
+        self._showToolWindow(self.dash_window)
 
     def openTerminalWindow(self):
         self.term_window = TerminalWindow(self.model, self)
@@ -3006,14 +6990,14 @@ class DataCleaningApp(QMainWindow):
         self.ai_window.show()
 
     def openExploreWindow(self):
-        df = self.model.getDataFrame()
+        df = self.model.view()
         if df.empty:
             QMessageBox.warning(self, "No Data", "Please load a dataset before exploring.")
             return
 
         # Keep reference so window isn’t garbage-collected
-        self.explore_window = ExploreWindow(df, self)
-        self.explore_window.show()
+        self.explore_window = ExploreWindow(df, self, version=self.model.version)
+        self._showToolWindow(self.explore_window)
 
     def openAssistantWindow(self):
         self.assistant_window = AssistantWindow(self.model, self)
@@ -3334,6 +7318,11 @@ class DataCleaningApp(QMainWindow):
         self.figure = Figure(figsize=(5, 4))
         self.canvas = FigureCanvas(self.figure)
         self.ax = self.canvas.figure.subplots()
+        self.ax.tick_params(colors="#E0E0E0")
+        self.plot_layer = ArtistLayer(self.ax)
+        self.scatter_lod = ScatterLOD(self.plot_layer)
+        self.plot_toolbar = NavigationToolbar(self.canvas, plot_container)
+        plot_layout.addWidget(self.plot_toolbar)
         plot_layout.addWidget(self.canvas)
 
         # Controls below the plot for color, style, best‐fit, etc.
@@ -3385,6 +7374,12 @@ class DataCleaningApp(QMainWindow):
         self.addDockWidget(Qt.RightDockWidgetArea, self.summary_dock)
         self.summary_dock.hide()
 
+        # Bursts of edits/sorts/filters collapse into a single refresh
+        self._summary_timer = QTimer(self)
+        self._summary_timer.setSingleShot(True)
+        self._summary_timer.setInterval(150)
+        self._summary_timer.timeout.connect(self._refreshSummary)
+
 
     # ——————————————————————
     #  Toolbar Button Slots
@@ -3460,9 +7455,12 @@ class DataCleaningApp(QMainWindow):
                     self.status_bar.showMessage(
                         f"Loaded chunk 1 of {len(self.chunks)}", 4000
                     )
+                    self._startFullStats()
             else:
                 self.chunk_mode = False
                 df = pd.read_csv(file_name)
+            if not self.chunk_mode:
+                self.full_stats = None
 
             self.pushUndoState()
             self.df = df.copy()
@@ -3620,20 +7618,23 @@ class DataCleaningApp(QMainWindow):
 
 
     def openVisualizeDialog(self):
-        df = self.model.getDataFrame()
+        df = self.model.view()
         if df.empty:
             QMessageBox.warning(self, "Warning", "No data to visualize.")
             return
-        dialog = VisualizeDialog(df, self)
+        dialog = VisualizeDialog(df, self, version=self.model.version)
         dialog.exec_()
 
 
     def openDashboardDialog(self):
-        df = self.model.getDataFrame()
+        df = self.model.view()
         if df.empty:
             QMessageBox.warning(self, "Warning", "No data for dashboard.")
             return
-        dialog = DashboardDialog(df, self)
+        dialog = DashboardDialog(
+            df, self, version=self.model.version,
+            full_stats=self.full_stats if self.chunk_mode else None,
+        )
         dialog.exec_()
 
 
@@ -3820,21 +7821,86 @@ class DataCleaningApp(QMainWindow):
 
 
     def updateSummary(self):
-        df = self.model.getDataFrame()
-        if df.empty:
+        """
+        Schedule a summary refresh. Calls are debounced; the actual work
+        happens in _refreshSummary.
+        """
+        self._summary_timer.start()
+
+
+    def _refreshSummary(self):
+        columns = self.model.columnNames()
+        if self.model.rowCount() == 0 or not columns:
+            self.summary_stats.reset()
             self.summary_text.setPlainText("No data loaded.")
             return
+        todo = self.summary_stats.take_dirty(columns)
+        if not todo:
+            self._renderSummary()
+            return
+        version = self.model.version
+        worker = Worker(ColumnStatsCache.compute, self.model.getColumns(todo))
+        worker.signals.finished.connect(lambda res, v=version: self._onSummaryStats(res, v))
+        worker.signals.error.connect(lambda tb, cols=todo: self._onSummaryError(cols, tb))
+        worker.start()
+
+
+    def _onSummaryError(self, columns, tb):
+        # take_dirty already cleared these; mark them again so the next refresh retries
+        self.summary_stats.mark_dirty(columns)
+        print("Error in summary stats:", tb)
+
+
+    def _startFullStats(self):
+        """Summarize every loaded chunk in one background pass."""
+        self.full_stats = None
+        chunks = list(self.chunks)
+        worker = Worker(stream_statistics, chunks)
+        worker.signals.finished.connect(lambda st, c=chunks: self._onFullStats(st, c))
+        worker.signals.error.connect(lambda tb: print("Error in streaming stats:", tb))
+        worker.start()
+
+
+    def _onFullStats(self, stats, chunks):
+        # Ignore a pass that finished after a different file was loaded
+        if self.chunk_mode and len(chunks) == len(self.chunks) and all(
+            a is b for a, b in zip(chunks, self.chunks)
+        ):
+            self.full_stats = stats
+            self.updateSummary()
+
+
+    def _onSummaryStats(self, results, version):
+        self.summary_stats.apply(results, version)
+        self._renderSummary()
+
+
+    def _renderSummary(self):
+        columns = [c for c in self.model.columnNames() if c in self.summary_stats.stats]
+        stats = self.summary_stats.stats
         lines = []
-        lines.append(f"Rows: {df.shape[0]}")
-        lines.append(f"Columns: {df.shape[1]}")
+        lines.append(f"Rows: {self.model.rowCount()}")
+        lines.append(f"Columns: {self.model.columnCount()}")
         lines.append("\nMissing Values per Column:")
-        missing = df.isna().sum()
-        for col, cnt in missing.items():
-            lines.append(f"  {col}: {cnt}")
+        for col in columns:
+            lines.append(f"  {col}: {stats[col]['nulls']}")
         lines.append("\nColumn Data Types:")
-        dtypes = df.dtypes
-        for col, dt in dtypes.items():
-            lines.append(f"  {col}: {dt}")
+        for col in columns:
+            lines.append(f"  {col}: {stats[col]['dtype']}")
+        numeric = [c for c in columns if "mean" in stats[c]]
+        if numeric:
+            lines.append("\nNumeric Columns (min / max / mean):")
+            for col in numeric:
+                st = stats[col]
+                lines.append(f"  {col}: {st['min']:.6g} / {st['max']:.6g} / {st['mean']:.6g}")
+        if self.chunk_mode:
+            if self.full_stats is None:
+                lines.append(f"\nFull dataset ({len(self.chunks)} chunks): computing…")
+            else:
+                lines.append(
+                    f"\nFull dataset ({len(self.chunks)} chunks, {self.full_stats.rows} rows):"
+                )
+                lines.append(self.full_stats.summary().to_string(float_format=lambda v: f"{v:.6g}"))
         self.summary_text.setPlainText("\n".join(lines))
 
 
@@ -3854,42 +7920,38 @@ class DataCleaningApp(QMainWindow):
             return
 
         try:
-            # Extract x and y arrays
-            x = self.df[x_col].dropna().values
-            y = self.df[y_col].dropna().values
-
-            # We need to keep them aligned; easiest is to drop any rows where either is NA
+            # Keep x and y aligned: drop any rows where either is NA
             valid_mask = ~pd.isna(self.df[x_col]) & ~pd.isna(self.df[y_col])
-            x = self.df.loc[valid_mask, x_col].values
-            y = self.df.loc[valid_mask, y_col].values
-
-            # Sort by x to draw lines properly
-            idx_sort = x.argsort()
-            x_sorted = x[idx_sort]
-            y_sorted = y[idx_sort]
-
-            self.ax.clear()
-            self.ax.scatter(x_sorted, y_sorted, color="#008CBA", edgecolor="#E0E0E0", label="Data Points")
-            self.ax.set_xlabel(x_col, color="#E0E0E0")
-            self.ax.set_ylabel(y_col, color="#E0E0E0")
-            self.ax.set_title(f"{y_col} vs {x_col}", color="#E0E0E0")
-            self.ax.tick_params(colors="#E0E0E0")
-
-            if show_best_fit and len(x_sorted) >= 2:
+            x = self.df.loc[valid_mask, x_col].to_numpy(dtype=float)
+            y = self.df.loc[valid_mask, y_col].to_numpy(dtype=float)
+
+            layer = self.plot_layer
+            # Large data is drawn as a density image that re-bins on zoom/pan
+            xlim, ylim = self.scatter_lod.draw(
+                x, y, facecolor="#008CBA", edgecolor="#E0E0E0", label="Data Points"
+            )
+            title = f"{y_col} vs {x_col}"
+            if self.scatter_lod.dense:
+                title += f"  (density view, {x.size:,} points)"
+            layer.set_labels(title, x_col, y_col, color="#E0E0E0")
+            layer.set_limits(xlim, ylim)
+
+            if show_best_fit and len(x) >= 2:
                 # Compute linear best‐fit (Maple/NumPy polyfit of degree 1)
-                coeffs = np.polyfit(x_sorted, y_sorted, deg=1)
+                coeffs = np.polyfit(x, y, deg=1)
                 poly = np.poly1d(coeffs)
-                y_fit = poly(x_sorted)
-                self.ax.plot(x_sorted, y_fit, color="#FF4500", linestyle="--", linewidth=2, label="Linear Fit")
+                # A straight line only needs its two end points
+                x_line = np.array([x.min(), x.max()])
+                layer.line("fit", x_line, poly(x_line), color="#FF4500", linestyle="--", linewidth=2, label="Linear Fit")
 
                 # Compute R² if desired or show coefficients
                 slope, intercept = coeffs
-                r2 = np.corrcoef(y_sorted, y_fit)[0, 1]**2
+                r2 = np.corrcoef(x, y)[0, 1]**2
 
                 # Display best‐fit info above the plot
                 info_text = f"Slope: {slope:.4f}   Intercept: {intercept:.4f}   R²: {r2:.4f}"
-                self.ax.text(
-                    0.02, 0.95, info_text,
+                layer.text(
+                    "fit_info", 0.02, 0.95, info_text,
                     transform=self.ax.transAxes,
                     color="#E0E0E0", fontsize=10, verticalalignment='top',
                     bbox=dict(boxstyle='round', facecolor='#333333', alpha=0.5)
@@ -3910,11 +7972,14 @@ class DataCleaningApp(QMainWindow):
                     )
                 except ImportError:
                     pass
+            else:
+                layer.hide("fit", "fit_info")
 
-            # Legend
-            self.ax.legend(facecolor="#141414", edgecolor="#E0E0E0", labelcolor="#E0E0E0")
-            self.figure.tight_layout()
-            self.canvas.draw()
+            # Legend; relayout/full redraw only happens when labels or limits moved
+            layer.legend(facecolor="#141414", edgecolor="#E0E0E0", labelcolor="#E0E0E0")
+            layer.draw()
+            # New data → new "home" view for zoom/pan
+            self.plot_toolbar.update()
 
         except Exception as e:
             # In case the arrays don’t align perfectly or other errors
@@ -3946,7 +8011,7 @@ class DataCleaningApp(QMainWindow):
         if not fname.lower().endswith(".png"):
             fname += ".png"
         try:
-            self.figure.savefig(fname, dpi=300, facecolor=self.figure.get_facecolor())
+            self.plot_layer.savefig(fname, dpi=300, facecolor=self.figure.get_facecolor())
             self.status_bar.showMessage(f"Plot saved as {os.path.basename(fname)}", 4000)
         except Exception as e:
             QMessageBox.critical(self, "Error Saving Plot", str(e))